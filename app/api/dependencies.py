@@ -2,22 +2,33 @@
 Common FastAPI dependencies for authentication, RBAC, and rate limiting.
 
 Provides:
-- `get_current_user` – validates JWT access token, loads user from DB,
-  and attaches Casbin role information.
+- `get_current_user` – validates JWT access token (with a short-lived
+  verification cache), loads user from DB, and attaches Casbin role information.
 - `require_active_user` – ensures the user is active.
+- `check_permission` – Casbin permission check with a decision cache.
 - `rate_limiter` – SlowAPI rate limiting dependency.
+- `client_info` – client IP and user agent of the request, for audit logs.
 """
 
+import hashlib
+import math
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, Request, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPBearer
+from sqlalchemy.orm import Session, selectinload
 from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
+from app.core.config import get_settings
 from app.core.security import token_manager, password_hasher
 from app.core.database import get_db
 from app.models.user import User, UserRole, Role
-from app.services.role_service import RoleService
 from app.core.casbin_enforcer import casbin_enforcer
 from app.core.logging_config import get_logger
 
@@ -26,19 +37,142 @@ logger = get_logger(__name__)
 # ----------------------------------------------------------------------
 # Rate limiting
 # ----------------------------------------------------------------------
-limiter = Limiter(key_func=get_remote_address)
+# Counters live in RATE_LIMIT_STORAGE_URI; point it at Redis when running
+# several workers so limits are shared instead of counted per process.
+limiter = Limiter(key_func=get_remote_address, storage_uri=get_settings().rate_limit_storage_uri)
 
 def rate_limiter():
     """Dependency that can be added to any route to enable rate limiting."""
     return limiter
 
+
+def user_or_ip_key(request: Request) -> str:
+    """
+    Rate limit key for authenticated routes.
+
+    Uses the user behind a valid bearer token (resolved through the token
+    verification cache), so clients sharing an address do not share a
+    budget; anonymous or invalid requests fall back to the client address.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        user_id = _verify_access_token(token)
+        if user_id is not None:
+            return f"user:{user_id}"
+    return get_remote_address(request)
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    """Return 429 with a Retry-After header counting down to the window reset."""
+    response = JSONResponse({"error": f"Rate limit exceeded: {exc.detail}"}, status_code=429)
+    current_limit = getattr(request.state, "view_rate_limit", None)
+    if current_limit is not None:
+        reset_at, _ = limiter.limiter.get_window_stats(current_limit[0], *current_limit[1])
+        response.headers["Retry-After"] = str(max(1, math.ceil(reset_at - time.time())))
+    return response
+
+# ----------------------------------------------------------------------
+# Request context
+# ----------------------------------------------------------------------
+class ClientInfo(NamedTuple):
+    """Client address and user agent of a request."""
+
+    ip: Optional[str]
+    ua: Optional[str]
+
+
+def client_info(request: Request) -> ClientInfo:
+    """Dependency returning the client IP and user agent, read once per request."""
+    return ClientInfo(
+        request.client.host if request.client else None,
+        request.headers.get("user-agent"),
+    )
+
 # ----------------------------------------------------------------------
 # Authentication & RBAC
 # ----------------------------------------------------------------------
-security = HTTPBearer(auto_error=False)
+class BearerToken(HTTPBearer):
+    """
+    Bearer scheme that returns the raw token string.
+
+    Slices the ``Authorization`` header directly instead of building an
+    ``HTTPAuthorizationCredentials`` model per request, while keeping the
+    bearer security scheme in the OpenAPI docs.
+    """
+
+    async def __call__(self, request: Request) -> Optional[str]:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        return token
+
+
+security = BearerToken(auto_error=False)
+
+# Verified access tokens, keyed by a truncated SHA-256 of the raw token.
+# Entries hold ``(user_id, exp)`` and live for at most ``TOKEN_CACHE_TTL``
+# seconds (or until the token expires, whichever comes first), which bounds
+# how long a revoked token can keep being accepted.
+TOKEN_CACHE_TTL = 30
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
+
+def _token_cache_key(token: str) -> str:
+    """Return the cache key for a raw bearer token."""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _verify_access_token(token: str) -> Optional[int]:
+    """
+    Verify an access token and return the user ID it was issued for.
+
+    Tokens seen within the last ``TOKEN_CACHE_TTL`` seconds are resolved
+    from the cache without re-checking the signature.
+
+    Returns:
+        User ID, or None if the token is invalid or expired
+    """
+    key = _token_cache_key(token)
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    if cached is not None:
+        user_id, exp = cached
+        if exp > now:
+            return user_id
+        with _token_cache_lock:
+            _token_cache.pop(key, None)
+
+    payload = token_manager.verify_token(token, token_type="access")
+    if not payload:
+        return None
+
+    user_id = int(payload.get("sub"))
+    exp = payload.get("exp")
+    if exp is not None and exp > now:
+        with _token_cache_lock:
+            _token_cache[key] = (user_id, exp)
+    return user_id
+
+
+def clear_token_cache(user_id: Optional[int] = None) -> None:
+    """
+    Drop cached token verifications (e.g. after a logout or key rotation).
+
+    Args:
+        user_id: Only drop tokens issued to this user; drop everything if None
+    """
+    with _token_cache_lock:
+        if user_id is None:
+            _token_cache.clear()
+            return
+        for key in [k for k, (uid, _) in _token_cache.items() if uid == user_id]:
+            _token_cache.pop(key, None)
+
 
 def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token: Optional[str] = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """
@@ -47,20 +181,23 @@ def get_current_user(
     Returns the `User` ORM instance.
     Raises 401 if token is missing/invalid or user not found.
     """
-    if not credentials:
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing authentication token",
         )
-    token = credentials.credentials
-    payload = token_manager.verify_token(token, token_type="access")
-    if not payload:
+    user_id = _verify_access_token(token)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
-    user_id = int(payload.get("sub"))
-    user = db.query(User).filter(User.id == user_id).first()
+    # Eager-load role assignments so `user.roles` needs no further queries
+    user = db.get(
+        User,
+        user_id,
+        options=[selectinload(User.user_roles).joinedload(UserRole.role)],
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,6 +217,35 @@ def require_active_user(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
+# Casbin decisions keyed by ``(user_id, roles, resource, action)``.
+# The enforcer clears it on every policy change, and a decision computed
+# while a change was being made is not stored; the TTL bounds
+# staleness for changes made outside the application (e.g. editing the CSV)
+# and is set with ``CASBIN_DECISION_CACHE_TTL``.
+PERMISSION_CACHE_TTL = get_settings().casbin_decision_cache_ttl
+_permission_cache: TTLCache = TTLCache(maxsize=50_000, ttl=PERMISSION_CACHE_TTL)
+_permission_cache_lock = threading.Lock()
+
+
+def clear_permission_cache(user_id: Optional[int] = None) -> None:
+    """
+    Invalidate cached permission decisions.
+
+    Args:
+        user_id: Only drop decisions for this user; drop everything if None
+    """
+    with _permission_cache_lock:
+        if user_id is None:
+            _permission_cache.clear()
+            return
+        for key in [k for k in _permission_cache if k[0] == user_id]:
+            _permission_cache.pop(key, None)
+
+
+
+# Any Casbin policy or role assignment change invalidates cached decisions
+casbin_enforcer.on_policy_change(clear_permission_cache)
+
 def check_permission(
     user: User,
     resource: str,
@@ -87,14 +253,30 @@ def check_permission(
 ) -> bool:
     """
     Helper to check Casbin permission for the current user.
+
+    Decisions are memoized per user, role set, resource and action.
+    One checked against a policy generation that has since been replaced
+    may predate the change, so it is returned but not stored.
     """
     roles = getattr(user, "_casbin_roles", [])
-    return casbin_enforcer.check_permission(
+    key = (user.id, tuple(sorted(roles)), resource, action)
+    with _permission_cache_lock:
+        allowed = _permission_cache.get(key)
+    if allowed is not None:
+        return allowed
+
+    generation = casbin_enforcer.policy_generation
+    allowed = casbin_enforcer.check_permission(
         user_id=user.id,
         roles=roles,
         resource=resource,
         action=action,
     )
+    with _permission_cache_lock:
+        # A change after this point is followed by a clear of the cache
+        if casbin_enforcer.policy_generation == generation:
+            _permission_cache[key] = allowed
+    return allowed
 
 def require_permission(resource: str, action: str):
     """
@@ -107,15 +289,20 @@ def require_permission(resource: str, action: str):
             user: User = Depends(require_permission("/api/v2/roles", "POST"))
         ):
             ...
+    
+    The denial message is built once here rather than on every 403. A
+    fresh HTTPException is still raised each time: re-raising one shared
+    instance would keep growing its traceback across requests.
     """
+    denied_detail = f"Insufficient permissions to {action} {resource}"
+
     def permission_checker(
-        request: Request,
         current_user: User = Depends(require_active_user)
     ) -> User:
         if not check_permission(current_user, resource, action):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Insufficient permissions to {action} {resource}",
+                detail=denied_detail,
             )
         return current_user
     return permission_checker
@@ -5,11 +5,16 @@ This module contains dependency functions used across API routes,
 such as authentication and authorization.
 """
 
+import hmac
+
 from fastapi import Header, HTTPException, status
 from app.core.config import get_settings
 
 settings = get_settings()
 
+# Encoded once; compare_digest on str rejects non-ASCII input with TypeError
+_API_KEY_B = settings.api_key.encode()
+
 
 async def verify_api_key(x_api_key: str = Header(...)) -> str:
     """
@@ -38,7 +43,7 @@ async def verify_api_key(x_api_key: str = Header(...)) -> str:
         >>> headers = {"X-API-Key": "your-secret-api-key"}
         >>> response = requests.get("http://localhost:8000/protected", headers=headers)
     """
-    if x_api_key != settings.api_key:
+    if not hmac.compare_digest(x_api_key.encode(), _API_KEY_B):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API Key"
@@ -5,12 +5,17 @@ This module handles API endpoints for chest X-ray finding detection,
 including single and batch detection operations.
 """
 
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status, Query
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from dependency_injector.wiring import inject, Provide
+import asyncio
 import os
-import uuid
-from typing import List
+import torch
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import time
 
 from app.core.database import get_db
@@ -20,7 +25,6 @@ from app.core.container import Container
 from app.schemas.detection import (
     CADeResponse, 
     BatchCADeResponse, 
-    DetectionCreate,
     DetectionResult
 )
 from app.schemas.prediction import PredictionCreate
@@ -28,12 +32,307 @@ from app.services.detection_service import DetectionService
 from app.services.prediction_service import PredictionService
 from app.ml.detection_inference import DetectionInference
 from app.ml.preprocessing.image_processor import ImageProcessor
-import json
+from app.utils.helpers import classify_upload, dumps_json, read_upload_file, remove_files
 
+# Keep the default response class: with a response_model set, FastAPI dumps
+# the validated model straight to JSON bytes via pydantic-core. A custom
+# class such as ORJSONResponse would force a Python-object dump first.
 router = APIRouter()
 settings = get_settings()
 logger = get_logger(__name__)
 
+# Create the upload directory once at import rather than on every upload
+_UPLOAD_DIR = Path(settings.upload_dir)
+_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# Image validation and DICOM decoding are blocking CPU/IO work; run them off
+# the event loop. PIL, NumPy and pydicom release the GIL for the heavy parts,
+# so a thread pool lets concurrent uploads decode in parallel.
+_preprocess_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4,
+    thread_name_prefix="cade-preprocess"
+)
+
+# Model forward passes get their own small pool so a long inference never
+# queues behind (or starves) upload decoding on the preprocessing pool
+_inference_pool = ThreadPoolExecutor(
+    max_workers=settings.inference_workers,
+    thread_name_prefix="cade-inference"
+)
+
+# Constant fields of every CADe prediction record
+_PREDICTION_TEMPLATE = {
+    "model_name": "chest_xray_detector_v1",
+    "prediction_class": "Detection",  # Placeholder for CADe
+    "confidence_score": 1.0,  # Not applicable for detection
+    "prediction_metadata": None,
+}
+
+
+def _prepare_image(
+    image_processor: ImageProcessor,
+    data: bytes,
+    filename: str,
+    file_path: Path
+) -> Tuple[bool, Optional[torch.Tensor], Optional[Dict]]:
+    """
+    Validate and decode an upload in memory, then write it to disk.
+    
+    Runs on the preprocessing pool. Only uploads that decode successfully
+    are persisted, so invalid files never touch the upload directory. The
+    decoded tensor is handed straight to the detector.
+    
+    Returns:
+        Tuple of (is_valid, image tensor or None, dicom metadata or None)
+    """
+    decoded = image_processor.decode_bytes(data, filename)
+    if decoded is None:
+        return False, None, None
+    image_tensor, dicom_metadata = decoded
+    file_path.write_bytes(data)
+    return True, image_tensor, dicom_metadata
+
+
+class _Failure(NamedTuple):
+    """A file that could not be processed, with the HTTP status it maps to."""
+    filename: Optional[str]
+    error: str
+    status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def _build_detection_rows(prediction_id: int, detections: List[Dict]) -> List[Dict]:
+    """Convert raw model detections into detection rows for bulk insert."""
+    return [
+        {
+            "prediction_id": prediction_id,
+            "finding_type": det['finding_type'],
+            "confidence_score": det['confidence'],
+            "bbox_x1": det['bbox'][0],
+            "bbox_y1": det['bbox'][1],
+            "bbox_x2": det['bbox'][2],
+            "bbox_y2": det['bbox'][3],
+        }
+        for det in detections
+    ]
+
+
+def _persist_batch(
+    db: Session,
+    prediction_service: PredictionService,
+    detection_service: DetectionService,
+    pending: List[Tuple],
+    batch_detections: List[List[Dict]],
+    processing_time: float
+) -> List[CADeResponse]:
+    """
+    Persist a batch of predictions and their detections in one transaction.
+    
+    Uses the blocking Session, so it is run on the threadpool rather than
+    on the event loop. Rolls back and re-raises on failure.
+    
+    Returns:
+        One CADeResponse per pending image, in order
+    """
+    try:
+        # Build the records now that processing_time is known. The template
+        # fields are statically valid, so skip re-validation.
+        predictions_data = [
+            PredictionCreate.model_construct(
+                **_PREDICTION_TEMPLATE,
+                image_filename=unique_filename,
+                processing_time=processing_time,
+                dicom_metadata=dicom_json
+            )
+            for _, _, unique_filename, dicom_json in pending
+        ]
+        db_predictions = prediction_service.create_predictions_batch(
+            db, predictions_data, commit=False
+        )
+        
+        # Detector output is trusted, so insert plain rows without validation
+        detection_rows = [
+            row
+            for db_prediction, detections in zip(db_predictions, batch_detections)
+            for row in _build_detection_rows(db_prediction.id, detections)
+        ]
+        db_detections = detection_service.create_detections_bulk(
+            db, detection_rows, commit=False
+        )
+        logger.debug("Saving %d predictions and %d detections", len(db_predictions), len(db_detections))
+        
+        # Build responses before committing so no attributes need reloading
+        results_by_prediction = {db_prediction.id: [] for db_prediction in db_predictions}
+        for detection_result in DetectionResult.from_db_models(db_detections):
+            results_by_prediction[detection_result.prediction_id].append(detection_result)
+        
+        responses = []
+        for (_, _, unique_filename, _), db_prediction in zip(pending, db_predictions):
+            detection_results = results_by_prediction[db_prediction.id]
+            responses.append(CADeResponse(
+                prediction_id=db_prediction.id,
+                image_filename=unique_filename,
+                model_name="chest_xray_detector_v1",
+                num_findings=len(detection_results),
+                processing_time=processing_time,
+                detections=detection_results
+            ))
+        
+        db.commit()
+        return responses
+    except Exception:
+        db.rollback()
+        raise
+
+
+async def _read_upload(file: UploadFile) -> Tuple[bytes, str]:
+    """
+    Check an upload's type and read it into memory.
+    
+    Returns:
+        Tuple of (file content, lowercased extension)
+        
+    Raises:
+        HTTPException: If the file is neither an image nor DICOM (400)
+            or is larger than the configured upload limit (413)
+    """
+    file_extension, is_dicom, is_image = classify_upload(file)
+    if not is_dicom and not is_image:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be an image (PNG/JPEG) or DICOM (.dcm) file"
+        )
+    
+    try:
+        data = await read_upload_file(file, settings.max_upload_size)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=str(e)
+        )
+    return data, file_extension
+
+
+async def _process_images(
+    files: List[UploadFile],
+    db: Session,
+    prediction_service: PredictionService,
+    detection_service: DetectionService,
+    detection_inference: DetectionInference,
+    image_processor: ImageProcessor
+) -> Tuple[List[CADeResponse], List[_Failure]]:
+    """
+    Save, validate, detect and persist a list of uploads.
+    
+    Shared by the single and batch routes: uploads are read into memory,
+    validated, decoded and saved in parallel, run through the detector in one
+    batched forward pass and persisted in a single transaction. Files that
+    fail are removed and reported instead of aborting the whole request.
+    
+    Returns:
+        Tuple of (results in upload order, failures)
+        
+    Raises:
+        HTTPException: If the database transaction fails (500)
+    """
+    failures = []
+    
+    # Validate file types and read uploads
+    uploads = []
+    for idx, file in enumerate(files):
+        logger.debug("Reading CADe file %d/%d: %s", idx + 1, len(files), file.filename)
+        try:
+            data, file_extension = await _read_upload(file)
+        except HTTPException as e:
+            logger.warning("Rejected CADe file %s (%s): %s", file.filename, file.content_type, e.detail)
+            failures.append(_Failure(file.filename, e.detail, e.status_code))
+            continue
+        except Exception as e:
+            logger.error("Error reading CADe file %s: %s", file.filename, e)
+            failures.append(_Failure(file.filename, f"Error saving file: {str(e)}"))
+            continue
+        unique_filename = f"{secrets.token_hex(16)}{file_extension}"
+        uploads.append((file, data, _UPLOAD_DIR / unique_filename, unique_filename))
+    
+    # Validate, decode and save all uploads in parallel on the preprocessing pool
+    loop = asyncio.get_running_loop()
+    outcomes = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                _preprocess_pool, _prepare_image, image_processor, data, file.filename or "", file_path
+            )
+            for file, data, file_path, _ in uploads
+        ],
+        return_exceptions=True
+    )
+    
+    pending = []
+    image_tensors = []
+    orphaned = []
+    for (file, _, file_path, unique_filename), outcome in zip(uploads, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Error processing CADe file %s: %s", file.filename, outcome)
+            failures.append(_Failure(file.filename, f"Detection error: {str(outcome)}"))
+            orphaned.append(file_path)
+            continue
+        
+        is_valid, image_tensor, dicom_metadata = outcome
+        if not is_valid:
+            logger.warning("CADe image validation failed: %s", file.filename)
+            failures.append(_Failure(
+                file.filename,
+                "Invalid image format. Please upload PNG, JPEG, or DICOM file",
+                status.HTTP_400_BAD_REQUEST
+            ))
+            continue
+        
+        # The prediction record is built with the whole batch once inference has run
+        dicom_json = dumps_json(dicom_metadata) if dicom_metadata else None
+        pending.append((file, file_path, unique_filename, dicom_json))
+        image_tensors.append(image_tensor)
+    
+    if orphaned:
+        await remove_files(orphaned)
+    if not pending:
+        return [], failures
+    
+    # Run detection on the already decoded images in a single batched forward
+    # pass. This runs on the inference pool, which also absorbs a cold model load.
+    try:
+        batch_detections, inference_time = await loop.run_in_executor(
+            _inference_pool,
+            detection_inference.detect_batch_from_tensors,
+            image_tensors
+        )
+    except Exception as e:
+        logger.error("CADe inference failed: %s", e, exc_info=True)
+        for file, _, _, _ in pending:
+            failures.append(_Failure(file.filename, f"Detection error: {str(e)}"))
+        await remove_files(file_path for _, file_path, _, _ in pending)
+        return [], failures
+    processing_time = inference_time / len(pending)
+    
+    # Persist all predictions and detections in a single transaction
+    try:
+        results = await run_in_threadpool(
+            _persist_batch,
+            db,
+            prediction_service,
+            detection_service,
+            pending,
+            batch_detections,
+            processing_time
+        )
+    except Exception as e:
+        logger.error("Database error during CADe save: %s", e, exc_info=True)
+        # Clean up all saved files on database error
+        await remove_files(file_path for _, file_path, _, _ in pending)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+    
+    return results, failures
+
 
 @router.post("/detect", response_model=CADeResponse, status_code=status.HTTP_201_CREATED)
 @inject
@@ -58,129 +357,17 @@ async def detect_findings(
     - Cardiomegaly
     - Infiltrates/Consolidation
     """
-    logger.info(f"Received CADe detection request for file: {file.filename}")
+    logger.info("Received CADe detection request for file: %s", file.filename)
     
-    # Validate file type (support both images and DICOM)
-    is_dicom = file.filename.lower().endswith('.dcm') if file.filename else False
-    if not is_dicom and not file.content_type.startswith("image/"):
-        logger.warning(f"Invalid file type for CADe: {file.content_type} for file {file.filename}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be an image (PNG/JPEG) or DICOM (.dcm) file"
-        )
-    
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(settings.upload_dir, unique_filename)
-    
-    logger.debug(f"Generated unique filename for CADe: {unique_filename}")
-    
-    # Save uploaded file
-    try:
-        os.makedirs(settings.upload_dir, exist_ok=True)
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        logger.info(f"CADe file saved successfully: {file_path}")
-    except Exception as e:
-        logger.error(f"Error saving CADe file {file.filename}: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error saving file: {str(e)}"
-        )
-    
-    # Validate image
-    logger.debug(f"Validating image for CADe: {unique_filename}")
-    if not image_processor.validate_image(file_path):
-        logger.warning(f"CADe image validation failed: {unique_filename}")
-        os.remove(file_path)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid image format. Please upload PNG, JPEG, or DICOM file"
-        )
+    results, failures = await _process_images(
+        [file], db, prediction_service, detection_service, detection_inference, image_processor
+    )
+    if failures:
+        raise HTTPException(status_code=failures[0].status_code, detail=failures[0].error)
     
-    # Run detection
-    try:
-        logger.info(f"Processing image for CADe detection: {unique_filename}")
-        
-        # Extract DICOM metadata if applicable
-        image_tensor, dicom_metadata = image_processor.process_image_with_metadata(file_path)
-        if dicom_metadata:
-            logger.debug(f"Extracted DICOM metadata for CADe: {unique_filename}")
-        
-        # Create prediction record first (for tracking)
-        prediction_data = PredictionCreate(
-            image_filename=unique_filename,
-            model_name="chest_xray_detector_v1",
-            prediction_class="Detection",  # Placeholder for CADe
-            confidence_score=1.0,  # Not applicable for detection
-            processing_time=0.0,  # Will update after detection
-            prediction_metadata=None,
-            dicom_metadata=json.dumps(dicom_metadata) if dicom_metadata else None
-        )
-        
-        db_prediction = prediction_service.create_prediction(db, prediction_data)
-        logger.debug(f"Created prediction record for CADe with ID: {db_prediction.id}")
-        
-        # Run detection inference
-        logger.info(f"Running detection inference for: {unique_filename}")
-        detections, processing_time = detection_inference.detect(file_path)
-        
-        logger.info(f"CADe detection completed - Found {len(detections)} findings in {processing_time:.3f}s")
-        
-        # Update prediction processing time
-        db_prediction.processing_time = processing_time
-        db.commit()
-        
-        # Store detections in database
-        detection_results = []
-        if detections:
-            logger.debug(f"Saving {len(detections)} detections to database")
-            detections_data = []
-            for det in detections:
-                detection_create = DetectionCreate(
-                    prediction_id=db_prediction.id,
-                    finding_type=det['finding_type'],
-                    confidence_score=det['confidence'],
-                    bbox_x1=det['bbox'][0],
-                    bbox_y1=det['bbox'][1],
-                    bbox_x2=det['bbox'][2],
-                    bbox_y2=det['bbox'][3]
-                )
-                detections_data.append(detection_create)
-            
-            # Save all detections
-            db_detections = detection_service.create_detections_batch(db, detections_data)
-            logger.info(f"Successfully saved {len(db_detections)} detections to database")
-            
-            # Convert to response format
-            detection_results = [
-                DetectionResult.from_db_model(db_det) 
-                for db_det in db_detections
-            ]
-        else:
-            logger.info("No findings detected in the image")
-        
-        return CADeResponse(
-            prediction_id=db_prediction.id,
-            image_filename=unique_filename,
-            model_name="chest_xray_detector_v1",
-            num_findings=len(detection_results),
-            processing_time=processing_time,
-            detections=detection_results
-        )
-        
-    except Exception as e:
-        logger.error(f"CADe detection error for {unique_filename}: {str(e)}", exc_info=True)
-        # Clean up file on error
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            logger.debug(f"Cleaned up file after CADe error: {file_path}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Detection error: {str(e)}"
-        )
+    result = results[0]
+    logger.info("CADe detection completed - Found %d findings in %.3fs", result.num_findings, result.processing_time)
+    return result
 
 
 @router.post("/detect/batch", response_model=BatchCADeResponse, status_code=status.HTTP_201_CREATED)
@@ -199,7 +386,7 @@ async def detect_findings_batch(
     Accepts up to 50 images at once. Returns summary statistics and
     individual detection results for each image.
     """
-    logger.info(f"Received batch CADe detection request with {len(files)} files")
+    logger.info("Received batch CADe detection request with %d files", len(files))
     
     # Validate batch size
     if len(files) == 0:
@@ -210,141 +397,39 @@ async def detect_findings_batch(
         )
     
     if len(files) > 50:
-        logger.warning(f"Batch CADe request exceeds limit: {len(files)} files")
+        logger.warning("Batch CADe request exceeds limit: %d files", len(files))
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Maximum 50 images allowed per batch"
         )
     
     batch_start_time = time.time()
-    successful_results = []
-    failed_detections = []
-    saved_files = []
-    
     logger.info("Starting batch CADe processing...")
     
-    # Process each file
-    for idx, file in enumerate(files):
-        logger.debug(f"Processing CADe file {idx + 1}/{len(files)}: {file.filename}")
-        file_path = None
-        try:
-            # Validate file type
-            is_dicom = file.filename.lower().endswith('.dcm') if file.filename else False
-            if not is_dicom and not file.content_type.startswith("image/"):
-                logger.warning(f"Invalid file type in CADe batch: {file.filename} ({file.content_type})")
-                failed_detections.append({
-                    "filename": file.filename,
-                    "error": "File must be an image or DICOM file"
-                })
-                continue
-            
-            # Generate unique filename
-            file_extension = os.path.splitext(file.filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = os.path.join(settings.upload_dir, unique_filename)
-            
-            # Save uploaded file
-            os.makedirs(settings.upload_dir, exist_ok=True)
-            with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            
-            saved_files.append(file_path)
-            
-            # Validate image
-            if not image_processor.validate_image(file_path):
-                logger.warning(f"CADe image validation failed in batch: {file.filename}")
-                failed_detections.append({
-                    "filename": file.filename,
-                    "error": "Invalid image format"
-                })
-                continue
-            
-            # Extract DICOM metadata if applicable
-            image_tensor, dicom_metadata = image_processor.process_image_with_metadata(file_path)
-            
-            # Create prediction record
-            prediction_data = PredictionCreate(
-                image_filename=unique_filename,
-                model_name="chest_xray_detector_v1",
-                prediction_class="Detection",
-                confidence_score=1.0,
-                processing_time=0.0,
-                prediction_metadata=None,
-                dicom_metadata=json.dumps(dicom_metadata) if dicom_metadata else None
-            )
-            
-            db_prediction = prediction_service.create_prediction(db, prediction_data)
-            
-            # Run detection
-            detections, processing_time = detection_inference.detect(file_path)
-            logger.debug(f"Batch CADe {idx + 1}: Found {len(detections)} findings in {processing_time:.3f}s")
-            
-            # Update prediction processing time
-            db_prediction.processing_time = processing_time
-            db.commit()
-            
-            # Store detections
-            detection_results = []
-            if detections:
-                detections_data = []
-                for det in detections:
-                    detection_create = DetectionCreate(
-                        prediction_id=db_prediction.id,
-                        finding_type=det['finding_type'],
-                        confidence_score=det['confidence'],
-                        bbox_x1=det['bbox'][0],
-                        bbox_y1=det['bbox'][1],
-                        bbox_x2=det['bbox'][2],
-                        bbox_y2=det['bbox'][3]
-                    )
-                    detections_data.append(detection_create)
-                
-                db_detections = detection_service.create_detections_batch(db, detections_data)
-                detection_results = [
-                    DetectionResult.from_db_model(db_det) 
-                    for db_det in db_detections
-                ]
-            
-            # Add to successful results
-            successful_results.append(CADeResponse(
-                prediction_id=db_prediction.id,
-                image_filename=unique_filename,
-                model_name="chest_xray_detector_v1",
-                num_findings=len(detection_results),
-                processing_time=processing_time,
-                detections=detection_results
-            ))
-            
-        except Exception as e:
-            logger.error(f"Error processing CADe file {file.filename} in batch: {str(e)}")
-            failed_detections.append({
-                "filename": file.filename,
-                "error": str(e)
-            })
-            # Clean up file on error
-            if file_path and os.path.exists(file_path):
-                os.remove(file_path)
-                if file_path in saved_files:
-                    saved_files.remove(file_path)
+    successful_results, failures = await _process_images(
+        files, db, prediction_service, detection_service, detection_inference, image_processor
+    )
     
     total_processing_time = time.time() - batch_start_time
     
-    logger.info(f"Batch CADe processing completed - Total: {len(files)}, Successful: {len(successful_results)}, Failed: {len(failed_detections)}, Time: {total_processing_time:.2f}s")
+    logger.info(
+        "Batch CADe processing completed - Total: %d, Successful: %d, Failed: %d, Time: %.2fs",
+        len(files), len(successful_results), len(failures), total_processing_time
+    )
     
     return BatchCADeResponse(
         total_images=len(files),
         successful=len(successful_results),
-        failed=len(failed_detections),
+        failed=len(failures),
         total_processing_time=total_processing_time,
         results=successful_results,
-        errors=failed_detections
+        errors=[{"filename": failure.filename, "error": failure.error} for failure in failures]
     )
 
 
 @router.get("/detections/{prediction_id}", response_model=List[DetectionResult])
 @inject
-async def get_detections_for_prediction(
+def get_detections_for_prediction(
     prediction_id: int,
     db: Session = Depends(get_db),
     prediction_service: PredictionService = Depends(Provide[Container.prediction_service]),
@@ -355,31 +440,33 @@ async def get_detections_for_prediction(
     
     Returns all findings detected for the given prediction ID.
     """
-    logger.info(f"Retrieving detections for prediction ID: {prediction_id}")
+    logger.info("Retrieving detections for prediction ID: %d", prediction_id)
     detections = detection_service.get_detections_by_prediction(db, prediction_id)
     
     if not detections:
         # Check if prediction exists
         prediction = prediction_service.get_prediction(db, prediction_id)
         if not prediction:
-            logger.warning(f"Prediction not found: {prediction_id}")
+            logger.warning("Prediction not found: %d", prediction_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Prediction with id {prediction_id} not found"
             )
         # Prediction exists but has no detections
-        logger.info(f"No detections found for prediction ID: {prediction_id}")
+        logger.info("No detections found for prediction ID: %d", prediction_id)
         return []
     
-    logger.info(f"Retrieved {len(detections)} detections for prediction ID: {prediction_id}")
-    return [DetectionResult.from_db_model(det) for det in detections]
+    logger.info("Retrieved %d detections for prediction ID: %d", len(detections), prediction_id)
+    return DetectionResult.from_db_models(detections)
 
 
 @router.get("/detections", response_model=List[DetectionResult])
 @inject
-async def get_all_detections(
+def get_all_detections(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[int] = Query(None, ge=0),
     finding_type: str = Query(None),
     db: Session = Depends(get_db),
     detection_service: DetectionService = Depends(Provide[Container.detection_service])
@@ -390,16 +477,27 @@ async def get_all_detections(
     Query parameters:
     - skip: Number of records to skip (default: 0)
     - limit: Maximum records to return (default: 100, max: 500)
+    - cursor: Return detections after this ID instead of using skip (optional)
     - finding_type: Filter by finding type (optional)
+    
+    A full page sets the X-Next-Cursor header to the cursor for the next page.
     """
-    logger.info(f"Retrieving all detections (skip={skip}, limit={limit}, finding_type={finding_type})")
+    logger.info(
+        "Retrieving all detections (skip=%d, limit=%d, cursor=%s, finding_type=%s)",
+        skip, limit, cursor, finding_type
+    )
     
     if finding_type:
         detections = detection_service.get_detections_by_finding_type(
-            db, finding_type, skip=skip, limit=limit
+            db, finding_type, skip=skip, limit=limit, after_id=cursor
         )
     else:
-        detections = detection_service.get_all_detections(db, skip=skip, limit=limit)
+        detections = detection_service.get_all_detections(
+            db, skip=skip, limit=limit, after_id=cursor
+        )
+    
+    if len(detections) == limit:
+        response.headers["X-Next-Cursor"] = str(detections[-1].id)
     
-    logger.info(f"Retrieved {len(detections)} detections from database")
-    return [DetectionResult.from_db_model(det) for det in detections]
+    logger.info("Retrieved %d detections from database", len(detections))
+    return DetectionResult.from_db_models(detections)
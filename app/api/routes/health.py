@@ -1,15 +1,24 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from dependency_injector.wiring import inject, Provide
 from app.schemas.prediction import HealthCheck
 from app.core.config import get_settings
+from app.core.container import Container
 from app.ml.inference import ModelInference
 
 router = APIRouter()
-model_inference = ModelInference()
+settings = get_settings()
 
 @router.get("/health", response_model=HealthCheck)
-async def health_check():
-    """Health check endpoint"""
-    settings = get_settings()
+@inject
+async def health_check(
+    model_inference: ModelInference = Depends(Provide[Container.model_inference])
+):
+    """
+    Health check endpoint.
+    
+    Hit by load-balancer probes every few seconds, so it only reads in-process
+    state and deliberately opens no database session.
+    """
     return HealthCheck(
         status="healthy",
         app_name=settings.app_name,
@@ -1,12 +1,15 @@
 
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from dependency_injector.wiring import inject, Provide
+import asyncio
 import os
-import uuid
-from typing import List
-import json
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import time
+import torch
 
 from app.core.database import get_db
 from app.core.config import get_settings
@@ -16,11 +19,99 @@ from app.schemas.prediction import PredictionResponse, PredictionCreate, BatchPr
 from app.services.prediction_service import PredictionService
 from app.ml.inference import ModelInference
 from app.ml.preprocessing.image_processor import ImageProcessor
+from app.utils.helpers import (
+    classify_upload,
+    dumps_json,
+    read_upload_file,
+    remove_files,
+    save_upload_file,
+)
 
 router = APIRouter()
 settings = get_settings()
 logger = get_logger(__name__)
 
+# Create the upload directory once at import rather than on every upload,
+# and keep its path as a plain string prefix for building file paths
+os.makedirs(settings.upload_dir, exist_ok=True)
+_UPLOAD_PREFIX = os.path.join(settings.upload_dir, "")
+
+# Image decoding is blocking CPU work; run it off the event loop. PIL and
+# NumPy release the GIL for the heavy parts, so concurrent uploads decode
+# in parallel.
+_preprocess_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4,
+    thread_name_prefix="predict-preprocess"
+)
+
+# Model forward passes get their own small pool so decoding never queues
+# behind a long inference
+_inference_pool = ThreadPoolExecutor(
+    max_workers=settings.inference_workers,
+    thread_name_prefix="predict-inference"
+)
+
+# Enough of an upload to see the PNG/JPEG signatures and the DICOM marker
+_HEADER_SIZE = 512
+
+
+async def _has_image_signature(file: UploadFile, image_processor: ImageProcessor) -> bool:
+    """Check an upload's magic number without consuming it."""
+    header = await file.read(_HEADER_SIZE)
+    await file.seek(0)
+    return image_processor.has_image_signature(header, file.filename or "")
+
+
+def _new_upload_path(filename: str) -> Tuple[str, str]:
+    """Return a unique (filename, path) in the upload directory, keeping the extension."""
+    unique_filename = f"{secrets.token_hex(16)}{os.path.splitext(filename)[1]}"
+    return unique_filename, f"{_UPLOAD_PREFIX}{unique_filename}"
+
+
+def _decode_upload(
+    image_processor: ImageProcessor,
+    data: bytes,
+    filename: str
+) -> Tuple[bool, Optional[torch.Tensor], Optional[Dict]]:
+    """
+    Validate and decode an upload in memory.
+    
+    Runs on the preprocessing pool. The decoded tensor goes straight to the
+    model, so the saved copy is never read back.
+    
+    Returns:
+        Tuple of (is_valid, image tensor or None, dicom metadata or None)
+    """
+    decoded = image_processor.decode_bytes(data, filename)
+    if decoded is None:
+        return False, None, None
+    image_tensor, dicom_metadata = decoded
+    return True, image_tensor, dicom_metadata
+
+
+def _save_predictions(
+    db: Session,
+    prediction_service: PredictionService,
+    predictions_data: List[PredictionCreate]
+) -> List[PredictionResponse]:
+    """
+    Insert a batch of predictions and build their responses in one transaction.
+    
+    Responses are built from the rows returned by the INSERT before
+    committing, so the committed rows do not have to be read back. Uses the
+    blocking Session, so it is run on the threadpool. Rolls back and
+    re-raises on failure.
+    """
+    try:
+        db_predictions = prediction_service.create_predictions_batch(db, predictions_data, commit=False)
+        responses = [PredictionResponse.model_validate(db_prediction) for db_prediction in db_predictions]
+        db.commit()
+        return responses
+    except Exception:
+        db.rollback()
+        raise
+
+
 @router.post("/predict", response_model=PredictionResponse, status_code=status.HTTP_201_CREATED)
 @inject
 async def predict_chest_xray(
@@ -36,90 +127,184 @@ async def predict_chest_xray(
     Supports standard image formats (PNG, JPEG) and DICOM files (.dcm).
     DICOM metadata is extracted and stored (HIPAA-compliant, no PHI).
     """
-    logger.info(f"Received prediction request for file: {file.filename}")
+    logger.info("Received prediction request for file: %s", file.filename)
     
     # Validate file type (support both images and DICOM)
-    is_dicom = file.filename.lower().endswith('.dcm') if file.filename else False
-    if not is_dicom and not file.content_type.startswith("image/"):
-        logger.warning(f"Invalid file type received: {file.content_type} for file {file.filename}")
+    _, is_dicom, is_image = classify_upload(file)
+    if not is_dicom and not is_image:
+        logger.warning("Invalid file type received: %s for file %s", file.content_type, file.filename)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File must be an image (PNG/JPEG) or DICOM (.dcm) file"
         )
     
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(settings.upload_dir, unique_filename)
+    # Reject content that is not PNG/JPEG/DICOM before it touches the disk
+    if not await _has_image_signature(file, image_processor):
+        logger.warning("Unrecognized file signature for: %s", file.filename)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid image format. Please upload PNG or JPEG"
+        )
     
-    logger.debug(f"Generated unique filename: {unique_filename}")
+    # Read the upload once; validation, metadata and inference all use this copy
+    try:
+        data = await read_upload_file(file, settings.max_upload_size)
+    except ValueError as e:
+        logger.warning("Upload too large: %s", file.filename)
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=str(e)
+        )
     
-    # Save uploaded file
+    # Validate and decode image in memory
+    logger.debug("Validating image: %s", file.filename)
+    loop = asyncio.get_running_loop()
     try:
-        os.makedirs(settings.upload_dir, exist_ok=True)
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        logger.info(f"File saved successfully to: {file_path}")
+        is_valid, image_tensor, dicom_metadata = await loop.run_in_executor(
+            _preprocess_pool, _decode_upload, image_processor, data, file.filename
+        )
     except Exception as e:
-        logger.error(f"Error saving file {file.filename}: {str(e)}", exc_info=True)
+        logger.error("Prediction error for %s: %s", file.filename, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error saving file: {str(e)}"
+            detail=f"Prediction error: {str(e)}"
         )
-    
-    # Validate image
-    logger.debug(f"Validating image: {unique_filename}")
-    if not image_processor.validate_image(file_path):
-        logger.warning(f"Image validation failed for: {unique_filename}")
-        os.remove(file_path)
+    if not is_valid:
+        logger.warning("Image validation failed for: %s", file.filename)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid image format. Please upload PNG or JPEG"
         )
+    if dicom_metadata:
+        logger.debug("Extracted DICOM metadata for: %s", file.filename)
+    
+    # Generate unique filename
+    unique_filename, file_path = _new_upload_path(file.filename)
+    
+    logger.debug("Generated unique filename: %s", unique_filename)
+    
+    # Save the upload while the model runs; inference never waits on the disk
+    logger.info("Running model inference for: %s", unique_filename)
+    await file.seek(0)
+    saved, outcome = await asyncio.gather(
+        save_upload_file(file, file_path),
+        loop.run_in_executor(_inference_pool, model_inference.predict_tensor, image_tensor),
+        return_exceptions=True
+    )
+    if isinstance(saved, Exception):
+        logger.error("Error saving file %s: %s", file.filename, saved, exc_info=saved)
+        await remove_files([file_path])
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error saving file: {str(saved)}"
+        )
+    logger.info("File saved successfully to: %s", file_path)
     
-    # Make prediction and extract DICOM metadata if applicable
+    # Build and store the prediction record
     try:
-        logger.info(f"Processing image for prediction: {unique_filename}")
+        if isinstance(outcome, Exception):
+            raise outcome
+        pred_class, confidence, proc_time, all_probs = outcome
         
-        # Process image with metadata extraction
-        image_tensor, dicom_metadata = image_processor.process_image_with_metadata(file_path)
-        if dicom_metadata:
-            logger.debug(f"Extracted DICOM metadata for: {unique_filename}")
+        logger.info("Prediction completed - Class: %s, Confidence: %.4f, Time: %.3fs", pred_class, confidence, proc_time)
         
-        # Run inference
-        logger.info(f"Running model inference for: {unique_filename}")
-        pred_class, confidence, proc_time, all_probs = model_inference.predict(file_path)
-        
-        logger.info(f"Prediction completed - Class: {pred_class}, Confidence: {confidence:.4f}, Time: {proc_time:.3f}s")
-        
-        # Create prediction record
-        prediction_data = PredictionCreate(
+        # Create prediction record. Every field comes straight from the model
+        # and the decoder, so skip re-validation.
+        prediction_data = PredictionCreate.model_construct(
             image_filename=unique_filename,
             model_name="chest_xray_v1",
             prediction_class=pred_class,
             confidence_score=confidence,
             processing_time=proc_time,
-            prediction_metadata=json.dumps(all_probs),
-            dicom_metadata=json.dumps(dicom_metadata) if dicom_metadata else None
+            prediction_metadata=dumps_json(all_probs),
+            dicom_metadata=dumps_json(dicom_metadata) if dicom_metadata else None
         )
         
-        db_prediction = prediction_service.create_prediction(db, prediction_data)
-        logger.info(f"Prediction record saved to database with ID: {db_prediction.id}")
+        db_prediction = await run_in_threadpool(
+            prediction_service.create_prediction, db, prediction_data
+        )
+        logger.info("Prediction record saved to database with ID: %s", db_prediction.id)
         
         return db_prediction
         
     except Exception as e:
-        logger.error(f"Prediction error for {unique_filename}: {str(e)}", exc_info=True)
+        logger.error("Prediction error for %s: %s", unique_filename, e, exc_info=True)
         # Clean up file on error
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            logger.debug(f"Cleaned up file after error: {file_path}")
+        await remove_files([file_path])
+        logger.debug("Cleaned up file after error: %s", file_path)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Prediction error: {str(e)}"
         )
 
+async def _prepare_one(
+    file: UploadFile,
+    idx: int,
+    total: int,
+    semaphore: asyncio.Semaphore,
+    image_processor: ImageProcessor
+) -> Tuple[Optional[str], Optional[str], Optional[torch.Tensor], Optional[dict]]:
+    """
+    Validate, preprocess and save one file of a batch.
+    
+    Classification happens afterwards in a single forward pass over every
+    file that was prepared successfully.
+    
+    Returns:
+        Tuple of (saved file path, unique filename, image tensor, error dict).
+        On failure the tensor is None and the error dict names the file.
+    """
+    async with semaphore:
+        logger.debug("Processing file %d/%d: %s", idx + 1, total, file.filename)
+        file_path = None
+        try:
+            # Validate file type
+            if not classify_upload(file)[2]:
+                logger.warning("Invalid file type in batch: %s (%s)", file.filename, file.content_type)
+                return None, None, None, {
+                    "filename": file.filename,
+                    "error": "File must be an image"
+                }
+            
+            # Reject content that is not PNG/JPEG before it touches the disk
+            if not await _has_image_signature(file, image_processor):
+                logger.warning("Unrecognized file signature in batch: %s", file.filename)
+                return None, None, None, {
+                    "filename": file.filename,
+                    "error": "Invalid image format. Please upload PNG or JPEG"
+                }
+            
+            # Validate and decode in memory; only valid images are saved
+            data = await read_upload_file(file, settings.max_upload_size)
+            loop = asyncio.get_running_loop()
+            is_valid, image_tensor, _ = await loop.run_in_executor(
+                _preprocess_pool, _decode_upload, image_processor, data, file.filename
+            )
+            if not is_valid:
+                logger.warning("Image validation failed in batch: %s", file.filename)
+                return None, None, None, {
+                    "filename": file.filename,
+                    "error": "Invalid image format. Please upload PNG or JPEG"
+                }
+            
+            # Generate unique filename
+            unique_filename, file_path = _new_upload_path(file.filename)
+            
+            # Save uploaded file
+            await file.seek(0)
+            await save_upload_file(file, file_path)
+            return file_path, unique_filename, image_tensor, None
+            
+        except Exception as e:
+            logger.error("Error processing file %s in batch: %s", file.filename, e)
+            # Clean up file on error
+            if file_path:
+                await remove_files([file_path])
+            return None, None, None, {
+                "filename": file.filename,
+                "error": str(e)
+            }
+
 @router.post("/predict/batch", response_model=BatchPredictionResponse, status_code=status.HTTP_201_CREATED)
 @inject
 async def predict_chest_xray_batch(
@@ -135,18 +320,19 @@ async def predict_chest_xray_batch(
     Accepts up to 50 images at once. Returns summary statistics and individual predictions.
     Failed predictions are reported in the errors list without stopping the batch.
     """
-    logger.info(f"Received batch prediction request with {len(files)} files")
+    n_files = len(files)
+    logger.info("Received batch prediction request with %d files", n_files)
     
     # Validate batch size
-    if len(files) == 0:
+    if n_files == 0:
         logger.warning("Batch prediction request with no files")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No files provided"
         )
     
-    if len(files) > 50:
-        logger.warning(f"Batch prediction request exceeds limit: {len(files)} files")
+    if n_files > 50:
+        logger.warning("Batch prediction request exceeds limit: %d files", n_files)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Maximum 50 images allowed per batch"
@@ -156,87 +342,67 @@ async def predict_chest_xray_batch(
     successful_predictions = []
     failed_predictions = []
     predictions_data = []
-    saved_files = []
     
     logger.info("Starting batch processing...")
     
-    # Process each file
-    for idx, file in enumerate(files):
-        logger.debug(f"Processing file {idx + 1}/{len(files)}: {file.filename}")
-        file_path = None
+    # Prepare files concurrently, at most batch_concurrency at a time
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+    outcomes = await asyncio.gather(*[
+        _prepare_one(file, idx, n_files, semaphore, image_processor)
+        for idx, file in enumerate(files)
+    ])
+    
+    # Partition outcomes, keeping upload order. Only prepared files were
+    # saved to disk, so they are also the ones to clean up on failure
+    prepared = []
+    for file, (file_path, unique_filename, image_tensor, error) in zip(files, outcomes):
+        if error is not None:
+            failed_predictions.append(error)
+        else:
+            prepared.append((file, file_path, unique_filename, image_tensor))
+    
+    saved_files = [file_path for _, file_path, _, _ in prepared]
+    
+    # Classify every prepared image with one forward pass
+    if prepared:
+        loop = asyncio.get_running_loop()
         try:
-            # Validate file type
-            if not file.content_type.startswith("image/"):
-                logger.warning(f"Invalid file type in batch: {file.filename} ({file.content_type})")
-                failed_predictions.append({
-                    "filename": file.filename,
-                    "error": "File must be an image"
-                })
-                continue
-            
-            # Generate unique filename
-            file_extension = os.path.splitext(file.filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = os.path.join(settings.upload_dir, unique_filename)
-            
-            # Save uploaded file
-            os.makedirs(settings.upload_dir, exist_ok=True)
-            with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            
-            saved_files.append(file_path)
-            
-            # Validate image
-            if not image_processor.validate_image(file_path):
-                logger.warning(f"Image validation failed in batch: {file.filename}")
-                failed_predictions.append({
-                    "filename": file.filename,
-                    "error": "Invalid image format. Please upload PNG or JPEG"
-                })
-                continue
-            
-            # Make prediction
-            pred_class, confidence, proc_time, all_probs = model_inference.predict(file_path)
-            logger.debug(f"Batch prediction {idx + 1}: {pred_class} (confidence: {confidence:.4f})")
-            
-            # Create prediction data
-            prediction_data = PredictionCreate(
+            results, proc_time = await loop.run_in_executor(
+                _inference_pool, model_inference.predict_batch,
+                [image_tensor for _, _, _, image_tensor in prepared]
+            )
+        except Exception as e:
+            logger.error("Batched inference error: %s", e, exc_info=True)
+            for file, _, _, _ in prepared:
+                failed_predictions.append({"filename": file.filename, "error": str(e)})
+            await remove_files(saved_files)
+            results, proc_time = [], 0.0
+        
+        # Each record is charged its share of the batched forward pass. The
+        # fields are produced locally, so skip re-validation.
+        proc_time = proc_time / len(prepared)
+        for (_, _, unique_filename, _), (pred_class, confidence, all_probs) in zip(prepared, results):
+            predictions_data.append(PredictionCreate.model_construct(
                 image_filename=unique_filename,
                 model_name="chest_xray_v1",
                 prediction_class=pred_class,
                 confidence_score=confidence,
                 processing_time=proc_time,
-                prediction_metadata=json.dumps(all_probs)
-            )
-            
-            predictions_data.append(prediction_data)
-            
-        except Exception as e:
-            logger.error(f"Error processing file {file.filename} in batch: {str(e)}")
-            failed_predictions.append({
-                "filename": file.filename,
-                "error": str(e)
-            })
-            # Clean up file on error
-            if file_path and os.path.exists(file_path):
-                os.remove(file_path)
-                if file_path in saved_files:
-                    saved_files.remove(file_path)
+                prediction_metadata=dumps_json(all_probs)
+            ))
     
     # Save all successful predictions to database in batch
     if predictions_data:
         try:
-            logger.info(f"Saving {len(predictions_data)} predictions to database...")
-            db_predictions = prediction_service.create_predictions_batch(db, predictions_data)
-            successful_predictions = db_predictions
-            logger.info(f"Successfully saved {len(db_predictions)} predictions to database")
+            logger.info("Saving %d predictions to database...", len(predictions_data))
+            successful_predictions = await run_in_threadpool(
+                _save_predictions, db, prediction_service, predictions_data
+            )
+            logger.info("Successfully saved %d predictions to database", len(successful_predictions))
         except Exception as e:
-            logger.error(f"Database error during batch save: {str(e)}", exc_info=True)
+            logger.error("Database error during batch save: %s", e, exc_info=True)
             # Clean up all saved files on database error
-            for file_path in saved_files:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+            await remove_files(saved_files)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Database error: {str(e)}"
@@ -244,10 +410,13 @@ async def predict_chest_xray_batch(
     
     total_processing_time = time.time() - batch_start_time
     
-    logger.info(f"Batch processing completed - Total: {len(files)}, Successful: {len(successful_predictions)}, Failed: {len(failed_predictions)}, Time: {total_processing_time:.2f}s")
+    logger.info(
+        "Batch processing completed - Total: %d, Successful: %d, Failed: %d, Time: %.2fs",
+        n_files, len(successful_predictions), len(failed_predictions), total_processing_time
+    )
     
     return BatchPredictionResponse(
-        total_images=len(files),
+        total_images=n_files,
         successful=len(successful_predictions),
         failed=len(failed_predictions),
         total_processing_time=total_processing_time,
@@ -257,14 +426,14 @@ async def predict_chest_xray_batch(
 
 @router.get("/predictions", response_model=List[PredictionResponse])
 @inject
-async def get_all_predictions(
+def get_all_predictions(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     prediction_service: PredictionService = Depends(Provide[Container.prediction_service])
 ):
     """Get all predictions with pagination"""
-    logger.info(f"Retrieving predictions (skip={skip}, limit={limit})")
+    logger.info("Retrieving predictions (skip=%s, limit=%s)", skip, limit)
     predictions = prediction_service.get_predictions(db, skip=skip, limit=limit)
-    logger.info(f"Retrieved {len(predictions)} predictions from database")
+    logger.info("Retrieved %d predictions from database", len(predictions))
     return predictions
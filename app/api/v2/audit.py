@@ -7,7 +7,8 @@ Provides admin access to audit logs, statistics, and CSV export.
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -18,7 +19,6 @@ from app.schemas.audit import (
     AuditLogStats,
     AuditLogListResponse,
 )
-from app.schemas.auth import MessageResponse
 
 router = APIRouter()
 audit_service = AuditService()
@@ -30,15 +30,21 @@ def get_current_user():
         detail="Authentication middleware not yet implemented"
     )
 
-def get_client_info(request: Request) -> tuple:
-    ip = request.client.host if request.client else None
-    ua = request.headers.get("user-agent")
-    return ip, ua
+def _list_response(logs, total: int, skip: int, limit: int, cursor: Optional[int]) -> AuditLogListResponse:
+    """Build a page of logs; a full page links to the next one by cursor."""
+    return AuditLogListResponse(
+        logs=logs,
+        total=total,
+        page=None if cursor is not None else skip // limit + 1,
+        page_size=limit,
+        next_cursor=logs[-1].id if len(logs) == limit else None,
+    )
 
 @router.get("/", response_model=AuditLogListResponse)
 def list_audit_logs(
-    skip: int = 0,
-    limit: int = 50,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = Query(None, ge=1, description="next_cursor of the previous page"),
     user_id: Optional[int] = Query(None),
     action: Optional[str] = Query(None),
     resource: Optional[str] = Query(None),
@@ -50,6 +56,9 @@ def list_audit_logs(
 ):
     """
     List audit logs with optional filtering (admin only).
+    
+    Pass the previous page's next_cursor as cursor to page through deep
+    history at constant cost; skip is ignored when a cursor is given.
     """
     filter_params = AuditLogFilter(
         user_id=user_id,
@@ -59,31 +68,22 @@ def list_audit_logs(
         start_date=start_date,
         end_date=end_date,
     )
-    logs, total = audit_service.get_logs(db, skip, limit, filter_params)
-    return AuditLogListResponse(
-        logs=logs,
-        total=total,
-        page=skip // limit + 1,
-        page_size=limit,
-    )
+    logs, total = audit_service.get_logs(db, skip, limit, filter_params, before_id=cursor)
+    return _list_response(logs, total, skip, limit, cursor)
 
 @router.get("/me", response_model=AuditLogListResponse)
 def my_audit_logs(
-    skip: int = 0,
-    limit: int = 50,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = Query(None, ge=1, description="next_cursor of the previous page"),
     db: Session = Depends(get_db),
     user = Depends(get_current_user)  # placeholder
 ):
     """
     Retrieve audit logs for the currently authenticated user.
     """
-    logs, total = audit_service.get_user_logs(db, user.id, skip, limit)
-    return AuditLogListResponse(
-        logs=logs,
-        total=total,
-        page=skip // limit + 1,
-        page_size=limit,
-    )
+    logs, total = audit_service.get_user_logs(db, user.id, skip, limit, before_id=cursor)
+    return _list_response(logs, total, skip, limit, cursor)
 
 @router.get("/stats", response_model=AuditLogStats)
 def get_stats(
@@ -95,7 +95,7 @@ def get_stats(
     """
     return audit_service.get_stats(db)
 
-@router.get("/export", response_model=MessageResponse)
+@router.get("/export", response_class=StreamingResponse)
 def export_logs(
     db: Session = Depends(get_db),
     admin = Depends(get_current_user)  # placeholder
@@ -103,18 +103,11 @@ def export_logs(
     """
     Export audit logs as CSV (admin only).
 
-    In a full implementation this would return a StreamingResponse.
-    Here we return a placeholder message.
+    The file is streamed in chunks as rows are read, so memory use and
+    time to first byte do not grow with the size of the audit table.
     """
-    csv_data = audit_service.export_logs_csv(db)
-    # Placeholder: in production you would stream `csv_data` back to the client.
-    return MessageResponse(message="CSV export generated (placeholder)")
-    """
-    Export audit logs as CSV (admin only).
-
-    In a full implementation this would return a StreamingResponse.
-    Here we return a placeholder message.
-    """
-    csv_data = audit_service.export_logs_csv(db)
-    # Placeholder: in production you would stream `csv_data` back to the client.
-    return MessageResponse(message="CSV export generated (placeholder)")
+    return StreamingResponse(
+        audit_service.iter_logs_csv(db),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=audit_logs.csv"}
+    )
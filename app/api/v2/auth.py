@@ -3,6 +3,10 @@ Authentication API endpoints (v2).
 
 Handles user registration, login, logout, token refresh,
 2FA setup, and Google OAuth authentication.
+
+Routes that hash or verify passwords or query the database are plain
+``def`` functions, so FastAPI runs them in its threadpool rather than
+blocking the event loop for the duration of an Argon2 hash.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
@@ -10,8 +14,8 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.services.auth_service import AuthService
-from app.services.audit_service import AuditService
-from app.api.dependencies import limiter
+from app.services.audit_queue import audit_writer
+from app.api.dependencies import ClientInfo, client_info, limiter
 from app.schemas.auth import (
     UserRegister,
     UserLogin,
@@ -33,20 +37,14 @@ router = APIRouter()
 
 # Service instances (will be replaced with DI in Phase 6)
 auth_service = AuthService()
-audit_service = AuditService()
-
-
-def get_client_info(request: Request) -> tuple:
-    """Extract client IP and user agent from request."""
-    ip_address = request.client.host if request.client else None
-    user_agent = request.headers.get("user-agent")
-    return ip_address, user_agent
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(
-    user_data: UserRegister,
+@limiter.limit("3/minute")
+def register(
     request: Request,
+    user_data: UserRegister,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db)
 ):
     """
@@ -63,56 +61,41 @@ async def register(
     - At least one special character
     """
     try:
-        ip_address, user_agent = get_client_info(request)
-        
         # Register user
         user = auth_service.register_user(db, user_data)
         
         # Log successful registration
-        audit_service.log_action(
+        audit_writer.submit(
             db,
-            AuditLogCreate(
+            AuditLogCreate.model_construct(
                 user_id=user.id,
                 action="register",
                 resource="auth",
                 resource_id=str(user.id),
                 status="success",
                 details=f"User registered: {user.username}",
-                ip_address=ip_address,
-                user_agent=user_agent
+                ip_address=client.ip,
+                user_agent=client.ua
             )
         )
         
-        logger.info(f"User registered successfully: {user.username}")
+        logger.info("User registered successfully: %s", user.username)
         
-        # Return user data with roles
-        return UserResponse(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            full_name=user.full_name,
-            is_active=user.is_active,
-            is_superuser=user.is_superuser,
-            oauth_provider=user.oauth_provider,
-            is_2fa_enabled=user.is_2fa_enabled,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            last_login=user.last_login,
-            roles=user.roles
-        )
+        # Return user data with roles, read straight from the ORM object
+        return UserResponse.model_validate(user)
         
     except HTTPException as e:
         # Log failed registration
-        audit_service.log_action(
+        audit_writer.submit(
             db,
-            AuditLogCreate(
+            AuditLogCreate.model_construct(
                 user_id=None,
                 action="register",
                 resource="auth",
                 status="failure",
                 details=f"Registration failed: {e.detail}",
-                ip_address=get_client_info(request)[0],
-                user_agent=get_client_info(request)[1]
+                ip_address=client.ip,
+                user_agent=client.ua
             )
         )
         raise
@@ -120,9 +103,10 @@ async def register(
 
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("5/minute")
-async def login(
+def login(
     request: Request,
     credentials: UserLogin,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db)
 ):
     """
@@ -132,26 +116,23 @@ async def login(
     If 2FA is enabled, returns 401 with message to use /login/2fa endpoint.
     """
     try:
-        ip_address, user_agent = get_client_info(request)
-        
         # Attempt login
-        tokens, requires_2fa = auth_service.login(
-            db, credentials, ip_address, user_agent
+        tokens, requires_2fa, user = auth_service.login(
+            db, credentials, client.ip, client.ua
         )
         
         if requires_2fa:
             # Log 2FA required
-            user = auth_service.authenticate_user(db, credentials.username, credentials.password)
-            audit_service.log_action(
+            audit_writer.submit(
                 db,
-                AuditLogCreate(
-                    user_id=user.id if user else None,
+                AuditLogCreate.model_construct(
+                    user_id=user.id,
                     action="login",
                     resource="auth",
                     status="success",
                     details="2FA required",
-                    ip_address=ip_address,
-                    user_agent=user_agent
+                    ip_address=client.ip,
+                    user_agent=client.ua
                 )
             )
             
@@ -161,44 +142,45 @@ async def login(
             )
         
         # Log successful login
-        user = auth_service.authenticate_user(db, credentials.username, credentials.password)
-        audit_service.log_action(
+        audit_writer.submit(
             db,
-            AuditLogCreate(
-                user_id=user.id if user else None,
+            AuditLogCreate.model_construct(
+                user_id=user.id,
                 action="login",
                 resource="auth",
                 status="success",
                 details="Login successful",
-                ip_address=ip_address,
-                user_agent=user_agent
+                ip_address=client.ip,
+                user_agent=client.ua
             )
         )
         
-        logger.info(f"User logged in: {credentials.username}")
+        logger.info("User logged in: %s", credentials.username)
         return tokens
         
     except HTTPException as e:
         # Log failed login
-        audit_service.log_action(
+        audit_writer.submit(
             db,
-            AuditLogCreate(
+            AuditLogCreate.model_construct(
                 user_id=None,
                 action="login",
                 resource="auth",
                 status="failure",
                 details=f"Login failed: {e.detail}",
-                ip_address=get_client_info(request)[0],
-                user_agent=get_client_info(request)[1]
+                ip_address=client.ip,
+                user_agent=client.ua
             )
         )
         raise
 
 
 @router.post("/login/2fa", response_model=TokenResponse)
-async def login_2fa(
-    credentials: UserLogin2FA,
+@limiter.limit("5/minute")
+def login_2fa(
     request: Request,
+    credentials: UserLogin2FA,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db)
 ):
     """
@@ -208,43 +190,40 @@ async def login_2fa(
     Requires username, password, and 6-digit TOTP code.
     """
     try:
-        ip_address, user_agent = get_client_info(request)
-        
         # Login with 2FA
-        tokens = auth_service.login_with_2fa(
-            db, credentials, ip_address, user_agent
+        tokens, user = auth_service.login_with_2fa(
+            db, credentials, client.ip, client.ua
         )
         
         # Log successful 2FA login
-        user = auth_service.authenticate_user(db, credentials.username, credentials.password)
-        audit_service.log_action(
+        audit_writer.submit(
             db,
-            AuditLogCreate(
-                user_id=user.id if user else None,
+            AuditLogCreate.model_construct(
+                user_id=user.id,
                 action="login_2fa",
                 resource="auth",
                 status="success",
                 details="2FA login successful",
-                ip_address=ip_address,
-                user_agent=user_agent
+                ip_address=client.ip,
+                user_agent=client.ua
             )
         )
         
-        logger.info(f"User logged in with 2FA: {credentials.username}")
+        logger.info("User logged in with 2FA: %s", credentials.username)
         return tokens
         
     except HTTPException as e:
         # Log failed 2FA login
-        audit_service.log_action(
+        audit_writer.submit(
             db,
-            AuditLogCreate(
+            AuditLogCreate.model_construct(
                 user_id=None,
                 action="login_2fa",
                 resource="auth",
                 status="failure",
                 details=f"2FA login failed: {e.detail}",
-                ip_address=get_client_info(request)[0],
-                user_agent=get_client_info(request)[1]
+                ip_address=client.ip,
+                user_agent=client.ua
             )
         )
         raise
@@ -267,9 +246,10 @@ async def logout(
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(
-    token_data: TokenRefresh,
+@limiter.limit("20/minute")
+def refresh_token(
     request: Request,
+    token_data: TokenRefresh,
     db: Session = Depends(get_db)
 ):
     """
@@ -279,8 +259,6 @@ async def refresh_token(
     The old refresh token will be invalidated and a new one issued.
     """
     try:
-        ip_address, user_agent = get_client_info(request)
-        
         # Refresh tokens
         new_tokens = auth_service.refresh_access_token(db, token_data.refresh_token)
         
@@ -288,7 +266,7 @@ async def refresh_token(
         return new_tokens
         
     except HTTPException as e:
-        logger.warning(f"Token refresh failed: {e.detail}")
+        logger.warning("Token refresh failed: %s", e.detail)
         raise
 
 
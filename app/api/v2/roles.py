@@ -4,14 +4,17 @@ Role and permission API endpoints (v2).
 Provides CRUD operations for roles and management of Casbin permissions.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+import threading
 from typing import List
 
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
 from app.core.database import get_db
 from app.models.user import User
 from app.services.role_service import RoleService
-from app.services.audit_service import AuditService
+from app.services.audit_queue import audit_writer
 from app.core.container import Container
 from app.schemas.role import (
     RoleCreate,
@@ -27,36 +30,53 @@ from app.schemas.audit import AuditLogCreate
 
 router = APIRouter()
 role_service = Container.role_service()
-audit_service = Container.audit_service()
 
 # Authentication dependency imported from shared module
-from app.api.dependencies import get_current_user, require_active_user, require_permission
+from app.api.dependencies import (
+    ClientInfo,
+    client_info,
+    get_current_user,
+    limiter,
+    require_active_user,
+    require_permission,
+    user_or_ip_key,
+)
+
+# Validated role read responses, keyed by route and parameters. They do not
+# depend on the caller (permission checks still run on every request), so
+# entries are shared; every role mutation below clears them and the TTL
+# bounds staleness for roles changed outside these routes (e.g. seeding).
+ROLE_CACHE_TTL = 30
+_role_cache: TTLCache = TTLCache(maxsize=1024, ttl=ROLE_CACHE_TTL)
+_role_cache_lock = threading.Lock()
+
+
+def clear_role_cache() -> None:
+    """Drop all cached role responses."""
+    with _role_cache_lock:
+        _role_cache.clear()
 
-def get_client_info(request: Request) -> tuple:
-    ip = request.client.host if request.client else None
-    ua = request.headers.get("user-agent")
-    return ip, ua
 
 # ----- Role CRUD -----
 @router.post("/", response_model=RoleResponse, status_code=status.HTTP_201_CREATED)
 def create_role(
     role_data: RoleCreate,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin: User = Depends(require_permission("/api/v2/roles", "POST"))
 ):
     new_role = role_service.create_role(db, role_data)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    clear_role_cache()
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="create_role",
             resource="role",
             resource_id=str(new_role.id),
             status="success",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return new_role
@@ -68,8 +88,16 @@ def list_roles(
     db: Session = Depends(get_db),
     admin: User = Depends(require_permission("/api/v2/roles", "GET"))
 ):
+    key = ("list", skip, limit)
+    with _role_cache_lock:
+        cached = _role_cache.get(key)
+    if cached is not None:
+        return cached
     roles, total = role_service.list_roles(db, skip, limit)
-    return RoleListResponse(roles=roles, total=total)
+    response = RoleListResponse(roles=roles, total=total)
+    with _role_cache_lock:
+        _role_cache[key] = response
+    return response
 
 @router.get("/{role_id}", response_model=RoleResponse)
 def get_role(
@@ -77,31 +105,39 @@ def get_role(
     db: Session = Depends(get_db),
     admin: User = Depends(require_permission("/api/v2/roles/*", "GET"))
 ):
+    key = ("get", role_id)
+    with _role_cache_lock:
+        cached = _role_cache.get(key)
+    if cached is not None:
+        return cached
     role = role_service.get_role_by_id(db, role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
-    return role
+    response = RoleResponse.model_validate(role)
+    with _role_cache_lock:
+        _role_cache[key] = response
+    return response
 
 @router.put("/{role_id}", response_model=RoleResponse)
 def update_role(
     role_id: int,
     role_data: RoleUpdate,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin: User = Depends(require_permission("/api/v2/roles/*", "PUT"))
 ):
     updated = role_service.update_role(db, role_id, role_data)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    clear_role_cache()
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="update_role",
             resource="role",
             resource_id=str(role_id),
             status="success",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return updated
@@ -109,22 +145,22 @@ def update_role(
 @router.delete("/{role_id}", response_model=MessageResponse)
 def delete_role(
     role_id: int,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin: User = Depends(require_permission("/api/v2/roles/*", "DELETE"))
 ):
     role_service.delete_role(db, role_id)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    clear_role_cache()
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="delete_role",
             resource="role",
             resource_id=str(role_id),
             status="success",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return MessageResponse(message="Role deleted")
@@ -133,22 +169,21 @@ def delete_role(
 @router.post("/permissions", response_model=MessageResponse)
 def add_permission(
     perm: PermissionCreate,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin: User = Depends(require_permission("/api/v2/permissions", "POST"))
 ):
     role_service.add_permission(perm)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="add_permission",
             resource="permission",
             status="success",
             details=f"{perm.subject}:{perm.object}:{perm.action}",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return MessageResponse(message="Permission added")
@@ -156,28 +191,29 @@ def add_permission(
 @router.delete("/permissions", response_model=MessageResponse)
 def remove_permission(
     perm: PermissionCreate,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin: User = Depends(require_permission("/api/v2/permissions", "DELETE"))
 ):
     role_service.remove_permission(perm)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="remove_permission",
             resource="permission",
             status="success",
             details=f"{perm.subject}:{perm.object}:{perm.action}",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return MessageResponse(message="Permission removed")
 
 @router.post("/permissions/check", response_model=PermissionCheckResponse)
+@limiter.limit("60/second;1000/minute", key_func=user_or_ip_key)
 def check_permission(
+    request: Request,
     check: PermissionCheckRequest,
     db: Session = Depends(get_db),
     user: User = Depends(require_active_user)
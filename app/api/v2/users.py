@@ -8,13 +8,13 @@ Provides routes for:
 - Role assignment/removal
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
 from app.services.user_service import UserService
-from app.services.audit_service import AuditService
+from app.services.audit_queue import audit_writer
 from app.core.container import Container
 from app.schemas.user import (
     UserCreate,
@@ -28,46 +28,48 @@ from app.schemas.audit import AuditLogCreate
 
 router = APIRouter()
 user_service = Container.user_service()
-audit_service = Container.audit_service()
 
 # Placeholder for authentication dependency (to be implemented in Phase 5)
 # Authentication dependency imported from shared module
-from app.api.dependencies import get_current_user, require_active_user
-
-def get_client_info(request: Request) -> tuple:
-    ip = request.client.host if request.client else None
-    ua = request.headers.get("user-agent")
-    return ip, ua
+from app.api.dependencies import (
+    ClientInfo,
+    clear_token_cache,
+    client_info,
+    get_current_user,
+    require_active_user,
+)
 
 @router.get("/me", response_model=UserResponse)
 def read_current_user(
-    request: Request,
-    db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    """Return the profile of the authenticated user."""
-    return user_service.get_user_by_id(db, current_user.id)
+    """
+    Return the profile of the authenticated user.
+    
+    get_current_user already loaded the user with its roles, so no further
+    query is needed.
+    """
+    return current_user
 
 @router.put("/me", response_model=UserResponse)
 def update_current_user(
     user_data: UserUpdate,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """Update profile of the authenticated user."""
     updated = user_service.update_user(db, current_user.id, user_data)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=current_user.id,
             action="update_profile",
             resource="user",
             resource_id=str(current_user.id),
             status="success",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return updated
@@ -75,7 +77,7 @@ def update_current_user(
 @router.post("/me/change-password", response_model=MessageResponse)
 def change_password(
     pwd: PasswordChange,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
@@ -83,17 +85,17 @@ def change_password(
     user_service.change_password(
         db, current_user.id, pwd.current_password, pwd.new_password
     )
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    clear_token_cache(current_user.id)
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=current_user.id,
             action="change_password",
             resource="user",
             resource_id=str(current_user.id),
             status="success",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return MessageResponse(message="Password changed successfully")
@@ -114,23 +116,22 @@ def list_users(
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_user(
     user_data: UserCreate,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin = Depends(get_current_user)  # placeholder
 ):
     """Create a new user (admin)."""
     new_user = user_service.create_user(db, user_data, created_by=admin.id)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="create_user",
             resource="user",
             resource_id=str(new_user.id),
             status="success",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return new_user
@@ -151,23 +152,22 @@ def get_user(
 def update_user(
     user_id: int,
     user_data: UserUpdate,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin = Depends(get_current_user)  # placeholder
 ):
     """Update user (admin)."""
     updated = user_service.update_user(db, user_id, user_data)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="update_user",
             resource="user",
             resource_id=str(user_id),
             status="success",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return updated
@@ -175,23 +175,23 @@ def update_user(
 @router.delete("/{user_id}", response_model=MessageResponse)
 def delete_user(
     user_id: int,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin = Depends(get_current_user)  # placeholder
 ):
     """Delete user (admin)."""
     user_service.delete_user(db, user_id)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    clear_token_cache(user_id)
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="delete_user",
             resource="user",
             resource_id=str(user_id),
             status="success",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return MessageResponse(message="User deleted")
@@ -200,24 +200,23 @@ def delete_user(
 def assign_role(
     user_id: int,
     role: RoleAssignment,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin = Depends(get_current_user)  # placeholder
 ):
     """Assign a role to a user (admin)."""
     user_service.assign_role(db, user_id, role.role_name, assigned_by=admin.id)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="assign_role",
             resource="user",
             resource_id=str(user_id),
             status="success",
             details=f"Role {role.role_name}",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return MessageResponse(message="Role assigned")
@@ -226,24 +225,23 @@ def assign_role(
 def remove_role(
     user_id: int,
     role_name: str,
-    request: Request,
+    client: ClientInfo = Depends(client_info),
     db: Session = Depends(get_db),
     admin = Depends(get_current_user)  # placeholder
 ):
     """Remove a role from a user (admin)."""
     user_service.remove_role(db, user_id, role_name)
-    ip, ua = get_client_info(request)
-    audit_service.log_action(
+    audit_writer.submit(
         db,
-        AuditLogCreate(
+        AuditLogCreate.model_construct(
             user_id=admin.id,
             action="remove_role",
             resource="user",
             resource_id=str(user_id),
             status="success",
             details=f"Role {role_name}",
-            ip_address=ip,
-            user_agent=ua,
+            ip_address=client.ip,
+            user_agent=client.ua,
         ),
     )
     return MessageResponse(message="Role removed")
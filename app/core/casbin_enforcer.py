@@ -5,18 +5,189 @@ This module provides the Casbin enforcer for role-based access control,
 including methods to check permissions and manage policies.
 """
 
+import ast
 import os
-from typing import List, Optional
+import re
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Pattern, Sequence, Set, Tuple
 import casbin
+from casbin.util import SimpleEval
+from casbin.util.builtin_operators import KEY_MATCH2_PATTERN
+from casbin.util.rwlock import RWLockWrite
 from casbin_sqlalchemy_adapter import Adapter
-from sqlalchemy import create_engine
+from sqlalchemy.engine import create_engine
 
 from app.core.config import get_settings
+from app.core.database import engine as database_engine
 from app.core.logging_config import get_logger
 
 settings = get_settings()
 logger = get_logger(__name__)
 
+# Subjects naming a single user; policies should be granted to roles instead
+USER_SUBJECT_PATTERN = re.compile(r"user:\d+")
+
+# Policy reduced to what a check needs: (subject, compiled action, effect)
+_Rule = Tuple[str, Pattern, str]
+
+
+class _ParsedMatcherEnforcer(casbin.Enforcer):
+    """
+    pycasbin Enforcer that parses each matcher expression only once.
+    
+    pycasbin rebuilds its matcher evaluator, including an ast.parse of the
+    expression, on every enforce() call. The parse depends only on the
+    expression text, so it is cached here and a fresh evaluator is built
+    around it with that call's functions (role links may change between
+    calls). This cuts roughly a third off each uncached permission check.
+    """
+    
+    # Matcher text -> (rewritten expression, parsed AST)
+    _parsed_matchers: Dict[str, Tuple[str, ast.expr]] = {}
+    
+    def _get_expression(self, expr, functions=None):
+        parsed = self._parsed_matchers.get(expr)
+        if parsed is None:
+            evaluator = super()._get_expression(expr, functions)
+            self._parsed_matchers[expr] = (evaluator.expr, evaluator.ast_parsed_value)
+            return evaluator
+        # An empty expression skips the parse; the cached one is set below
+        evaluator = SimpleEval("", functions)
+        evaluator.expr, evaluator.ast_parsed_value = parsed
+        return evaluator
+
+
+class _BulkAdapter(Adapter):
+    """SQLAlchemy policy adapter that writes a batch of rules in one transaction."""
+    
+    def add_policies(self, sec, ptype, rules):
+        # Sorted so rows for the same subject are inserted together
+        with self._session_scope() as session:
+            for rule in sorted(rules):
+                self._save_policy_line(ptype, rule, session)
+
+
+class _PathNode:
+    """Trie node for one object path segment."""
+    
+    __slots__ = ("children", "param", "tail", "end")
+    
+    def __init__(self):
+        self.children: Dict[str, "_PathNode"] = {}
+        self.param: Optional["_PathNode"] = None
+        # Rules whose object ends here with `/*`, or ends exactly here
+        self.tail: List[_Rule] = []
+        self.end: List[_Rule] = []
+
+
+class _PolicyIndex:
+    """
+    Policies indexed by the `/`-separated segments of their object.
+    
+    pycasbin evaluates the matcher against every policy on each uncached
+    check. For this app's matcher the object test is a keyMatch2 path
+    pattern, so a request path is walked down a trie instead and only the
+    policies whose object can match it are checked, making a decision cost
+    grow with path depth rather than with the number of policies.
+    
+    Objects the trie cannot represent exactly (regex characters, `:` or
+    `*` inside a segment, `*` before the last segment) are kept aside and
+    tested with their keyMatch2 regex. That regex and each action's
+    regexMatch pattern are compiled once here, not per check. Models with
+    any other matcher or effect are not indexed.
+    """
+    
+    MATCHER = "g(r_sub, p_sub) && keyMatch2(r_obj, p_obj) && regexMatch(r_act, p_act)"
+    EFFECT = "some(where (p_eft == allow)) && !some(where (p_eft == deny))"
+    
+    # Segments keyMatch2 treats as plain text
+    _LITERAL = re.compile(r"[\w\-~]*")
+    
+    def __init__(self, policies: List[List[str]], grouping_policies: List[List[str]]):
+        self._root = _PathNode()
+        self._unindexed: List[Tuple[Pattern, _Rule]] = []
+        # Subjects named by a policy or assigned a role in Casbin
+        self.subjects: Set[str] = {policy[0] for policy in policies}
+        self.subjects.update(link[0] for link in grouping_policies)
+        for policy_subject, policy_object, policy_action, effect in policies:
+            # The effect only counts allow and deny rules
+            if effect in ("allow", "deny"):
+                self._add(policy_object, (policy_subject, re.compile(policy_action), effect))
+    
+    @classmethod
+    def supports(cls, model) -> bool:
+        """Whether decisions under model can be served from the index."""
+        return (
+            model["r"]["r"].tokens == ["r_sub", "r_obj", "r_act"]
+            and model["p"]["p"].tokens == ["p_sub", "p_obj", "p_act", "p_eft"]
+            and model["m"]["m"].value == cls.MATCHER
+            and model["e"]["e"].value == cls.EFFECT
+        )
+    
+    @staticmethod
+    def _key_match2_regex(policy_object: str) -> Pattern:
+        """Compile the regex keyMatch2 builds from a policy object."""
+        pattern = policy_object.replace("/*", "/.*")
+        pattern = KEY_MATCH2_PATTERN.sub(r"\g<1>[^\/]+\g<2>", pattern, 0)
+        if pattern == "*":
+            pattern = "(.*)"
+        return re.compile("^" + pattern + "$")
+    
+    def _add(self, policy_object: str, rule: _Rule):
+        segments = policy_object.split("/")
+        node = self._root
+        for i, segment in enumerate(segments):
+            if segment == "*" and i == len(segments) - 1 and i > 0:
+                node.tail.append(rule)
+                return
+            if self._LITERAL.fullmatch(segment):
+                node = node.children.setdefault(segment, _PathNode())
+            elif segment[:1] == ":" and len(segment) > 1 and self._LITERAL.fullmatch(segment[1:]):
+                if node.param is None:
+                    node.param = _PathNode()
+                node = node.param
+            else:
+                self._unindexed.append((self._key_match2_regex(policy_object), rule))
+                return
+        node.end.append(rule)
+    
+    def _candidates(self, path: str) -> List[_Rule]:
+        """Rules whose object pattern matches path."""
+        found = [rule for object_regex, rule in self._unindexed if object_regex.match(path)]
+        segments = path.split("/")
+        stack = [(self._root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if i == len(segments):
+                found.extend(node.end)
+                continue
+            found.extend(node.tail)
+            child = node.children.get(segments[i])
+            if child is not None:
+                stack.append((child, i + 1))
+            if node.param is not None and segments[i]:
+                stack.append((node.param, i + 1))
+        return found
+    
+    def enforce(self, role_manager, subjects: Sequence[str], path: str, action: str) -> bool:
+        """
+        Apply the model's matcher and effect to the candidate policies.
+        
+        A rule applies when any of subjects inherits from its subject, as
+        if the request came from one subject linked to all of them.
+        """
+        allowed = False
+        for policy_subject, action_regex, effect in self._candidates(path):
+            if not action_regex.match(action):
+                continue
+            if not any(role_manager.has_link(subject, policy_subject) for subject in subjects):
+                continue
+            if effect == "deny":
+                return False
+            allowed = True
+        return allowed
+
 
 class CasbinEnforcer:
     """
@@ -37,28 +208,105 @@ class CasbinEnforcer:
         self.model_path = model_path or "casbin/model.conf"
         self.policy_path = policy_path or "casbin/policy.csv"
         self.enforcer: Optional[casbin.Enforcer] = None
+        self._policy_listeners: List[Callable[[], None]] = []
+        # Checks share the read lock; policy and role changes take
+        # the write lock, as pycasbin's SyncedEnforcer does
+        rwlock = RWLockWrite()
+        self._read_lock = rwlock.gen_rlock()
+        self._write_lock = rwlock.gen_wlock()
+        # Bumped under the write lock by every policy change
+        self._policy_generation = 0
+        # Enforcement results by (generation, subjects, object, action).
+        # Users are keyed by role set alone unless Casbin has rules for
+        # them, so users with the same roles share entries. A check that
+        # read the old policies stores its result under the old generation,
+        # which is never looked up again; clearing on change frees the space.
+        self._enforce_cached = lru_cache(maxsize=settings.casbin_enforce_cache_size)(
+            self._enforce_uncached
+        )
+        self.on_policy_change(self._enforce_cached.cache_clear)
+        # Built on first use after each policy change
+        self._policy_index: Optional[_PolicyIndex] = None
+        self._policy_index_lock = threading.Lock()
+    
+    @property
+    def policy_generation(self) -> int:
+        """
+        Counter advanced by every policy change.
+        
+        Callers caching decisions read it before a check and store the
+        result only if it is unchanged afterwards.
+        """
+        return self._policy_generation
+    
+    def on_policy_change(self, callback: Callable[[], None]):
+        """
+        Register a callback to run after any policy change.
+        
+        Fires on policy and role assignment changes, on `reload_policy` and
+        on (re-)initialization, so caches derived from enforcement results
+        are invalidated in one place rather than at every call site.
+        
+        Args:
+            callback: Function taking no arguments
+        """
+        self._policy_listeners.append(callback)
+    
+    def _mark_policy_changed(self):
+        """
+        Start a new policy generation; call with the write lock held.
+        
+        The path index is dropped here rather than by a listener so no
+        check can read the old index once the write lock is released.
+        """
+        self._policy_generation += 1
+        self._drop_policy_index()
+    
+    def _notify_policy_change(self):
+        """Run all registered policy change callbacks."""
+        for callback in self._policy_listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Policy change callback failed: {e}", exc_info=True)
         
     def initialize(self):
         """
         Initialize the Casbin enforcer.
         
-        Loads the model and policies from files.
+        Loads the model, then the policies from the `casbin_rule` table of
+        `casbin_policy_db_url` or, by default, the application database.
+        An empty table is seeded once from the CSV policy file, if present.
         """
         try:
             # Check if model file exists
             if not os.path.exists(self.model_path):
                 raise FileNotFoundError(f"Casbin model file not found: {self.model_path}")
             
-            # For development, use file adapter (CSV)
-            # For production, consider using database adapter
-            if os.path.exists(self.policy_path):
-                self.enforcer = casbin.Enforcer(self.model_path, self.policy_path)
-                logger.info(f"✓ Casbin enforcer initialized with CSV adapter")
+            if settings.casbin_policy_db_url:
+                # SQLAlchemy's own factory: the app.core.database wrapper
+                # would create the application tables here as well
+                policy_engine = create_engine(settings.casbin_policy_db_url)
             else:
-                # Initialize with empty policy
-                self.enforcer = casbin.Enforcer(self.model_path)
-                logger.warning(f"Casbin policy file not found: {self.policy_path}")
-                logger.info("✓ Casbin enforcer initialized with empty policy")
+                policy_engine = database_engine
+            self.enforcer = _ParsedMatcherEnforcer(self.model_path, _BulkAdapter(policy_engine))
+            # Each change is written as one row; nothing rewrites the table
+            self.enforcer.enable_auto_save(True)
+            logger.info("✓ Casbin enforcer initialized with database adapter")
+            
+            if (
+                not self.enforcer.get_policy()
+                and not self.enforcer.get_grouping_policy()
+                and os.path.exists(self.policy_path)
+            ):
+                self._import_policy_file()
+            
+            # Role links are built once by the load above and then updated
+            # incrementally by pycasbin on role assignment changes; only
+            # `reload_policy` rebuilds them in full.
+            with self._write_lock:
+                self._mark_policy_changed()
+            self._notify_policy_change()
             
             logger.info(f"Loaded {len(self.enforcer.get_policy())} policies")
             logger.info(f"Loaded {len(self.enforcer.get_grouping_policy())} role assignments")
@@ -67,6 +315,20 @@ class CasbinEnforcer:
             logger.error(f"Failed to initialize Casbin enforcer: {e}", exc_info=True)
             raise
     
+    def _import_policy_file(self):
+        """Copy the CSV policy file into the (empty) policy table."""
+        csv_enforcer = casbin.Enforcer(self.model_path, self.policy_path)
+        policies = csv_enforcer.get_policy()
+        roles = csv_enforcer.get_grouping_policy()
+        if policies:
+            self.enforcer.add_policies(policies)
+        if roles:
+            self.enforcer.add_grouping_policies(roles)
+        logger.info(
+            "Imported %d policies and %d role assignments from %s",
+            len(policies), len(roles), self.policy_path
+        )
+    
     def enforce(self, subject: str, object: str, action: str) -> bool:
         """
         Check if a subject has permission to perform action on object.
@@ -84,13 +346,53 @@ class CasbinEnforcer:
             return False
         
         try:
-            result = self.enforcer.enforce(subject, object, action)
-            logger.debug(f"Permission check: {subject} -> {object} [{action}] = {result}")
-            return result
+            return self._enforce_subjects(self._policy_generation, (subject,), object, action)
         except Exception as e:
             logger.error(f"Error checking permission: {e}", exc_info=True)
             return False
     
+    def _enforce_subjects(
+        self, generation: int, subjects: Tuple[str, ...], object: str, action: str
+    ) -> bool:
+        """Cached check for a request made on behalf of all of subjects."""
+        result = self._enforce_cached(generation, subjects, object, action)
+        logger.debug("Permission check: %s -> %s [%s] = %s", subjects, object, action, result)
+        return result
+    
+    def _enforce_uncached(
+        self, generation: int, subjects: Tuple[str, ...], object: str, action: str
+    ) -> bool:
+        """
+        Evaluate the policy; errors propagate so they are never cached.
+        
+        generation is only part of the cache key. It is read before the
+        read lock is taken, so the policies evaluated are never older
+        than it.
+        """
+        with self._read_lock:
+            index = self._get_policy_index()
+            if index is None:
+                return any(self.enforcer.enforce(subject, object, action) for subject in subjects)
+            return index.enforce(self.enforcer.get_role_manager(), subjects, object, action)
+    
+    def _get_policy_index(self) -> Optional[_PolicyIndex]:
+        """Return the path index of the current policies, or None if the model is not supported."""
+        index = self._policy_index
+        if index is None and _PolicyIndex.supports(self.enforcer.model):
+            with self._policy_index_lock:
+                if self._policy_index is None:
+                    self._policy_index = _PolicyIndex(
+                        self.enforcer.get_policy(), self.enforcer.get_grouping_policy()
+                    )
+                index = self._policy_index
+        return index
+    
+    def _drop_policy_index(self):
+        """Discard the path index so the next check rebuilds it."""
+        # Taken so an index a concurrent check is building is not kept
+        with self._policy_index_lock:
+            self._policy_index = None
+    
     def check_permission(
         self,
         user_id: int,
@@ -101,6 +403,14 @@ class CasbinEnforcer:
         """
         Check if user has permission based on their roles.
         
+        Roles come from the database, so they are not Casbin grouping
+        policies. The roles are evaluated together in one pass over the
+        policies, with the matcher's `g(r.sub, p.sub)` applied to each of
+        them. `user:<id>` joins them only when Casbin has a policy or role
+        assignment for that user, so everyone else is keyed by role set
+        alone and shares cached results. Nothing is added to the role
+        manager per user.
+        
         Args:
             user_id: User ID
             roles: List of role names
@@ -110,27 +420,44 @@ class CasbinEnforcer:
         Returns:
             True if user has permission, False otherwise
         """
-        # Check direct user permission
-        user_subject = f"user:{user_id}"
-        if self.enforce(user_subject, resource, action):
-            return True
-        
-        # Check role permissions
-        for role in roles:
-            if self.enforce(role, resource, action):
-                return True
+        if not self.enforcer:
+            logger.error("Casbin enforcer not initialized")
+            return False
         
-        return False
+        try:
+            generation = self._policy_generation
+            subjects = tuple(sorted(set(roles)))
+            user_subject = f"user:{user_id}"
+            with self._read_lock:
+                index = self._get_policy_index()
+            if index is None or user_subject in index.subjects:
+                subjects = (user_subject,) + subjects
+            return self._enforce_subjects(generation, subjects, resource, action)
+        except Exception as e:
+            logger.error(f"Error checking permission: {e}", exc_info=True)
+            return False
     
-    def add_policy(self, subject: str, object: str, action: str, effect: str = "allow") -> bool:
+    def add_policy(
+        self,
+        subject: str,
+        object: str,
+        action: str,
+        effect: str = "allow",
+        override: bool = False
+    ) -> bool:
         """
         Add a new policy.
         
+        Policies are granted to roles. A `user:<id>` subject is rejected
+        unless override is set: per-user rules grow the policy set with the
+        user count, while users reach role policies through role links.
+        
         Args:
-            subject: Role or user
+            subject: Role (or user, with override)
             object: Resource path
             action: HTTP method
             effect: 'allow' or 'deny'
+            override: Allow a user-specific policy
             
         Returns:
             True if added successfully, False otherwise
@@ -138,10 +465,17 @@ class CasbinEnforcer:
         if not self.enforcer:
             return False
         
+        if not override and USER_SUBJECT_PATTERN.fullmatch(subject):
+            logger.warning("Rejected policy for user subject %s; grant it to a role", subject)
+            return False
+        
         try:
-            result = self.enforcer.add_policy(subject, object, action, effect)
+            with self._write_lock:
+                result = self.enforcer.add_policy(subject, object, action, effect)
+                if result:
+                    self._mark_policy_changed()
             if result:
-                self.save_policy()
+                self._notify_policy_change()
                 logger.info(f"Added policy: {subject} -> {object} [{action}] = {effect}")
             return result
         except Exception as e:
@@ -165,15 +499,52 @@ class CasbinEnforcer:
             return False
         
         try:
-            result = self.enforcer.remove_policy(subject, object, action, effect)
+            with self._write_lock:
+                result = self.enforcer.remove_policy(subject, object, action, effect)
+                if result:
+                    self._mark_policy_changed()
             if result:
-                self.save_policy()
+                self._notify_policy_change()
                 logger.info(f"Removed policy: {subject} -> {object} [{action}] = {effect}")
             return result
         except Exception as e:
             logger.error(f"Error removing policy: {e}", exc_info=True)
             return False
     
+    def add_policies(self, rules: List[Tuple[str, str, str, str]], override: bool = False) -> bool:
+        """
+        Add several policies in one database transaction.
+        
+        Nothing is added if any of the rules already exists or, without
+        override, has a `user:<id>` subject (see `add_policy`).
+        
+        Args:
+            rules: (subject, object, action, effect) tuples
+            override: Allow user-specific policies
+            
+        Returns:
+            True if added successfully, False otherwise
+        """
+        if not self.enforcer or not rules:
+            return False
+        
+        if not override and any(USER_SUBJECT_PATTERN.fullmatch(rule[0]) for rule in rules):
+            logger.warning("Rejected policies with user subjects; grant them to roles")
+            return False
+        
+        try:
+            with self._write_lock:
+                result = self.enforcer.add_policies([list(rule) for rule in rules])
+                if result:
+                    self._mark_policy_changed()
+            if result:
+                self._notify_policy_change()
+                logger.info("Added %d policies", len(rules))
+            return result
+        except Exception as e:
+            logger.error(f"Error adding policies: {e}", exc_info=True)
+            return False
+    
     def add_role_for_user(self, user: str, role: str) -> bool:
         """
         Assign a role to a user.
@@ -189,9 +560,12 @@ class CasbinEnforcer:
             return False
         
         try:
-            result = self.enforcer.add_grouping_policy(user, role)
+            with self._write_lock:
+                result = self.enforcer.add_grouping_policy(user, role)
+                if result:
+                    self._mark_policy_changed()
             if result:
-                self.save_policy()
+                self._notify_policy_change()
                 logger.info(f"Assigned role '{role}' to user '{user}'")
             return result
         except Exception as e:
@@ -213,15 +587,46 @@ class CasbinEnforcer:
             return False
         
         try:
-            result = self.enforcer.remove_grouping_policy(user, role)
+            with self._write_lock:
+                result = self.enforcer.remove_grouping_policy(user, role)
+                if result:
+                    self._mark_policy_changed()
             if result:
-                self.save_policy()
+                self._notify_policy_change()
                 logger.info(f"Removed role '{role}' from user '{user}'")
             return result
         except Exception as e:
             logger.error(f"Error removing role: {e}", exc_info=True)
             return False
     
+    def add_grouping_policies(self, rules: List[Tuple[str, str]]) -> bool:
+        """
+        Assign several roles in one database transaction.
+        
+        Nothing is added if any of the assignments already exists.
+        
+        Args:
+            rules: (user, role) tuples
+            
+        Returns:
+            True if added successfully, False otherwise
+        """
+        if not self.enforcer or not rules:
+            return False
+        
+        try:
+            with self._write_lock:
+                result = self.enforcer.add_grouping_policies([list(rule) for rule in rules])
+                if result:
+                    self._mark_policy_changed()
+            if result:
+                self._notify_policy_change()
+                logger.info("Assigned %d roles", len(rules))
+            return result
+        except Exception as e:
+            logger.error(f"Error assigning roles: {e}", exc_info=True)
+            return False
+    
     def get_roles_for_user(self, user: str) -> List[str]:
         """
         Get all roles assigned to a user.
@@ -295,7 +700,8 @@ class CasbinEnforcer:
             return False
         
         try:
-            self.enforcer.save_policy()
+            with self._read_lock:
+                self.enforcer.save_policy()
             return True
         except Exception as e:
             logger.error(f"Error saving policy: {e}", exc_info=True)
@@ -312,7 +718,10 @@ class CasbinEnforcer:
             return False
         
         try:
-            self.enforcer.load_policy()
+            with self._write_lock:
+                self.enforcer.load_policy()
+                self._mark_policy_changed()
+            self._notify_policy_change()
             logger.info("Policies reloaded successfully")
             return True
         except Exception as e:
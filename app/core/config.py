@@ -8,7 +8,7 @@ which automatically loads values from environment variables and .env files.
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from functools import lru_cache
-from typing import Optional
+from typing import List, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -25,9 +25,35 @@ class Settings(BaseSettings):
         host: Host address to bind the server
         port: Port number to bind the server
         database_url: Database connection string
+        db_pool_size: Database connections kept open for request handlers
+        db_max_overflow: Extra connections opened under load, closed when returned
+        db_pool_recycle: Seconds before a server database connection is replaced
+        threadpool_size: Worker threads for sync route handlers; keep at or
+            above db_pool_size + db_max_overflow so threads are not the bottleneck
         model_path: Path to the trained PyTorch model file
         upload_dir: Directory for storing uploaded images
         max_upload_size: Maximum file upload size in bytes
+        inference_workers: Threads used to run model inference off the event loop
+        amp_enabled: Run CUDA inference in reduced-precision autocast (ignored on CPU)
+        amp_dtype: Autocast precision, float16 or bfloat16 (bfloat16 needs Ampere or newer)
+        batch_concurrency: Files of a batch request processed at the same time
+        compile_model: Compile the classifier with torch.compile at startup
+            (slower start, less per-request Python overhead)
+        onnx_model_path: Exported ONNX classifier to serve with ONNX Runtime
+            instead of PyTorch (optional; requires onnxruntime)
+        warmup_batch_sizes: Batch sizes run through the models at startup on
+            CUDA, so cuDNN has tuned kernels for each (CPU warms one image)
+        audit_batch_size: Audit log entries written per background INSERT
+        audit_flush_interval_ms: Longest an audit log entry waits for its batch to fill
+        audit_queue_size: Audit log entries buffered before they are written inline
+        casbin_decision_cache_ttl: Seconds a Casbin permission decision is
+            reused; in-app policy and role changes invalidate it immediately
+        casbin_enforce_cache_size: Casbin (subject, resource, action) results
+            kept in memory; cleared on every policy change
+        casbin_policy_db_url: Database URL for the Casbin policy table;
+            defaults to database_url
+        rate_limit_storage_uri: Where rate limit counters are kept; use a
+            shared backend (e.g. redis://) with more than one worker
         api_key: API key for authentication (change in production!)
     """
     
@@ -40,13 +66,33 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: str = "sqlite:///./healthcare_ai.db"
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800
+    threadpool_size: int = 100
     
     # Model Configuration
     model_path: str = "./ml_models/chest_xray_model.pth"
     upload_dir: str = "./uploads"
     max_upload_size: int = 10485760  # 10MB in bytes
+    inference_workers: int = 2
+    amp_enabled: bool = True
+    amp_dtype: Literal["float16", "bfloat16"] = "float16"
+    batch_concurrency: int = 5
+    compile_model: bool = False
+    onnx_model_path: Optional[str] = None
+    warmup_batch_sizes: List[int] = [1, 8, 32, 50]
+    
+    # Audit Logging
+    audit_batch_size: int = 100
+    audit_flush_interval_ms: int = 200
+    audit_queue_size: int = 10000
     
     # Security
+    casbin_decision_cache_ttl: int = 60
+    casbin_enforce_cache_size: int = 65536
+    casbin_policy_db_url: Optional[str] = None
+    rate_limit_storage_uri: str = "memory://"
     api_key: str = "your-secret-api-key"
     secret_key: str = "super-secret-key"
     
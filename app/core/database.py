@@ -6,7 +6,9 @@ the database dependency for FastAPI endpoints.
 """
 
 import sqlalchemy
+from sqlalchemy import event
 from sqlalchemy import create_engine as _original_create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 
 # Base class for declarative models – must be defined before engine creation
@@ -32,15 +34,100 @@ from app.core.config import get_settings
 
 settings = get_settings()
 
+
+def _engine_options(database_url: str, pool_size: int, max_overflow: int) -> dict:
+    """
+    Build create_engine keyword arguments for a database URL.
+    
+    File and server databases get a sized connection pool; server
+    connections are also pinged on checkout and recycled before the
+    server drops them. In-memory SQLite keeps SQLAlchemy's default
+    single-connection pool, since every new connection would be a new,
+    empty database.
+    
+    Args:
+        database_url: Database connection string
+        pool_size: Connections kept open in the pool
+        max_overflow: Extra connections allowed under load
+    
+    Returns:
+        Keyword arguments for create_engine
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_pre_ping": True,
+            "pool_recycle": settings.db_pool_recycle,
+        }
+    options = {"connect_args": {"check_same_thread": False}}
+    if url.database not in (None, "", ":memory:"):
+        options.update(pool_size=pool_size, max_overflow=max_overflow)
+    return options
+
+
+# Run on every new connection to a SQLite file database
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _use_sqlite_wal(engine) -> None:
+    """
+    Switch connections to a SQLite file database to WAL mode.
+    
+    In WAL mode readers are not blocked by a writer, so request handlers
+    and the audit writer stop serializing on the database lock, and
+    synchronous=NORMAL is safe (a power loss may drop the latest commits
+    but cannot corrupt the file). Connections opened while the engine was
+    created are discarded so every pooled connection has the pragmas.
+    Other databases are left unchanged.
+    
+    Args:
+        engine: Engine to configure
+    """
+    if engine.url.get_backend_name() != "sqlite" or engine.url.database in (None, "", ":memory:"):
+        return
+    
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in _SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    
+    engine.dispose()
+
+
 # Create the main engine (tables are created here because Base is already defined)
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    **_engine_options(settings.database_url, settings.db_pool_size, settings.db_max_overflow)
 )
+_use_sqlite_wal(engine)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Background audit log writes use their own small pool so they never wait
+# for (or hold) a connection needed by a request handler. An in-memory
+# database cannot be shared across engines, so it keeps the main engine.
+if make_url(settings.database_url).database in (None, "", ":memory:"):
+    audit_engine = engine
+else:
+    audit_engine = create_engine(
+        settings.database_url,
+        **_engine_options(settings.database_url, pool_size=1, max_overflow=1)
+    )
+    _use_sqlite_wal(audit_engine)
+AuditSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=audit_engine)
+
 # Base class for declarative models – already defined above
 # (kept for clarity; no re‑definition needed)
 
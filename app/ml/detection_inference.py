@@ -6,6 +6,7 @@ inference to detect chest X-ray findings with bounding boxes.
 """
 
 import torch
+import threading
 import time
 import os
 from typing import List, Dict, Tuple, Optional
@@ -31,6 +32,8 @@ class DetectionInference:
         finding_types: List of detectable findings
         model_loaded: Whether model is successfully loaded
         use_mock_detections: Whether to use mock detections (demo mode)
+        use_amp: Whether inference runs under reduced-precision autocast
+        amp_dtype: Autocast dtype (float16 or bfloat16)
         
     Example:
         >>> detector = DetectionInference()
@@ -55,6 +58,12 @@ class DetectionInference:
         self.finding_types = ChestXRayDetector.FINDING_TYPES
         self.model_loaded = False
         self.use_mock_detections = True  # Default to mock for demo
+        self._load_lock = threading.Lock()
+        # Mixed precision only pays off (and is only supported well) on CUDA
+        self.use_amp = self.settings.amp_enabled and self.device.type == "cuda"
+        self.amp_dtype = getattr(torch, self.settings.amp_dtype)
+        # Page-locked batch buffers, one per inference worker thread
+        self._staging = threading.local()
         
         logger.info(f"Initializing DetectionInference on device: {self.device}")
         logger.debug(f"Confidence threshold: {confidence_threshold}")
@@ -115,6 +124,27 @@ class DetectionInference:
             self.model_loaded = False
             raise
     
+    def ensure_loaded(self) -> None:
+        """
+        Load the model on first use.
+        
+        Safe to call from several threads: concurrent cold-start requests
+        wait for a single load instead of each building the model.
+        
+        Raises:
+            RuntimeError: If the model could not be loaded
+        """
+        if self.model_loaded:
+            return
+        with self._load_lock:
+            if not self.model_loaded:
+                logger.warning("Detection model not loaded, attempting to load...")
+                self.load_model()
+        
+        if self.model is None:
+            logger.error("Detection model failed to load")
+            raise RuntimeError("Detection model failed to load")
+    
     def detect(
         self, 
         image_path: str
@@ -147,13 +177,7 @@ class DetectionInference:
             >>>     print(f"  - {det['finding_type']}: {det['confidence']:.2%}")
             >>>     print(f"    BBox: {det['bbox']}")
         """
-        if not self.model_loaded:
-            logger.warning("Detection model not loaded, attempting to load...")
-            self.load_model()
-        
-        if self.model is None:
-            logger.error("Detection model failed to load")
-            raise RuntimeError("Detection model failed to load")
+        self.ensure_loaded()
         
         logger.debug(f"Starting detection for image: {image_path}")
         start_time = time.time()
@@ -161,14 +185,9 @@ class DetectionInference:
         # Preprocess image
         logger.debug("Preprocessing image for detection...")
         image_tensor = self.processor.process_image(image_path)
-        image_tensor = image_tensor.to(self.device)
         
         # Run detection
-        logger.debug(f"Running detection inference (mock={self.use_mock_detections})...")
-        detections = self.model.detect(
-            image_tensor, 
-            return_mock=self.use_mock_detections
-        )
+        detections, _ = self.detect_from_tensor(image_tensor)
         
         processing_time = time.time() - start_time
         
@@ -176,6 +195,72 @@ class DetectionInference:
         
         return detections, processing_time
     
+    def detect_from_tensor(
+        self,
+        image_tensor: torch.Tensor
+    ) -> Tuple[List[Dict[str, any]], float]:
+        """
+        Detect findings in an already preprocessed image.
+        
+        Use this when the caller has decoded the image anyway (e.g. while
+        validating it) so the file is not read and decoded a second time.
+        
+        Args:
+            image_tensor: Preprocessed image [1, channels, height, width]
+            
+        Returns:
+            Tuple of (detections, processing_time) as returned by detect()
+            
+        Raises:
+            RuntimeError: If model is not loaded
+        """
+        self.ensure_loaded()
+        
+        start_time = time.time()
+        image_tensor = image_tensor.to(self.device)
+        logger.debug(f"Running detection inference (mock={self.use_mock_detections})...")
+        with self._autocast():
+            detections = self.model.detect(
+                image_tensor, 
+                return_mock=self.use_mock_detections
+            )
+        
+        return detections, time.time() - start_time
+    
+    def detect_batch_from_tensors(
+        self,
+        image_tensors: List[torch.Tensor]
+    ) -> Tuple[List[List[Dict[str, any]]], float]:
+        """
+        Detect findings in already preprocessed images with one forward pass.
+        
+        Args:
+            image_tensors: Preprocessed images, each [1, channels, height, width]
+            
+        Returns:
+            Tuple containing:
+                - batch_detections (list): List of detection lists (one per image)
+                - processing_time (float): Time for the forward pass
+                
+        Raises:
+            RuntimeError: If model is not loaded
+        """
+        self.ensure_loaded()
+        
+        if not image_tensors:
+            return [], 0.0
+        
+        start_time = time.time()
+        images_tensor = self._stack_batch(image_tensors).to(self.device, non_blocking=True)
+        logger.debug(f"Running batched detection inference (mock={self.use_mock_detections})...")
+        with self._autocast():
+            batch_detections = self.model.detect_batch(
+                images_tensor,
+                return_mock=self.use_mock_detections
+            )
+        
+        return batch_detections, time.time() - start_time
+    
     def detect_batch(
         self,
         image_paths: List[str]
@@ -183,6 +268,10 @@ class DetectionInference:
         """
         Detect findings in multiple chest X-ray images.
         
+        Images are preprocessed individually and stacked into one tensor so
+        the model runs a single forward pass for the whole batch. Images that
+        fail preprocessing get an empty detection list.
+        
         Args:
             image_paths: List of paths to image or DICOM files
             
@@ -194,32 +283,83 @@ class DetectionInference:
         Raises:
             RuntimeError: If model is not loaded
         """
-        if not self.model_loaded:
-            logger.warning("Detection model not loaded, attempting to load...")
-            self.load_model()
-        
-        if self.model is None:
-            logger.error("Detection model failed to load")
-            raise RuntimeError("Detection model failed to load")
+        self.ensure_loaded()
         
         logger.info(f"Starting batch detection for {len(image_paths)} images")
         start_time = time.time()
-        batch_detections = []
+        batch_detections = [[] for _ in image_paths]
         
+        # Preprocess every image, then run a single stacked forward pass
+        tensors = []
+        indices = []
         for idx, image_path in enumerate(image_paths):
             try:
-                logger.debug(f"Processing batch image {idx + 1}/{len(image_paths)}")
-                detections, _ = self.detect(image_path)
-                batch_detections.append(detections)
+                logger.debug(f"Preprocessing batch image {idx + 1}/{len(image_paths)}")
+                tensors.append(self.processor.process_image(image_path))
+                indices.append(idx)
             except Exception as e:
                 logger.error(f"Error processing {image_path}: {str(e)}")
-                batch_detections.append([])
+        
+        results, _ = self.detect_batch_from_tensors(tensors)
+        for idx, detections in zip(indices, results):
+            batch_detections[idx] = detections
         
         total_processing_time = time.time() - start_time
         logger.info(f"Batch detection completed in {total_processing_time:.3f}s")
         
         return batch_detections, total_processing_time
     
+    def warmup(self) -> None:
+        """
+        Run dummy forward passes through the detection model.
+        
+        Initializes the CUDA context and cuDNN kernels at startup so the first
+        real request does not pay for them. On CUDA every configured warm-up
+        batch size is run, as cuDNN tunes each input shape separately. Runs
+        the model even in mock mode.
+        """
+        self.ensure_loaded()
+        
+        size = self.processor.img_size
+        batch_sizes = sorted(set(self.settings.warmup_batch_sizes)) if self.device.type == "cuda" else [1]
+        with torch.inference_mode(), self._autocast():
+            for batch_size in batch_sizes:
+                self.model(torch.zeros(batch_size, 1, size, size, device=self.device))
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+        logger.debug("Detection model warm-up passes completed for batch sizes %s", batch_sizes)
+    
+    def _stack_batch(self, image_tensors: List[torch.Tensor]) -> torch.Tensor:
+        """
+        Stack preprocessed images into one batch tensor on the host.
+        
+        On CUDA the images are copied straight into a page-locked buffer so
+        the host-to-device transfer is a single asynchronous DMA. Pinning
+        memory is expensive, so each worker thread keeps its buffer and only
+        reallocates it when a larger batch arrives; the buffer is free for
+        reuse once the previous batch's detections were copied back to the
+        host.
+        """
+        if self.device.type != "cuda":
+            return torch.cat(image_tensors)
+        
+        first = image_tensors[0]
+        batch_size, sample_shape = len(image_tensors), first.shape[1:]
+        buffer = getattr(self._staging, "buffer", None)
+        if (
+            buffer is None
+            or buffer.shape[0] < batch_size
+            or buffer.shape[1:] != sample_shape
+            or buffer.dtype != first.dtype
+        ):
+            buffer = torch.empty((batch_size, *sample_shape), dtype=first.dtype, pin_memory=True)
+            self._staging.buffer = buffer
+        return torch.cat(image_tensors, out=buffer[:batch_size])
+    
+    def _autocast(self) -> torch.autocast:
+        """Autocast context for the forward pass, a no-op unless use_amp."""
+        return torch.autocast(self.device.type, dtype=self.amp_dtype, enabled=self.use_amp)
+    
     def set_confidence_threshold(self, threshold: float) -> None:
         """
         Update the confidence threshold for detections.
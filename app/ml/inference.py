@@ -6,9 +6,10 @@ performing inference on chest X-ray images.
 """
 
 import torch
+import threading
 import time
 import os
-from typing import Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional
 from app.ml.models.chest_xray_model import ChestXRayModel
 from app.ml.preprocessing.image_processor import ImageProcessor
 from app.core.config import get_settings
@@ -30,6 +31,9 @@ class ModelInference:
         processor: Image preprocessing pipeline
         classes: List of prediction classes
         model_loaded: Whether model is successfully loaded
+        use_amp: Whether inference runs under reduced-precision autocast
+        amp_dtype: Autocast dtype (float16 or bfloat16)
+        onnx_session: ONNX Runtime session serving the model, if configured
         
     Example:
         >>> inference = ModelInference()
@@ -46,6 +50,13 @@ class ModelInference:
         self.processor = ImageProcessor()
         self.classes = ["Normal", "Pneumonia", "COVID-19"]
         self.model_loaded = False
+        self._load_lock = threading.Lock()
+        # Mixed precision only pays off (and is only supported well) on CUDA
+        self.use_amp = self.settings.amp_enabled and self.device.type == "cuda"
+        self.amp_dtype = getattr(torch, self.settings.amp_dtype)
+        self.onnx_session = None
+        # Page-locked batch buffers, one per inference worker thread
+        self._staging = threading.local()
         
         logger.info(f"Initializing ModelInference on device: {self.device}")
         
@@ -87,6 +98,13 @@ class ModelInference:
             # Move model to device and set to evaluation mode
             self.model.to(self.device)
             self.model.eval()
+            if self.settings.onnx_model_path:
+                self._load_onnx_session(self.settings.onnx_model_path)
+            elif self.settings.compile_model:
+                # CUDA graphs ("reduce-overhead") only exist on CUDA
+                mode = "reduce-overhead" if self.device.type == "cuda" else "default"
+                self.model = torch.compile(self.model, mode=mode)
+                logger.info(f"Compiled classification model with torch.compile (mode={mode})")
             self.model_loaded = True
             logger.info(f"Model ready for inference on {self.device}")
             
@@ -95,6 +113,55 @@ class ModelInference:
             self.model_loaded = False
             raise
     
+    def ensure_loaded(self) -> None:
+        """
+        Load the model on first use.
+        
+        Safe to call from several threads: concurrent cold-start requests
+        wait for a single load (and compile) instead of each building the
+        model.
+        
+        Raises:
+            RuntimeError: If the model could not be loaded
+        """
+        if self.model_loaded:
+            return
+        with self._load_lock:
+            if not self.model_loaded:
+                logger.warning("Model not loaded, attempting to load...")
+                self.load_model()
+        
+        if self.model is None:
+            logger.error("Model failed to load")
+            raise RuntimeError("Model failed to load")
+    
+    def warmup(self) -> None:
+        """
+        Run dummy forward passes through the classification model.
+        
+        Initializes the CUDA context and cuDNN kernels at startup so the first
+        real request does not pay for them. cuDNN benchmarks each input shape
+        separately, so on CUDA every configured warm-up batch size is run. A
+        compiled model specializes on a batch of one and recompiles once with
+        a dynamic batch dimension, so both graphs are built here rather than
+        by the first batch request.
+        
+        Raises:
+            RuntimeError: If model is not loaded
+        """
+        if self.model is None:
+            raise RuntimeError("Model failed to load")
+        
+        size = self.processor.img_size
+        batch_sizes = set(self.settings.warmup_batch_sizes) if self.device.type == "cuda" else {1}
+        if self.settings.compile_model:
+            batch_sizes |= {1, 2}
+        for batch_size in sorted(batch_sizes):
+            self._probabilities(torch.zeros(batch_size, 1, size, size))
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+        logger.debug("Classification model warm-up passes completed for batch sizes %s", sorted(batch_sizes))
+    
     def predict(self, image_path: str) -> Tuple[str, float, float, Dict[str, float]]:
         """
         Make prediction on a chest X-ray image.
@@ -123,28 +190,46 @@ class ModelInference:
             >>> print(f"Processing time: {time:.3f}s")
             >>> print(f"All probabilities: {probs}")
         """
-        if not self.model_loaded:
-            logger.warning("Model not loaded, attempting to load...")
-            self.load_model()
-        
-        if self.model is None:
-            logger.error("Model failed to load")
-            raise RuntimeError("Model failed to load")
-        
         logger.debug(f"Starting inference for image: {image_path}")
         start_time = time.time()
         
         # Preprocess image
         logger.debug("Preprocessing image...")
         image_tensor = self.processor.process_image(image_path)
-        image_tensor = image_tensor.to(self.device)
         
         # Run inference
+        predicted_class, confidence_score, _, all_probs = self.predict_tensor(image_tensor)
+        
+        processing_time = time.time() - start_time
+        
+        logger.debug(f"Inference completed: {predicted_class} ({confidence_score:.4f}) in {processing_time:.3f}s")
+        
+        return predicted_class, confidence_score, processing_time, all_probs
+    
+    def predict_tensor(self, image_tensor: torch.Tensor) -> Tuple[str, float, float, Dict[str, float]]:
+        """
+        Make prediction on an already preprocessed image.
+        
+        Use this when the caller has decoded the upload anyway (e.g. while
+        validating it) so the file is not read and decoded a second time.
+        
+        Args:
+            image_tensor: Preprocessed image [1, channels, height, width]
+            
+        Returns:
+            Tuple of (predicted_class, confidence, processing_time,
+            all_probabilities) as returned by predict()
+            
+        Raises:
+            RuntimeError: If model is not loaded
+        """
+        self.ensure_loaded()
+        
+        start_time = time.time()
+        
         logger.debug("Running model inference...")
-        with torch.no_grad():
-            outputs = self.model(image_tensor)
-            probabilities = torch.nn.functional.softmax(outputs, dim=1)
-            confidence, predicted = torch.max(probabilities, 1)
+        probabilities = self._probabilities(image_tensor)
+        confidence, predicted = torch.max(probabilities, 1)
         
         processing_time = time.time() - start_time
         
@@ -158,6 +243,154 @@ class ModelInference:
             for i in range(len(self.classes))
         }
         
-        logger.debug(f"Inference completed: {predicted_class} ({confidence_score:.4f}) in {processing_time:.3f}s")
-        
         return predicted_class, confidence_score, processing_time, all_probs
+    
+    def predict_batch(
+        self,
+        image_tensors: List[torch.Tensor]
+    ) -> Tuple[List[Tuple[str, float, Dict[str, float]]], float]:
+        """
+        Classify already preprocessed images with one forward pass.
+        
+        The tensors are stacked so the whole batch costs a single
+        host-to-device copy and one set of kernel launches.
+        
+        Args:
+            image_tensors: Preprocessed images, each [1, channels, height, width]
+            
+        Returns:
+            Tuple containing:
+                - results (list): One (predicted_class, confidence,
+                  all_probabilities) tuple per image, in input order
+                - processing_time (float): Time for the forward pass in seconds
+                
+        Raises:
+            RuntimeError: If model is not loaded
+        """
+        self.ensure_loaded()
+        
+        if not image_tensors:
+            return [], 0.0
+        
+        start_time = time.time()
+        images_tensor = self._stack_batch(image_tensors)
+        
+        logger.debug(f"Running batched model inference on {len(image_tensors)} images...")
+        probabilities = self._probabilities(images_tensor)
+        confidences, predicted = torch.max(probabilities, 1)
+        
+        # One device-to-host copy for the whole batch
+        probabilities = probabilities.cpu().tolist()
+        confidences = confidences.cpu().tolist()
+        predicted = predicted.cpu().tolist()
+        
+        processing_time = time.time() - start_time
+        
+        results = [
+            (
+                self.classes[class_idx],
+                confidence,
+                {self.classes[i]: probs[i] for i in range(len(self.classes))}
+            )
+            for class_idx, confidence, probs in zip(predicted, confidences, probabilities)
+        ]
+        
+        logger.debug(f"Batched inference completed for {len(results)} images in {processing_time:.3f}s")
+        
+        return results, processing_time
+    
+    def export_onnx(self, output_path: str) -> None:
+        """
+        Export the loaded model to ONNX with a dynamic batch dimension.
+        
+        Point ONNX_MODEL_PATH at the exported file to serve it with ONNX
+        Runtime. Requires the onnx package.
+        
+        Args:
+            output_path: Where to write the .onnx file
+            
+        Raises:
+            RuntimeError: If model is not loaded
+        """
+        self.ensure_loaded()
+        
+        size = self.processor.img_size
+        dummy = torch.zeros(1, 1, size, size, device=self.device)
+        torch.onnx.export(
+            # Export the eager module even when serving a compiled one
+            getattr(self.model, "_orig_mod", self.model),
+            dummy,
+            output_path,
+            input_names=["input"],
+            output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=17,
+            dynamo=False
+        )
+        logger.info(f"Exported classification model to ONNX: {output_path}")
+    
+    def _load_onnx_session(self, onnx_path: str) -> None:
+        """Serve the model through ONNX Runtime, keeping PyTorch as the fallback."""
+        if not os.path.exists(onnx_path):
+            logger.warning(f"ONNX model not found at {onnx_path}, serving with PyTorch")
+            return
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            logger.warning("onnxruntime is not installed, serving with PyTorch")
+            return
+        
+        available = ort.get_available_providers()
+        providers = [
+            provider for provider in ("CUDAExecutionProvider", "CPUExecutionProvider")
+            if provider in available
+        ]
+        self.onnx_session = ort.InferenceSession(onnx_path, providers=providers)
+        logger.info(f"Serving classification model with ONNX Runtime ({self.onnx_session.get_providers()[0]})")
+    
+    def _stack_batch(self, image_tensors: List[torch.Tensor]) -> torch.Tensor:
+        """
+        Stack preprocessed images into one batch tensor on the host.
+        
+        On CUDA the images are copied straight into a page-locked buffer so
+        the host-to-device transfer is a single asynchronous DMA. Pinning
+        memory is expensive, so each worker thread keeps its buffer and only
+        reallocates it when a larger batch arrives; the buffer is free for
+        reuse once the previous batch's results were copied back to the host.
+        """
+        if self.device.type != "cuda":
+            return torch.cat(image_tensors)
+        
+        first = image_tensors[0]
+        batch_size, sample_shape = len(image_tensors), first.shape[1:]
+        buffer = getattr(self._staging, "buffer", None)
+        if (
+            buffer is None
+            or buffer.shape[0] < batch_size
+            or buffer.shape[1:] != sample_shape
+            or buffer.dtype != first.dtype
+        ):
+            buffer = torch.empty((batch_size, *sample_shape), dtype=first.dtype, pin_memory=True)
+            self._staging.buffer = buffer
+        return torch.cat(image_tensors, out=buffer[:batch_size])
+    
+    def _probabilities(self, images: torch.Tensor) -> torch.Tensor:
+        """
+        Run a forward pass on preprocessed host images and return class probabilities.
+        
+        Uses the ONNX Runtime session when one is loaded, otherwise the
+        PyTorch model under inference_mode and (on CUDA) autocast.
+        """
+        if self.onnx_session is not None:
+            input_name = self.onnx_session.get_inputs()[0].name
+            logits = self.onnx_session.run(None, {input_name: images.cpu().numpy()})[0]
+            return torch.softmax(torch.from_numpy(logits), dim=1)
+        
+        images = images.to(self.device, non_blocking=True)
+        with torch.inference_mode(), self._autocast():
+            outputs = self.model(images)
+            return torch.nn.functional.softmax(outputs.float(), dim=1)
+    
+    def _autocast(self) -> torch.autocast:
+        """Autocast context for the forward pass, a no-op unless use_amp."""
+        return torch.autocast(self.device.type, dtype=self.amp_dtype, enabled=self.use_amp)
@@ -120,29 +120,56 @@ class ChestXRayDetector(nn.Module):
             return self._generate_mock_detections()
         
         self.eval()
-        with torch.no_grad():
+        with torch.inference_mode():
             # Run model
             detections = self.forward(image_tensor)
+            return self._extract_detections(detections[0])
+    
+    def detect_batch(
+        self,
+        images_tensor: torch.Tensor,
+        return_mock: bool = True
+    ) -> List[List[Dict[str, any]]]:
+        """
+        Detect findings in a batch of chest X-ray images with one forward pass.
+        
+        Args:
+            images_tensor: Preprocessed images [batch_size, channels, height, width]
+            return_mock: If True, return mock detections (for demo purposes)
             
-            # Extract detections above confidence threshold
-            results = []
-            for i, finding_type in enumerate(self.finding_types):
-                bbox_x1 = detections[0, i, 0].item()
-                bbox_y1 = detections[0, i, 1].item()
-                bbox_x2 = detections[0, i, 2].item()
-                bbox_y2 = detections[0, i, 3].item()
-                confidence = detections[0, i, 4].item()
-                
-                if confidence >= self.confidence_threshold:
-                    # Ensure valid bbox
-                    if bbox_x2 > bbox_x1 and bbox_y2 > bbox_y1:
-                        results.append({
-                            'finding_type': finding_type,
-                            'confidence': confidence,
-                            'bbox': [bbox_x1, bbox_y1, bbox_x2, bbox_y2]
-                        })
+        Returns:
+            One list of detections per image, in input order
+        """
+        if return_mock:
+            return [self._generate_mock_detections() for _ in range(images_tensor.size(0))]
+        
+        self.eval()
+        with torch.inference_mode():
+            detections = self.forward(images_tensor)
+            return [self._extract_detections(sample) for sample in detections]
+    
+    def _extract_detections(self, detections: torch.Tensor) -> List[Dict[str, any]]:
+        """
+        Convert raw model output for one image into detection dictionaries.
+        
+        Args:
+            detections: Detection tensor for a single image [num_classes, 5]
             
-            return results
+        Returns:
+            Detections above the confidence threshold with a valid bbox
+        """
+        results = []
+        for i, (x1, y1, x2, y2, confidence) in enumerate(detections.tolist()):
+            if confidence >= self.confidence_threshold:
+                # Ensure valid bbox
+                if x2 > x1 and y2 > y1:
+                    results.append({
+                        'finding_type': self.finding_types[i],
+                        'confidence': confidence,
+                        'bbox': [x1, y1, x2, y2]
+                    })
+        
+        return results
     
     def _generate_mock_detections(self) -> List[Dict[str, any]]:
         """
@@ -1,10 +1,10 @@
 
 from PIL import Image
 import torch
-from torchvision import transforms
 import numpy as np
 import pydicom
 from typing import Tuple, Dict, Optional
+import io
 import os
 
 class ImageProcessor:
@@ -15,14 +15,27 @@ class ImageProcessor:
     Handles DICOM pixel data conversion and metadata extraction.
     """
     
+    PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    JPEG_SIGNATURE = b"\xff\xd8\xff"
+    
+    # Large images are first shrunk by an integer factor with a box filter,
+    # then resampled bilinearly; within a grey level of a plain bilinear
+    # resize at a fraction of the cost
+    RESIZE_REDUCING_GAP = 3.0
+    
+    # Normalization statistics of the single grayscale channel
+    MEAN = 0.485
+    STD = 0.229
+    
     def __init__(self, img_size=224):
         self.img_size = img_size
-        self.transform = transforms.Compose([
-            transforms.Resize((img_size, img_size)),
-            transforms.Grayscale(num_output_channels=1),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485], std=[0.229])
-        ])
+        # Rescaling to [0, 1] and normalizing map each of the 256 grey levels
+        # to a fixed value, so both are fused into one table lookup per pixel.
+        # Built with the same float32 operations as ToTensor + Normalize, so
+        # the output is bit-identical.
+        self.normalize_lut = (
+            torch.arange(256, dtype=torch.float32).div_(255).sub_(self.MEAN).div_(self.STD).numpy()
+        )
     
     def is_dicom(self, image_path: str) -> bool:
         """Check if file is a DICOM file"""
@@ -52,8 +65,15 @@ class ImageProcessor:
         try:
             # Read DICOM file
             ds = pydicom.dcmread(image_path)
-            
-            # Extract pixel data
+        except Exception as e:
+            raise ValueError(f"Error processing DICOM file: {str(e)}")
+        return self._decode_dicom(ds)
+    
+    def _decode_dicom(self, ds: pydicom.Dataset) -> Tuple[Image.Image, Dict]:
+        """Convert an already parsed DICOM dataset into a PIL image and metadata"""
+        try:
+            # Extract pixel data (compressed transfer syntaxes are decoded by
+            # pylibjpeg/GDCM when installed)
             pixel_array = ds.pixel_array
             
             # Handle different photometric interpretations
@@ -64,38 +84,63 @@ class ImageProcessor:
             if photometric == 'MONOCHROME1':
                 pixel_array = np.max(pixel_array) - pixel_array
             
-            # Normalize to 0-255 range
+            # Normalize to 0-255 range, in place on a single float32 copy
+            # (NumPy releases the GIL, so pool threads decode in parallel)
             pixel_array = pixel_array.astype(np.float32)
             pixel_min, pixel_max = pixel_array.min(), pixel_array.max()
             if pixel_max > pixel_min:
-                pixel_array = ((pixel_array - pixel_min) / (pixel_max - pixel_min) * 255).astype(np.uint8)
-            else:
-                pixel_array = pixel_array.astype(np.uint8)
+                pixel_array -= pixel_min
+                pixel_array /= pixel_max - pixel_min
+                pixel_array *= 255
+            pixel_array = pixel_array.astype(np.uint8)
             
-            # Convert to PIL Image
+            # Convert to PIL Image. Grayscale data stays single-channel:
+            # _to_tensor() converts to grayscale anyway, so an RGB round trip
+            # would only triple the pixels to resize
             image = Image.fromarray(pixel_array)
-            if image.mode != 'RGB':
+            if image.mode not in ('L', 'RGB'):
                 image = image.convert('RGB')
             
-            # Extract HIPAA-compliant metadata (no PHI)
-            metadata = {
-                'modality': str(ds.get('Modality', 'Unknown')),
-                'study_instance_uid': str(ds.get('StudyInstanceUID', '')),
-                'series_instance_uid': str(ds.get('SeriesInstanceUID', '')),
-                'study_date': str(ds.get('StudyDate', '')),
-                'photometric_interpretation': photometric,
-                'rows': int(ds.get('Rows', 0)),
-                'columns': int(ds.get('Columns', 0)),
-                'bits_stored': int(ds.get('BitsStored', 0)),
-                'window_center': str(ds.get('WindowCenter', '')),
-                'window_width': str(ds.get('WindowWidth', '')),
-            }
-            
-            return image, metadata
+            return image, self._dicom_metadata(ds)
             
         except Exception as e:
             raise ValueError(f"Error processing DICOM file: {str(e)}")
     
+    def _dicom_metadata(self, ds: pydicom.Dataset) -> Dict:
+        """Extract HIPAA-compliant metadata (no PHI) from a DICOM dataset"""
+        return {
+            'modality': str(ds.get('Modality', 'Unknown')),
+            'study_instance_uid': str(ds.get('StudyInstanceUID', '')),
+            'series_instance_uid': str(ds.get('SeriesInstanceUID', '')),
+            'study_date': str(ds.get('StudyDate', '')),
+            'photometric_interpretation': str(ds.get('PhotometricInterpretation', 'MONOCHROME2')),
+            'rows': int(ds.get('Rows', 0)),
+            'columns': int(ds.get('Columns', 0)),
+            'bits_stored': int(ds.get('BitsStored', 0)),
+            'window_center': str(ds.get('WindowCenter', '')),
+            'window_width': str(ds.get('WindowWidth', '')),
+        }
+    
+    def _open_image(self, source) -> Image.Image:
+        """Open a standard image, letting JPEG decode straight to grayscale at reduced scale"""
+        image = Image.open(source)
+        # No-op for formats other than JPEG, which otherwise decodes every
+        # colour channel at full resolution only to be shrunk and dropped
+        image.draft('L', (self.img_size, self.img_size))
+        return image
+    
+    def _to_tensor(self, image: Image.Image) -> torch.Tensor:
+        """Convert a decoded image into a normalized [1, 1, H, W] model input"""
+        if image.mode != 'L':
+            image = image.convert('L')
+        image = image.resize(
+            (self.img_size, self.img_size),
+            Image.BILINEAR,
+            reducing_gap=self.RESIZE_REDUCING_GAP
+        )
+        pixels = self.normalize_lut.take(np.asarray(image))
+        return torch.from_numpy(pixels).view(1, 1, self.img_size, self.img_size)
+    
     def process_image(self, image_path: str) -> torch.Tensor:
         """
         Process image for model input.
@@ -113,11 +158,10 @@ class ImageProcessor:
             if self.is_dicom(image_path):
                 image, _ = self.process_dicom(image_path)
             else:
-                image = Image.open(image_path).convert('RGB')
+                image = self._open_image(image_path)
             
             # Apply transforms
-            tensor = self.transform(image)
-            return tensor.unsqueeze(0)
+            return self._to_tensor(image)
             
         except Exception as e:
             raise ValueError(f"Error processing image: {str(e)}")
@@ -139,11 +183,10 @@ class ImageProcessor:
             if self.is_dicom(image_path):
                 image, metadata = self.process_dicom(image_path)
             else:
-                image = Image.open(image_path).convert('RGB')
+                image = self._open_image(image_path)
             
             # Apply transforms
-            tensor = self.transform(image)
-            return tensor.unsqueeze(0), metadata
+            return self._to_tensor(image), metadata
             
         except Exception as e:
             raise ValueError(f"Error processing image: {str(e)}")
@@ -157,9 +200,10 @@ class ImageProcessor:
         try:
             # Check if DICOM
             if self.is_dicom(image_path):
-                ds = pydicom.dcmread(image_path, stop_before_pixels=True)
+                # Defer large values so the pixel data is found but not loaded
+                ds = pydicom.dcmread(image_path, defer_size="1 KB")
                 # Validate it has pixel data attribute
-                return hasattr(ds, 'PixelData') or 'PixelData' in ds
+                return 'PixelData' in ds
             else:
                 # Standard image validation
                 with Image.open(image_path) as image:
@@ -168,3 +212,63 @@ class ImageProcessor:
                     return True
         except:
             return False
+    
+    def has_image_signature(self, header: bytes, filename: str = "") -> bool:
+        """
+        Cheap magic-number check on the first bytes of a file.
+        
+        Lets callers reject obviously wrong uploads before writing them to
+        disk. Pass at least the first 132 bytes so the DICOM marker is seen.
+        """
+        if header.startswith(self.PNG_SIGNATURE) or header.startswith(self.JPEG_SIGNATURE):
+            return True
+        # DICOM "DICM" marker follows a 128-byte preamble; files without the
+        # preamble are still recognised by extension as in is_dicom()
+        return header[128:132] == b"DICM" or filename.lower().endswith('.dcm')
+    
+    def decode_bytes(self, data: bytes, filename: str = "") -> Optional[Tuple[torch.Tensor, Optional[Dict]]]:
+        """
+        Validate and preprocess in-memory image content in a single parse.
+        
+        Each file is parsed once: a DICOM dataset is read once for the pixel
+        data check, pixel decoding and metadata, and a standard image is
+        opened once for the format check and decoding.
+        
+        Args:
+            data: Raw bytes of an image or DICOM file
+            filename: Original filename, used to recognise DICOM by extension
+            
+        Returns:
+            Tuple of (image tensor, metadata dict or None), or None if the
+            content is not a PNG, JPEG or DICOM image
+            
+        Raises:
+            ValueError: If a recognised file cannot be decoded
+        """
+        if filename.lower().endswith('.dcm') or data[128:132] == b"DICM":
+            return self._decode_dicom_bytes(data)
+        try:
+            image = self._open_image(io.BytesIO(data))
+        except Exception:
+            # DICOM without the preamble is only recognised by parsing it
+            return self._decode_dicom_bytes(data)
+        if image.format not in ['PNG', 'JPEG']:
+            return None
+        try:
+            return self._to_tensor(image), None
+        except Exception as e:
+            raise ValueError(f"Error processing image: {str(e)}")
+    
+    def _decode_dicom_bytes(self, data: bytes) -> Optional[Tuple[torch.Tensor, Dict]]:
+        """Read in-memory DICOM once; None unless it is a dataset with pixel data"""
+        try:
+            ds = pydicom.dcmread(io.BytesIO(data))
+        except Exception:
+            return None
+        if 'PixelData' not in ds:
+            return None
+        image, metadata = self._decode_dicom(ds)
+        try:
+            return self._to_tensor(image), metadata
+        except Exception as e:
+            raise ValueError(f"Error processing image: {str(e)}")
@@ -5,7 +5,7 @@ This module defines SQLAlchemy ORM models for user management,
 roles, and RBAC (Role-Based Access Control).
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -206,9 +206,10 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
-    action = Column(String, nullable=False, index=True)
-    resource = Column(String, nullable=False, index=True)
+    # user_id, action and resource are indexed together with timestamp below
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    action = Column(String, nullable=False)
+    resource = Column(String, nullable=False)
     resource_id = Column(String, nullable=True)
     details = Column(Text, nullable=True)  # JSON string with additional context
     ip_address = Column(String, nullable=True)
@@ -219,6 +220,14 @@ class AuditLog(Base):
     # Relationships
     user = relationship("User", back_populates="audit_logs")
     
+    # Audit queries filter on one of these columns and page newest first, so
+    # each index serves both the filter and the ORDER BY without a sort step
+    __table_args__ = (
+        Index("ix_audit_logs_user_id_timestamp", user_id, timestamp.desc()),
+        Index("ix_audit_logs_action_timestamp", action, timestamp.desc()),
+        Index("ix_audit_logs_resource_timestamp", resource, timestamp.desc()),
+    )
+    
     def __repr__(self) -> str:
         """String representation of AuditLog."""
         return f"<AuditLog(id={self.id}, user_id={self.user_id}, action='{self.action}')>"
@@ -76,8 +76,9 @@ class AuditLogListResponse(BaseModel):
     """Schema for paginated audit log list."""
     logs: List[AuditLogResponse]
     total: int
-    page: int
+    page: Optional[int] = Field(None, description="Page number (offset pagination only)")
     page_size: int
+    next_cursor: Optional[int] = Field(None, description="Cursor for the next page, if there may be one")
     
     model_config = ConfigDict(json_schema_extra={
         "example": {
@@ -98,7 +99,8 @@ class AuditLogListResponse(BaseModel):
             ],
             "total": 1500,
             "page": 1,
-            "page_size": 50
+            "page_size": 50,
+            "next_cursor": 1
         }
     })
 
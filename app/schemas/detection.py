@@ -5,7 +5,7 @@ These schemas define the structure for detection results including
 bounding boxes and finding classifications.
 """
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from datetime import datetime
 from typing import List, Optional
 
@@ -55,27 +55,46 @@ class DetectionResult(BaseModel):
     
     @classmethod
     def from_db_model(cls, db_detection):
-        """Create DetectionResult from database Detection model"""
-        # Normalize coordinates from pixel values to 0-1 range
-        # Database stores pixel values (multiplied by 1000), so divide to get normalized coords
-        x1 = db_detection.bbox_x1 / 1000.0 if db_detection.bbox_x1 > 1.0 else db_detection.bbox_x1
-        y1 = db_detection.bbox_y1 / 1000.0 if db_detection.bbox_y1 > 1.0 else db_detection.bbox_y1
-        x2 = db_detection.bbox_x2 / 1000.0 if db_detection.bbox_x2 > 1.0 else db_detection.bbox_x2
-        y2 = db_detection.bbox_y2 / 1000.0 if db_detection.bbox_y2 > 1.0 else db_detection.bbox_y2
+        """Create DetectionResult from database Detection model."""
+        return cls.from_db_models([db_detection])[0]
+    
+    @classmethod
+    def from_db_models(cls, db_detections) -> List["DetectionResult"]:
+        """
+        Create DetectionResults for many database Detection models at once.
         
-        return cls(
-            id=db_detection.id,
-            prediction_id=db_detection.prediction_id,
-            finding_type=db_detection.finding_type,
-            confidence_score=db_detection.confidence_score,
-            bounding_box=BoundingBox(
-                x1=x1,
-                y1=y1,
-                x2=x2,
-                y2=y2
-            ),
-            created_at=db_detection.created_at
-        )
+        Builds plain dicts and validates the whole list in a single
+        pydantic-core call, which is cheaper than constructing every model
+        and its BoundingBox from Python.
+        """
+        rows = []
+        for db_detection in db_detections:
+            x1, y1, x2, y2 = _normalized_bbox(db_detection)
+            rows.append({
+                "id": db_detection.id,
+                "prediction_id": db_detection.prediction_id,
+                "finding_type": db_detection.finding_type,
+                "confidence_score": db_detection.confidence_score,
+                "bounding_box": {"x1": x1, "y1": y1, "x2": x2, "y2": y2},
+                "created_at": db_detection.created_at,
+            })
+        return _detection_list_adapter.validate_python(rows)
+
+
+def _normalized_bbox(db_detection):
+    """
+    Bounding box of a database Detection in the 0-1 range.
+    
+    Database stores pixel values (multiplied by 1000), so divide to get
+    normalized coords.
+    """
+    return tuple(
+        value / 1000.0 if value > 1.0 else value
+        for value in (db_detection.bbox_x1, db_detection.bbox_y1, db_detection.bbox_x2, db_detection.bbox_y2)
+    )
+
+
+_detection_list_adapter = TypeAdapter(List[DetectionResult])
 
 
 class DetectionCreate(BaseModel):
@@ -94,10 +94,11 @@ class RoleListResponse(BaseModel):
 
 class PermissionCreate(BaseModel):
     """Schema for creating a permission/policy."""
-    subject: str = Field(..., description="Role or user identifier")
+    subject: str = Field(..., description="Role name (user:<id> only with override)")
     object: str = Field(..., description="Resource path (e.g., /api/v1/predict)")
     action: str = Field(..., description="HTTP method or action (e.g., GET, POST, *)")
     effect: str = Field(default="allow", description="Effect: 'allow' or 'deny'")
+    override: bool = Field(default=False, description="Allow a user-specific (user:<id>) policy")
     
     model_config = ConfigDict(json_schema_extra={
         "example": {
@@ -0,0 +1,178 @@
+"""
+Background audit log writer.
+
+Audit entries from the v2 endpoints are queued in memory and written by a
+background thread in batches, so the INSERT and commit leave the request's
+critical path. When the writer is not running (scripts, tests without the
+application lifespan) or its queue is full, entries are written
+synchronously on the request's session instead, so none are dropped.
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import AuditSessionLocal
+from app.core.logging_config import get_logger
+from app.models.user import AuditLog
+from app.schemas.audit import AuditLogCreate
+from app.services.audit_service import AuditService
+
+logger = get_logger(__name__)
+
+# Queued after the last entry to tell the writer thread to exit
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    Batches audit log entries and writes them from a background thread.
+    
+    Entries are collected until batch_size are pending or flush_interval
+    seconds have passed since the first one, then inserted with a single
+    executemany INSERT in one short-lived session. Each entry is
+    timestamped when it is submitted, not when it is written.
+    
+    A thread-safe queue is used rather than an asyncio.Queue because most
+    v2 endpoints are sync routes that submit from threadpool workers.
+    
+    Attributes:
+        batch_size: Maximum entries written per INSERT
+        flush_interval: Seconds an entry may wait for a batch to fill
+        max_queue_size: Entries buffered before submit() writes inline
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = AuditSessionLocal,
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        max_queue_size: int = 10000
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self._audit_service = AuditService()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is accepting entries."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+        logger.info("Audit log writer started")
+    
+    def stop(self) -> None:
+        """Write every pending entry, then stop the background thread."""
+        if self._thread is None:
+            return
+        thread, self._thread = self._thread, None
+        # Blocks until there is room: entries queued before this are kept
+        self._queue.put(_STOP)
+        thread.join()
+        # Entries that raced past the running check while stopping
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if leftover:
+            self._write(leftover)
+        logger.info("Audit log writer stopped")
+    
+    def submit(self, db: Session, log_data: AuditLogCreate) -> None:
+        """
+        Record an audit log entry.
+        
+        Queues the entry for the background thread. Falls back to writing
+        it synchronously on db when the writer is not running or is backed up.
+        
+        Route handlers build log_data with AuditLogCreate.model_construct:
+        every field comes from the route itself (IDs, action names, client
+        info), so validating it again on each request is wasted work.
+        
+        Args:
+            db: Request database session, used for the synchronous fallback
+            log_data: Audit log data
+        """
+        if self.running:
+            row = log_data.model_dump()
+            row["timestamp"] = datetime.now(timezone.utc)
+            try:
+                self._queue.put_nowait(row)
+                return
+            except queue.Full:
+                logger.warning("Audit log queue full; writing entry synchronously")
+        self._audit_service.log_action(db, log_data)
+    
+    def _run(self) -> None:
+        """Write batches until the stop marker is reached."""
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._write(batch)
+    
+    def _collect(self) -> Tuple[List[Dict], bool]:
+        """
+        Wait for one entry, then gather more until the batch is full or the
+        interval ends.
+        
+        Returns:
+            Tuple of (entries, whether the stop marker was reached)
+        """
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    def _write(self, batch: List[Dict]) -> None:
+        """Insert a batch of entries in one transaction; failures are logged."""
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditLog), batch)
+            db.commit()
+            logger.debug("Wrote %d audit log entries", len(batch))
+        except Exception as e:
+            db.rollback()
+            logger.error("Failed to write %d audit log entries: %s", len(batch), e, exc_info=True)
+        finally:
+            db.close()
+
+
+_settings = get_settings()
+
+# Shared writer, started and stopped by the application lifespan
+audit_writer = AuditLogWriter(
+    batch_size=_settings.audit_batch_size,
+    flush_interval=_settings.audit_flush_interval_ms / 1000,
+    max_queue_size=_settings.audit_queue_size
+)
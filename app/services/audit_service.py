@@ -5,10 +5,12 @@ This service handles audit log creation, retrieval, and analysis
 for HIPAA compliance and security monitoring.
 """
 
-from typing import List, Optional, Tuple, Dict
+import csv
+from io import StringIO
+from typing import Iterator, List, Optional, Tuple, Dict
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select, tuple_
 
 from app.models.user import AuditLog, User
 from app.schemas.audit import AuditLogCreate, AuditLogFilter, AuditLogStats
@@ -16,6 +18,50 @@ from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+_CSV_HEADER = [
+    'ID', 'User ID', 'Username', 'Action', 'Resource', 'Resource ID',
+    'Status', 'IP Address', 'Timestamp', 'Details'
+]
+
+
+def _page(
+    db: Session,
+    stmt,
+    skip: int,
+    limit: int,
+    before_id: Optional[int] = None
+) -> Tuple[List[AuditLog], int]:
+    """
+    Fetch one newest-first page of a select(AuditLog) statement and its total.
+    
+    With before_id the page continues after that log (keyset pagination),
+    which costs the same at any depth. Otherwise skip rows are skipped and
+    the total comes from a COUNT(*) OVER () window in the same query.
+    """
+    # id breaks timestamp ties so every log has a unique position
+    ordered = stmt.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+    
+    if before_id is not None:
+        cursor_timestamp = select(AuditLog.timestamp).where(AuditLog.id == before_id).scalar_subquery()
+        logs = db.scalars(
+            ordered.where(
+                tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(cursor_timestamp, before_id)
+            ).limit(limit)
+        ).all()
+        total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+        return list(logs), total
+    
+    rows = db.execute(
+        ordered.add_columns(func.count().over()).offset(skip).limit(limit)
+    ).all()
+    if rows:
+        return [log for log, _ in rows], rows[0][1]
+    if not skip:
+        return [], 0
+    # Past the last page no row carries the window total; count separately
+    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+    return [], total
+
 
 class AuditService:
     """
@@ -56,9 +102,8 @@ class AuditService:
         db.refresh(audit_log)
         
         logger.debug(
-            f"Audit log created: user_id={log_data.user_id}, "
-            f"action={log_data.action}, resource={log_data.resource}, "
-            f"status={log_data.status}"
+            "Audit log created: user_id=%s, action=%s, resource=%s, status=%s",
+            log_data.user_id, log_data.action, log_data.resource, log_data.status
         )
         
         return audit_log
@@ -68,23 +113,28 @@ class AuditService:
         db: Session,
         skip: int = 0,
         limit: int = 50,
-        filter_params: Optional[AuditLogFilter] = None
+        filter_params: Optional[AuditLogFilter] = None,
+        before_id: Optional[int] = None
     ) -> Tuple[List[AuditLog], int]:
         """
         Get audit logs with optional filtering and pagination.
         
         Args:
             db: Database session
-            skip: Number of records to skip
+            skip: Number of records to skip (ignored when before_id is given)
             limit: Maximum number of records to return
             filter_params: Optional filter parameters
+            before_id: Return the logs that follow this log ID, newest first
             
         Returns:
             Tuple of (audit logs list, total count)
         """
-        query = db.query(AuditLog)
+        stmt = self._apply_filters(select(AuditLog), filter_params)
         
-        # Apply filters if provided
+        return _page(db, stmt, skip, limit, before_id)
+    
+    def _apply_filters(self, query, filter_params: Optional[AuditLogFilter]):
+        """Apply optional filter parameters to an audit log query or select()."""
         if filter_params:
             if filter_params.user_id is not None:
                 query = query.filter(AuditLog.user_id == filter_params.user_id)
@@ -104,20 +154,15 @@ class AuditService:
             if filter_params.end_date:
                 query = query.filter(AuditLog.timestamp <= filter_params.end_date)
         
-        # Order by timestamp descending (newest first)
-        query = query.order_by(AuditLog.timestamp.desc())
-        
-        total = query.count()
-        logs = query.offset(skip).limit(limit).all()
-        
-        return logs, total
+        return query
     
     def get_user_logs(
         self,
         db: Session,
         user_id: int,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        before_id: Optional[int] = None
     ) -> Tuple[List[AuditLog], int]:
         """
         Get audit logs for a specific user.
@@ -125,20 +170,16 @@ class AuditService:
         Args:
             db: Database session
             user_id: User ID
-            skip: Number of records to skip
+            skip: Number of records to skip (ignored when before_id is given)
             limit: Maximum number of records to return
+            before_id: Return the logs that follow this log ID, newest first
             
         Returns:
             Tuple of (audit logs list, total count)
         """
-        query = db.query(AuditLog).filter(
-            AuditLog.user_id == user_id
-        ).order_by(AuditLog.timestamp.desc())
-        
-        total = query.count()
-        logs = query.offset(skip).limit(limit).all()
+        stmt = select(AuditLog).where(AuditLog.user_id == user_id)
         
-        return logs, total
+        return _page(db, stmt, skip, limit, before_id)
     
     def get_recent_failures(
         self,
@@ -169,30 +210,20 @@ class AuditService:
         Returns:
             AuditLogStats object
         """
-        # Total logs
-        total_logs = db.query(AuditLog).count()
-        
-        # Successful/failed actions
-        successful_actions = db.query(AuditLog).filter(
-            AuditLog.status == "success"
-        ).count()
-        
-        failed_actions = db.query(AuditLog).filter(
-            AuditLog.status == "failure"
-        ).count()
-        
-        # Unique users
-        unique_users = db.query(func.count(func.distinct(AuditLog.user_id))).scalar()
+        # Totals, outcomes and unique users in a single pass over the table
+        total_logs, successful_actions, failed_actions, unique_users = db.execute(
+            select(
+                func.count(),
+                func.count().filter(AuditLog.status == "success"),
+                func.count().filter(AuditLog.status == "failure"),
+                func.count(func.distinct(AuditLog.user_id))
+            ).select_from(AuditLog)
+        ).one()
         
         # Actions by type
-        actions_by_type = {}
-        action_counts = db.query(
-            AuditLog.action,
-            func.count(AuditLog.id)
-        ).group_by(AuditLog.action).all()
-        
-        for action, count in action_counts:
-            actions_by_type[action] = count
+        actions_by_type = dict(db.execute(
+            select(AuditLog.action, func.count(AuditLog.id)).group_by(AuditLog.action)
+        ).all())
         
         # Recent failures
         recent_failures = self.get_recent_failures(db, limit=5)
@@ -309,7 +340,7 @@ class AuditService:
         
         db.commit()
         
-        logger.info(f"Cleaned up {deleted_count} audit logs older than {days} days")
+        logger.info("Cleaned up %s audit logs older than %s days", deleted_count, days)
         return deleted_count
     
     def get_resource_access_log(
@@ -340,6 +371,54 @@ class AuditService:
         
         return query.order_by(AuditLog.timestamp.desc()).limit(limit).all()
     
+    def iter_logs_csv(
+        self,
+        db: Session,
+        filter_params: Optional[AuditLogFilter] = None,
+        batch_size: int = 1000
+    ) -> Iterator[str]:
+        """
+        Stream audit logs as CSV text, newest first.
+        
+        Rows are fetched batch_size at a time with the username joined in
+        the same query, and each batch is yielded as one chunk, so memory
+        stays flat however large the table is.
+        
+        Args:
+            db: Database session
+            filter_params: Optional filter parameters
+            batch_size: Rows fetched and written per chunk
+            
+        Yields:
+            CSV text chunks, starting with the header row
+        """
+        stmt = select(AuditLog, User.username).outerjoin(User, AuditLog.user_id == User.id)
+        stmt = self._apply_filters(stmt, filter_params).order_by(AuditLog.timestamp.desc())
+        
+        output = StringIO()
+        writer = csv.writer(output)
+        writer.writerow(_CSV_HEADER)
+        yield output.getvalue()
+        
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            output.seek(0)
+            output.truncate()
+            for log, username in partition:
+                writer.writerow([
+                    log.id,
+                    log.user_id or 'N/A',
+                    username or 'N/A',
+                    log.action,
+                    log.resource,
+                    log.resource_id or 'N/A',
+                    log.status,
+                    log.ip_address or 'N/A',
+                    log.timestamp.isoformat(),
+                    log.details or 'N/A'
+                ])
+            yield output.getvalue()
+    
     def export_logs_csv(
         self,
         db: Session,
@@ -355,34 +434,4 @@ class AuditService:
         Returns:
             CSV string
         """
-        import csv
-        from io import StringIO
-        
-        logs, _ = self.get_logs(db, skip=0, limit=10000, filter_params=filter_params)
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            'ID', 'User ID', 'Username', 'Action', 'Resource', 'Resource ID',
-            'Status', 'IP Address', 'Timestamp', 'Details'
-        ])
-        
-        # Write data
-        for log in logs:
-            username = log.user.username if log.user else 'N/A'
-            writer.writerow([
-                log.id,
-                log.user_id or 'N/A',
-                username,
-                log.action,
-                log.resource,
-                log.resource_id or 'N/A',
-                log.status,
-                log.ip_address or 'N/A',
-                log.timestamp.isoformat(),
-                log.details or 'N/A'
-            ])
-        
-        return output.getvalue()
+        return "".join(self.iter_logs_csv(db, filter_params))
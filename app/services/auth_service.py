@@ -52,7 +52,7 @@ class AuthService:
         ).first()
         
         if existing_user:
-            logger.warning(f"Registration failed: Username '{user_data.username}' already exists")
+            logger.warning("Registration failed: Username '%s' already exists", user_data.username)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already registered"
@@ -64,7 +64,7 @@ class AuthService:
         ).first()
         
         if existing_email:
-            logger.warning(f"Registration failed: Email '{user_data.email}' already exists")
+            logger.warning("Registration failed: Email '%s' already exists", user_data.email)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -104,12 +104,12 @@ class AuthService:
             )
             db.add(user_role)
         else:
-            logger.warning(f"Default role '{default_role}' not found")
+            logger.warning("Default role '%s' not found", default_role)
         
         db.commit()
         db.refresh(new_user)
         
-        logger.info(f"User registered successfully: {new_user.username} (ID: {new_user.id})")
+        logger.info("User registered successfully: %s (ID: %s)", new_user.username, new_user.id)
         return new_user
     
     def authenticate_user(
@@ -135,23 +135,23 @@ class AuthService:
         ).first()
         
         if not user:
-            logger.warning(f"Authentication failed: User '{username}' not found")
+            logger.warning("Authentication failed: User '%s' not found", username)
             return None
         
         if not user.hashed_password:
-            logger.warning(f"Authentication failed: User '{username}' has no password (OAuth user)")
+            logger.warning("Authentication failed: User '%s' has no password (OAuth user)", username)
             return None
         
         # Verify password
         if not password_hasher.verify_password(password, user.hashed_password):
-            logger.warning(f"Authentication failed: Invalid password for user '{username}'")
+            logger.warning("Authentication failed: Invalid password for user '%s'", username)
             return None
         
         if not user.is_active:
-            logger.warning(f"Authentication failed: User '{username}' is inactive")
+            logger.warning("Authentication failed: User '%s' is inactive", username)
             return None
         
-        logger.info(f"User authenticated successfully: {user.username}")
+        logger.info("User authenticated successfully: %s", user.username)
         return user
     
     def create_user_tokens(
@@ -210,7 +210,7 @@ class AuthService:
         
         db.commit()
         
-        logger.info(f"Tokens created for user: {user.username}")
+        logger.info("Tokens created for user: %s", user.username)
         
         return TokenResponse(
             access_token=access_token,
@@ -225,7 +225,7 @@ class AuthService:
         credentials: UserLogin,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
-    ) -> Tuple[TokenResponse, bool]:
+    ) -> Tuple[Optional[TokenResponse], bool, User]:
         """
         Login user with username and password.
         
@@ -236,7 +236,8 @@ class AuthService:
             user_agent: Client user agent
             
         Returns:
-            Tuple of (TokenResponse, requires_2fa)
+            Tuple of (TokenResponse, requires_2fa, authenticated user);
+            tokens are None when 2FA is required
             
         Raises:
             HTTPException: If authentication fails
@@ -251,12 +252,12 @@ class AuthService:
         
         # Check if 2FA is enabled
         if user.is_2fa_enabled and user.totp_secret:
-            logger.info(f"2FA required for user: {user.username}")
-            return None, True
+            logger.info("2FA required for user: %s", user.username)
+            return None, True, user
         
         # Create tokens
         tokens = self.create_user_tokens(db, user, ip_address, user_agent)
-        return tokens, False
+        return tokens, False, user
     
     def login_with_2fa(
         self,
@@ -264,7 +265,7 @@ class AuthService:
         credentials: UserLogin2FA,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
-    ) -> TokenResponse:
+    ) -> Tuple[TokenResponse, User]:
         """
         Login user with 2FA verification.
         
@@ -275,7 +276,7 @@ class AuthService:
             user_agent: Client user agent
             
         Returns:
-            TokenResponse
+            Tuple of (TokenResponse, authenticated user)
             
         Raises:
             HTTPException: If authentication fails
@@ -296,16 +297,16 @@ class AuthService:
         
         # Verify TOTP code
         if not totp_manager.verify_totp(user.totp_secret, credentials.totp_code):
-            logger.warning(f"Invalid 2FA code for user: {user.username}")
+            logger.warning("Invalid 2FA code for user: %s", user.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid 2FA code"
             )
         
-        logger.info(f"2FA verification successful for user: {user.username}")
+        logger.info("2FA verification successful for user: %s", user.username)
         
         # Create tokens
-        return self.create_user_tokens(db, user, ip_address, user_agent)
+        return self.create_user_tokens(db, user, ip_address, user_agent), user
     
     def logout(self, db: Session, jti: str) -> bool:
         """
@@ -326,7 +327,7 @@ class AuthService:
         if session:
             session.is_valid = False
             db.commit()
-            logger.info(f"Session invalidated for JTI: {jti}")
+            logger.info("Session invalidated for JTI: %s", jti)
             return True
         
         return False
@@ -413,7 +414,7 @@ class AuthService:
         user.totp_secret = secret
         db.commit()
         
-        logger.info(f"2FA secret generated for user: {user.username}")
+        logger.info("2FA secret generated for user: %s", user.username)
         
         return {
             "secret": secret,
@@ -457,7 +458,7 @@ class AuthService:
         user.is_2fa_enabled = True
         db.commit()
         
-        logger.info(f"2FA enabled for user: {user.username}")
+        logger.info("2FA enabled for user: %s", user.username)
         return True
     
     def disable_2fa(self, db: Session, user: User) -> bool:
@@ -475,5 +476,5 @@ class AuthService:
         user.totp_secret = None
         db.commit()
         
-        logger.info(f"2FA disabled for user: {user.username}")
+        logger.info("2FA disabled for user: %s", user.username)
         return True
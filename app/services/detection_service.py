@@ -5,11 +5,23 @@ This module handles the business logic for creating and retrieving
 detection records from the database.
 """
 
+from sqlalchemy import Select, insert, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.models.database_models import Detection, Prediction
 from app.schemas.detection import DetectionCreate, DetectionResult
 
+_BBOX_KEYS = ("bbox_x1", "bbox_y1", "bbox_x2", "bbox_y2")
+
+
+def _paginate(stmt: Select, skip: int, limit: int, after_id: Optional[int]) -> Select:
+    """Order a detection query by ID and apply an offset or keyset page."""
+    if after_id is not None:
+        stmt = stmt.where(Detection.id > after_id)
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(Detection.id).limit(limit)
+
 
 class DetectionService:
     """
@@ -68,58 +80,86 @@ class DetectionService:
     def create_detections_batch(
         self,
         db: Session, 
-        detections_data: List[DetectionCreate]
+        detections_data: List[DetectionCreate],
+        commit: bool = True
     ) -> List[Detection]:
         """
-        Create multiple detection records in a single transaction.
+        Create multiple detection records with a single INSERT.
+        
+        All referenced predictions are verified with one query, and the rows
+        are written in one multi-row INSERT ... RETURNING statement.
         
         Args:
             db: Database session
             detections_data: List of detection data to create
+            commit: Commit the transaction; pass False to leave it open so the
+                caller can group this insert with other writes
             
         Returns:
-            List of created Detection database objects
+            List of created Detection database objects, in input order
             
         Raises:
             ValueError: If any prediction_id doesn't exist
         """
-        db_detections = []
+        if not detections_data:
+            return []
         
-        for detection_data in detections_data:
-            # Verify prediction exists
-            prediction = db.query(Prediction).filter(
-                Prediction.id == detection_data.prediction_id
-            ).first()
-            
-            if not prediction:
-                raise ValueError(f"Prediction with id {detection_data.prediction_id} not found")
-            
-            # Convert normalized coordinates (0-1) to pixel values (multiply by 1000)
-            bbox_x1 = detection_data.bbox_x1 * 1000 if detection_data.bbox_x1 <= 1.0 else detection_data.bbox_x1
-            bbox_y1 = detection_data.bbox_y1 * 1000 if detection_data.bbox_y1 <= 1.0 else detection_data.bbox_y1
-            bbox_x2 = detection_data.bbox_x2 * 1000 if detection_data.bbox_x2 <= 1.0 else detection_data.bbox_x2
-            bbox_y2 = detection_data.bbox_y2 * 1000 if detection_data.bbox_y2 <= 1.0 else detection_data.bbox_y2
-            
-            # Create detection record
-            db_detection = Detection(
-                prediction_id=detection_data.prediction_id,
-                finding_type=detection_data.finding_type,
-                confidence_score=detection_data.confidence_score,
-                bbox_x1=bbox_x1,
-                bbox_y1=bbox_y1,
-                bbox_x2=bbox_x2,
-                bbox_y2=bbox_y2
-            )
+        # Verify all referenced predictions exist
+        prediction_ids = {d.prediction_id for d in detections_data}
+        existing_ids = {
+            prediction_id for (prediction_id,) in
+            db.query(Prediction.id).filter(Prediction.id.in_(prediction_ids))
+        }
+        missing_ids = prediction_ids - existing_ids
+        if missing_ids:
+            raise ValueError(f"Prediction with id {min(missing_ids)} not found")
+        
+        return self.create_detections_bulk(
+            db,
+            [detection_data.model_dump() for detection_data in detections_data],
+            commit=commit
+        )
+    
+    def create_detections_bulk(
+        self,
+        db: Session,
+        rows: List[Dict],
+        commit: bool = True
+    ) -> List[Detection]:
+        """
+        Insert trusted detection rows with a single INSERT, skipping validation.
+        
+        For detector output whose predictions were just created in the same
+        transaction: no Pydantic models are built and prediction IDs are not
+        re-checked. Rows use the DetectionCreate field names; their bbox
+        values are converted to pixel values in place.
+        
+        Args:
+            db: Database session
+            rows: Detection dicts (prediction_id, finding_type, confidence_score,
+                bbox_x1..bbox_y2 normalized 0-1 or pixel values)
+            commit: Commit the transaction; pass False to leave it open so the
+                caller can group this insert with other writes
             
-            db_detections.append(db_detection)
+        Returns:
+            List of created Detection database objects, in input order
+        """
+        if not rows:
+            return []
         
-        # Add all detections in batch
-        db.add_all(db_detections)
-        db.commit()
+        # Convert normalized coordinates (0-1) to pixel values (multiply by 1000)
+        for row in rows:
+            for key in _BBOX_KEYS:
+                if row[key] <= 1.0:
+                    row[key] *= 1000
         
-        # Refresh all objects
-        for db_detection in db_detections:
-            db.refresh(db_detection)
+        db_detections = list(db.scalars(
+            insert(Detection).returning(Detection, sort_by_parameter_order=True),
+            rows
+        ))
+        
+        if commit:
+            db.commit()
         
         return db_detections
     
@@ -138,11 +178,12 @@ class DetectionService:
         Returns:
             List of Detection objects
         """
-        detections = db.query(Detection).filter(
-            Detection.prediction_id == prediction_id
-        ).all()
-        
-        return detections
+        stmt = (
+            select(Detection)
+            .where(Detection.prediction_id == prediction_id)
+            .order_by(Detection.id)
+        )
+        return list(db.scalars(stmt))
     
     def get_detection_by_id(
         self,
@@ -169,47 +210,56 @@ class DetectionService:
         self,
         db: Session,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after_id: Optional[int] = None
     ) -> List[Detection]:
         """
         Get all detections with pagination.
         
+        Rows are ordered by ID so that offset pages are stable. Passing
+        after_id switches to keyset pagination, which seeks straight to the
+        next page through the primary key instead of scanning skipped rows.
+        
         Args:
             db: Database session
-            skip: Number of records to skip
+            skip: Number of records to skip (ignored when after_id is given)
             limit: Maximum number of records to return
+            after_id: Return only detections with an ID greater than this
             
         Returns:
             List of Detection objects
         """
-        detections = db.query(Detection).offset(skip).limit(limit).all()
-        
-        return detections
+        stmt = _paginate(select(Detection), skip, limit, after_id)
+        return list(db.scalars(stmt))
     
     def get_detections_by_finding_type(
         self,
         db: Session,
         finding_type: str,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after_id: Optional[int] = None
     ) -> List[Detection]:
         """
         Get detections filtered by finding type.
         
+        Served by the finding_type index (which carries the row ID), so the
+        ID ordering does not need a separate sort and an after_id cursor
+        seeks within the index.
+        
         Args:
             db: Database session
             finding_type: Type of finding to filter by
-            skip: Number of records to skip
+            skip: Number of records to skip (ignored when after_id is given)
             limit: Maximum number of records to return
+            after_id: Return only detections with an ID greater than this
             
         Returns:
             List of Detection objects
         """
-        detections = db.query(Detection).filter(
-            Detection.finding_type == finding_type
-        ).offset(skip).limit(limit).all()
-        
-        return detections
+        stmt = select(Detection).where(Detection.finding_type == finding_type)
+        stmt = _paginate(stmt, skip, limit, after_id)
+        return list(db.scalars(stmt))
     
     def delete_detection(self, db: Session, detection_id: int) -> bool:
         """
@@ -1,9 +1,9 @@
 
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from app.models.database_models import Prediction
 from app.schemas.prediction import PredictionCreate
 from typing import List
-import json
 
 
 class PredictionService:
@@ -23,18 +23,34 @@ class PredictionService:
         db.refresh(db_prediction)
         return db_prediction
     
-    def create_predictions_batch(self, db: Session, predictions_data: List[PredictionCreate]) -> List[Prediction]:
-        """Create multiple prediction records in database as a batch"""
-        db_predictions = []
-        for prediction_data in predictions_data:
-            db_prediction = Prediction(**prediction_data.model_dump())
-            db_predictions.append(db_prediction)
+    def create_predictions_batch(
+        self,
+        db: Session,
+        predictions_data: List[PredictionCreate],
+        commit: bool = True
+    ) -> List[Prediction]:
+        """
+        Create multiple prediction records in database as a batch.
         
-        db.add_all(db_predictions)
+        The rows are written with one multi-row INSERT ... RETURNING. With
+        commit=False the transaction is left open (IDs are already assigned)
+        and the caller is responsible for committing it.
+        """
+        if not predictions_data:
+            return []
+        
+        db_predictions = list(db.scalars(
+            insert(Prediction).returning(Prediction, sort_by_parameter_order=True),
+            [prediction_data.model_dump() for prediction_data in predictions_data]
+        ))
+        if not commit:
+            return db_predictions
+        
+        prediction_ids = [db_prediction.id for db_prediction in db_predictions]
         db.commit()
         
-        for db_prediction in db_predictions:
-            db.refresh(db_prediction)
+        # Reload the committed rows with one SELECT rather than one refresh each
+        db.scalars(select(Prediction).where(Prediction.id.in_(prediction_ids))).all()
         
         return db_predictions
     
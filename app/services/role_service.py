@@ -5,12 +5,13 @@ This service handles role CRUD operations and Casbin policy management.
 """
 
 from typing import List, Optional, Tuple
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.models.user import Role, UserRole
 from app.schemas.role import RoleCreate, RoleUpdate, RoleResponse, PermissionCreate
-from app.core.casbin_enforcer import casbin_enforcer
+from app.core.casbin_enforcer import USER_SUBJECT_PATTERN, casbin_enforcer
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -62,7 +63,7 @@ class RoleService:
         db.commit()
         db.refresh(new_role)
         
-        logger.info(f"Role created: {new_role.name} (ID: {new_role.id})")
+        logger.info("Role created: %s (ID: %s)", new_role.name, new_role.id)
         return new_role
     
     def get_role_by_id(self, db: Session, role_id: int) -> Optional[Role]:
@@ -108,10 +109,16 @@ class RoleService:
         Returns:
             Tuple of (roles list, total count)
         """
-        total = db.query(Role).count()
-        roles = db.query(Role).offset(skip).limit(limit).all()
-        
-        return roles, total
+        # The page and its total (COUNT(*) OVER ()) in one query
+        rows = db.execute(
+            select(Role, func.count().over()).order_by(Role.id).offset(skip).limit(limit)
+        ).all()
+        if rows:
+            return [role for role, _ in rows], rows[0][1]
+        if not skip:
+            return [], 0
+        # Past the last page no row carries the window total; count separately
+        return [], db.scalar(select(func.count()).select_from(Role))
     
     def update_role(
         self,
@@ -157,7 +164,7 @@ class RoleService:
         db.commit()
         db.refresh(role)
         
-        logger.info(f"Role updated: {role.name} (ID: {role.id})")
+        logger.info("Role updated: %s (ID: %s)", role.name, role.id)
         return role
     
     def delete_role(self, db: Session, role_id: int) -> bool:
@@ -199,7 +206,7 @@ class RoleService:
         db.delete(role)
         db.commit()
         
-        logger.info(f"Role deleted: {role.name} (ID: {role.id})")
+        logger.info("Role deleted: %s (ID: %s)", role.name, role.id)
         return True
     
     def get_role_users_count(self, db: Session, role_id: int) -> int:
@@ -227,18 +234,28 @@ class RoleService:
             
         Returns:
             True if added
+            
+        Raises:
+            HTTPException: If the subject is a user and override is not set
         """
+        if not permission.override and USER_SUBJECT_PATTERN.fullmatch(permission.subject):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Permissions are granted to roles; assign the user a role instead"
+            )
+        
         success = casbin_enforcer.add_policy(
             subject=permission.subject,
             object=permission.object,
             action=permission.action,
-            effect=permission.effect
+            effect=permission.effect,
+            override=permission.override
         )
         
         if success:
-            logger.info(f"Permission added: {permission.subject} -> {permission.object} [{permission.action}]")
+            logger.info("Permission added: %s -> %s [%s]", permission.subject, permission.object, permission.action)
         else:
-            logger.warning(f"Permission already exists or failed to add")
+            logger.warning("Permission already exists or failed to add")
         
         return success
     
@@ -263,9 +280,9 @@ class RoleService:
         )
         
         if success:
-            logger.info(f"Permission removed: {permission.subject} -> {permission.object} [{permission.action}]")
+            logger.info("Permission removed: %s -> %s [%s]", permission.subject, permission.object, permission.action)
         else:
-            logger.warning(f"Permission not found or failed to remove")
+            logger.warning("Permission not found or failed to remove")
         
         return success
     
@@ -6,8 +6,8 @@ and user profile management.
 """
 
 from typing import Optional, List, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, select
 from fastapi import HTTPException, status
 
 from app.models.user import User, Role, UserRole
@@ -105,12 +105,12 @@ class UserService:
                     )
                     db.add(user_role)
                 else:
-                    logger.warning(f"Role '{role_name}' not found")
+                    logger.warning("Role '%s' not found", role_name)
         
         db.commit()
         db.refresh(new_user)
         
-        logger.info(f"User created: {new_user.username} (ID: {new_user.id})")
+        logger.info("User created: %s (ID: %s)", new_user.username, new_user.id)
         return new_user
     
     def get_user_by_id(self, db: Session, user_id: int) -> Optional[User]:
@@ -171,15 +171,26 @@ class UserService:
         Returns:
             Tuple of (users list, total count)
         """
-        query = db.query(User)
-        
+        stmt = select(User)
         if is_active is not None:
-            query = query.filter(User.is_active == is_active)
-        
-        total = query.count()
-        users = query.offset(skip).limit(limit).all()
-        
-        return users, total
+            stmt = stmt.where(User.is_active == is_active)
+        
+        # One query for the page and its total (COUNT(*) OVER ()), plus one
+        # for the roles of every user on it, instead of a lazy load per user
+        rows = db.execute(
+            stmt.add_columns(func.count().over())
+            .options(selectinload(User.user_roles).joinedload(UserRole.role))
+            .order_by(User.id)
+            .offset(skip)
+            .limit(limit)
+        ).all()
+        if rows:
+            return [user for user, _ in rows], rows[0][1]
+        if not skip:
+            return [], 0
+        # Past the last page no row carries the window total; count separately
+        total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+        return [], total
     
     def update_user(
         self,
@@ -237,7 +248,7 @@ class UserService:
         db.commit()
         db.refresh(user)
         
-        logger.info(f"User updated: {user.username} (ID: {user.id})")
+        logger.info("User updated: %s (ID: %s)", user.username, user.id)
         return user
     
     def delete_user(self, db: Session, user_id: int) -> bool:
@@ -265,7 +276,7 @@ class UserService:
         db.delete(user)
         db.commit()
         
-        logger.info(f"User deleted: {user.username} (ID: {user.id})")
+        logger.info("User deleted: %s (ID: %s)", user.username, user.id)
         return True
     
     def assign_role(
@@ -326,7 +337,7 @@ class UserService:
         db.add(user_role)
         db.commit()
         
-        logger.info(f"Role '{role_name}' assigned to user {user.username}")
+        logger.info("Role '%s' assigned to user %s", role_name, user.username)
         return True
     
     def remove_role(
@@ -379,7 +390,7 @@ class UserService:
         db.delete(user_role)
         db.commit()
         
-        logger.info(f"Role '{role_name}' removed from user {user.username}")
+        logger.info("Role '%s' removed from user %s", role_name, user.username)
         return True
     
     def get_user_roles(self, db: Session, user_id: int) -> List[str]:
@@ -450,7 +461,7 @@ class UserService:
         user.hashed_password = password_hasher.hash_password(new_password)
         db.commit()
         
-        logger.info(f"Password changed for user: {user.username}")
+        logger.info("Password changed for user: %s", user.username)
         return True
     
     def get_user_stats(self, db: Session) -> UserStats:
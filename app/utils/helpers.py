@@ -1,9 +1,23 @@
 
+import asyncio
 import hashlib
 import os
-from typing import Optional
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, Tuple, Union
 from datetime import datetime
 
+import orjson
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+# Uploads are copied to disk in chunks of this size (1 MiB)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Upload classification: DICOM is recognised by extension, images by MIME type
+DICOM_EXTENSIONS = frozenset({".dcm", ".dicom"})
+IMAGE_CONTENT_PREFIX = "image/"
+
 def generate_file_hash(file_path: str) -> str:
     """Generate SHA256 hash of file"""
     sha256_hash = hashlib.sha256()
@@ -12,6 +26,71 @@ def generate_file_hash(file_path: str) -> str:
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
+def _disk_fileno(src: BinaryIO) -> Optional[int]:
+    """File descriptor of an upload already spooled to disk, or None while in memory"""
+    # SpooledTemporaryFile.fileno() would force an in-memory upload onto disk,
+    # so ask the underlying file instead
+    try:
+        return getattr(src, "_file", src).fileno()
+    except (AttributeError, OSError):
+        return None
+
+def _copy_upload(src: BinaryIO, file_path: Union[str, os.PathLike], chunk_size: int) -> int:
+    """Copy a spooled upload to file_path with blocking I/O; return bytes written"""
+    with open(file_path, "wb") as dst:
+        src_fd = _disk_fileno(src)
+        if src_fd is not None and hasattr(os, "copy_file_range"):
+            # Large uploads are already on disk: copy in-kernel, never through Python
+            offset = src.tell()
+            written = 0
+            try:
+                while copied := os.copy_file_range(src_fd, dst.fileno(), chunk_size, offset + written):
+                    written += copied
+                src.seek(offset + written)
+                return written
+            except OSError:
+                # Unsupported by this filesystem/kernel: fall back to a user-space copy
+                src.seek(offset)
+                dst.seek(0)
+                dst.truncate()
+        shutil.copyfileobj(src, dst, chunk_size)
+        return dst.tell()
+
+async def save_upload_file(upload: UploadFile, file_path: Union[str, os.PathLike], chunk_size: int = UPLOAD_CHUNK_SIZE) -> int:
+    """Stream an uploaded file to disk in one worker-thread call; return bytes written"""
+    # One threadpool hop for the whole copy instead of two (read + write) per chunk
+    return await run_in_threadpool(_copy_upload, upload.file, file_path, chunk_size)
+
+async def read_upload_file(upload: UploadFile, max_size: int) -> bytes:
+    """Read an uploaded file into memory; raise ValueError past max_size bytes"""
+    # The multipart parser already knows the size, so oversized uploads are
+    # rejected without reading them at all
+    if upload.size is not None and upload.size > max_size:
+        raise ValueError(f"File exceeds maximum upload size of {max_size} bytes")
+    # One bounded read in a worker thread: no per-chunk hops, no buffer regrowth
+    # and no final copy out of an accumulation buffer
+    data = await run_in_threadpool(upload.file.read, max_size + 1)
+    if len(data) > max_size:
+        raise ValueError(f"File exceeds maximum upload size of {max_size} bytes")
+    return data
+
+async def remove_files(file_paths: Iterable[Union[str, os.PathLike]]) -> None:
+    """Delete files concurrently in worker threads, ignoring any already gone"""
+    # Best-effort cleanup: one failed unlink must not stop the others
+    await asyncio.gather(
+        *(run_in_threadpool(Path(file_path).unlink, missing_ok=True) for file_path in file_paths),
+        return_exceptions=True
+    )
+
+def classify_upload(upload: UploadFile) -> Tuple[str, bool, bool]:
+    """Classify an upload in one pass; return (lowercased extension, is_dicom, is_image)"""
+    ext = os.path.splitext(upload.filename or "")[1].lower()
+    return ext, ext in DICOM_EXTENSIONS, (upload.content_type or "").startswith(IMAGE_CONTENT_PREFIX)
+
+def dumps_json(obj) -> str:
+    """Serialize to a JSON string with orjson (handles NumPy scalars too)"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
 def validate_file_size(file_path: str, max_size_mb: int = 10) -> bool:
     """Validate file size"""
     file_size = os.path.getsize(file_path)
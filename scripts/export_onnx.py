@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Script to export the chest X-ray classifier to ONNX
+Requires: pip install onnx (and onnxruntime to serve the exported model)
+Usage: python scripts/export_onnx.py [output_path]
+
+Loads the weights from MODEL_PATH and writes an ONNX model with a dynamic
+batch dimension. Set ONNX_MODEL_PATH to the output path to serve it.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.ml.inference import ModelInference
+
+if __name__ == "__main__":
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "./ml_models/chest_xray_model.onnx"
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+    model_inference = ModelInference()
+    model_inference.load_model()
+    model_inference.export_onnx(output_path)
+    print(f"Exported ONNX model to {output_path}")
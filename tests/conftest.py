@@ -6,11 +6,13 @@ Provides database setup/teardown and common test fixtures.
 
 import pytest
 import os
+import tempfile
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
 # Import Base and all models to ensure they're registered
+from app.core.config import get_settings
 from app.core.database import Base, get_db
 from app.models.user import User, Role, UserRole, Session as SessionModel, AuditLog
 from app.main import app
@@ -22,6 +24,9 @@ from app.api.dependencies import limiter
 # Use in-memory SQLite database for tests
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
+# Keep Casbin policies added by tests out of the development database
+get_settings().casbin_policy_db_url = f"sqlite:///{tempfile.mkdtemp()}/casbin_policy.db"
+
 
 @pytest.fixture(scope="function")
 def test_engine():
@@ -0,0 +1,92 @@
+"""
+Test cases for the background audit log writer.
+
+Tests cover batched background writes, flushing on shutdown and the
+synchronous fallback.
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.user import AuditLog
+from app.schemas.audit import AuditLogCreate
+from app.services.audit_queue import AuditLogWriter
+
+
+def make_log(i: int) -> AuditLogCreate:
+    """Build an audit log entry."""
+    return AuditLogCreate(action="login", resource="auth", status="success", details=f"attempt {i}")
+
+
+class TestAuditLogWriter:
+    """Test suite for AuditLogWriter."""
+
+    @pytest.fixture
+    def writer(self, test_engine):
+        """Writer bound to the test database that waits long enough to batch everything."""
+        writer = AuditLogWriter(
+            session_factory=sessionmaker(bind=test_engine),
+            batch_size=3,
+            flush_interval=5.0
+        )
+        yield writer
+        writer.stop()
+
+    def stored_details(self, db: Session):
+        """Details of every stored audit log, in insertion order."""
+        return db.scalars(select(AuditLog.details).order_by(AuditLog.id)).all()
+
+    def test_submit_writes_in_batches(self, db: Session, writer: AuditLogWriter, test_engine):
+        """Test queued entries are inserted batch_size at a time and flushed on stop."""
+        inserts = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT INTO audit_logs"):
+                inserts.append(len(parameters) if executemany else 1)
+
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            writer.start()
+            for i in range(5):
+                writer.submit(db, make_log(i))
+            writer.stop()
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+
+        assert inserts == [3, 2]
+        assert self.stored_details(db) == [f"attempt {i}" for i in range(5)]
+        assert all(log.timestamp is not None for log in db.scalars(select(AuditLog)))
+
+    def test_submit_writes_inline_when_not_running(self, db: Session, writer: AuditLogWriter):
+        """Test entries are written on the request session without a running writer."""
+        writer.submit(db, make_log(0))
+
+        assert self.stored_details(db) == ["attempt 0"]
+
+    def test_submit_writes_inline_when_queue_full(self, db: Session, test_engine):
+        """Test a backed-up queue falls back to a synchronous write instead of dropping entries."""
+        release = threading.Event()
+        session_factory = sessionmaker(bind=test_engine)
+
+        def blocked_session():
+            release.wait()
+            return session_factory()
+
+        writer = AuditLogWriter(session_factory=blocked_session, batch_size=1, max_queue_size=1)
+        writer.start()
+        try:
+            writer.submit(db, make_log(0))
+            while not writer._queue.empty():  # the writer thread takes it and blocks
+                time.sleep(0.01)
+            writer.submit(db, make_log(1))  # fills the queue
+            writer.submit(db, make_log(2))  # written inline
+            assert self.stored_details(db) == ["attempt 2"]
+        finally:
+            release.set()
+            writer.stop()
+
+        assert sorted(self.stored_details(db)) == ["attempt 0", "attempt 1", "attempt 2"]
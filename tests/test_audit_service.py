@@ -0,0 +1,197 @@
+"""
+Test cases for AuditService.
+
+Tests cover paginated and filtered retrieval and streaming CSV export of audit logs.
+"""
+
+import csv
+from io import StringIO
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.api.v2.audit import get_current_user
+from app.services.audit_service import AuditService
+from app.models.user import User
+from app.schemas.audit import AuditLogCreate, AuditLogFilter
+from app.core.security import password_hasher
+
+
+class TestAuditService:
+    """Test suite for AuditService."""
+    
+    @pytest.fixture
+    def audit_service(self):
+        """Create AuditService instance."""
+        return AuditService()
+    
+    @pytest.fixture
+    def test_user(self, db: Session):
+        """Create a test user."""
+        user = User(
+            username="audituser",
+            email="audit@example.com",
+            hashed_password=password_hasher.hash_password("TestPassword123!"),
+            is_active=True
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    
+    @pytest.fixture
+    def audit_logs(self, db: Session, audit_service: AuditService, test_user):
+        """Create five audit logs, one of them anonymous."""
+        logs = []
+        for i in range(5):
+            logs.append(audit_service.log_action(db, AuditLogCreate(
+                user_id=None if i == 4 else test_user.id,
+                action="login" if i % 2 == 0 else "logout",
+                resource="auth",
+                status="success",
+                details=f'{{"attempt": {i}}}'
+            )))
+        return logs
+    
+    def parse(self, text: str):
+        """Parse CSV text into rows."""
+        return list(csv.reader(StringIO(text)))
+    
+    def test_get_logs_counts_total_in_one_query(self, db: Session, audit_service: AuditService, audit_logs):
+        """Test a page and its filtered total come back from a single SELECT."""
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            logs, total = audit_service.get_logs(db, skip=0, limit=2, filter_params=AuditLogFilter(action="login"))
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        
+        assert total == 3
+        assert len(logs) == 2
+        assert all(log.action == "login" for log in logs)
+        assert len(statements) == 1
+    
+    def test_get_logs_total_past_last_page(self, db: Session, audit_service: AuditService, audit_logs):
+        """Test the total is still reported when the page is empty."""
+        logs, total = audit_service.get_logs(db, skip=10, limit=2)
+        
+        assert logs == []
+        assert total == len(audit_logs)
+    
+    def test_get_user_logs_newest_first(self, db: Session, audit_service: AuditService, audit_logs, test_user):
+        """Test a user's logs are paged newest first with their total."""
+        logs, total = audit_service.get_user_logs(db, test_user.id, skip=1, limit=2)
+        
+        assert total == 4
+        assert len(logs) == 2
+        assert logs[0].timestamp >= logs[1].timestamp
+    
+    def test_get_logs_cursor_pages_match_offset_pages(self, db: Session, audit_service: AuditService, audit_logs):
+        """Test walking by cursor visits the same logs in the same order as offsets."""
+        by_offset = [log.id for skip in range(0, 5, 2) for log in audit_service.get_logs(db, skip, 2)[0]]
+        
+        by_cursor, cursor = [], None
+        while True:
+            logs, total = audit_service.get_logs(db, limit=2, before_id=cursor)
+            assert total == len(audit_logs)
+            if not logs:
+                break
+            by_cursor.extend(log.id for log in logs)
+            cursor = logs[-1].id
+        
+        assert by_cursor == by_offset
+        assert sorted(by_cursor) == sorted(log.id for log in audit_logs)
+    
+    def test_list_endpoint_pages_by_cursor(self, audit_logs):
+        """Test the list endpoint hands out a cursor while pages are full."""
+        app.dependency_overrides[get_current_user] = lambda: None
+        try:
+            client = TestClient(app)
+            first = client.get("/api/v2/audit/", params={"limit": 3}).json()
+            second = client.get("/api/v2/audit/", params={"limit": 3, "cursor": first["next_cursor"]}).json()
+        finally:
+            del app.dependency_overrides[get_current_user]
+        
+        assert first["page"] == 1
+        assert first["next_cursor"] == first["logs"][-1]["id"]
+        assert second["page"] is None
+        assert second["next_cursor"] is None
+        assert len(second["logs"]) == 2
+        assert not {log["id"] for log in first["logs"]} & {log["id"] for log in second["logs"]}
+    
+    def test_list_endpoint_rejects_zero_limit(self):
+        """Test limit=0 is a validation error rather than a division by zero."""
+        app.dependency_overrides[get_current_user] = lambda: None
+        try:
+            response = TestClient(app).get("/api/v2/audit/", params={"limit": 0})
+        finally:
+            del app.dependency_overrides[get_current_user]
+        
+        assert response.status_code == 422
+    
+    def test_get_stats(self, db: Session, audit_service: AuditService, audit_logs):
+        """Test statistics are aggregated over all logs."""
+        audit_service.log_action(db, AuditLogCreate(
+            user_id=None, action="login", resource="auth", status="failure"
+        ))
+        
+        stats = audit_service.get_stats(db)
+        
+        assert stats.total_logs == 6
+        assert stats.successful_actions == 5
+        assert stats.failed_actions == 1
+        assert stats.unique_users == 1
+        assert stats.actions_by_type == {"login": 4, "logout": 2}
+        assert len(stats.recent_failures) == 1
+    
+    def test_iter_logs_csv_streams_in_batches(self, db: Session, audit_service: AuditService, audit_logs):
+        """Test the header comes first and rows arrive batch_size at a time."""
+        chunks = list(audit_service.iter_logs_csv(db, batch_size=2))
+        
+        assert self.parse(chunks[0]) == [[
+            'ID', 'User ID', 'Username', 'Action', 'Resource', 'Resource ID',
+            'Status', 'IP Address', 'Timestamp', 'Details'
+        ]]
+        assert [len(self.parse(chunk)) for chunk in chunks[1:]] == [2, 2, 1]
+        rows = [row for chunk in chunks[1:] for row in self.parse(chunk)]
+        assert sorted(int(row[0]) for row in rows) == sorted(log.id for log in audit_logs)
+    
+    def test_iter_logs_csv_joins_usernames(self, db: Session, audit_service: AuditService, audit_logs, test_user):
+        """Test usernames are filled in, with N/A for anonymous entries."""
+        rows = self.parse("".join(audit_service.iter_logs_csv(db)))[1:]
+        usernames = {int(row[0]): row[2] for row in rows}
+        
+        assert usernames[audit_logs[0].id] == test_user.username
+        assert usernames[audit_logs[4].id] == "N/A"
+    
+    def test_iter_logs_csv_applies_filters(self, db: Session, audit_service: AuditService, audit_logs):
+        """Test filter parameters limit the exported rows."""
+        rows = self.parse("".join(audit_service.iter_logs_csv(db, AuditLogFilter(action="logout"))))[1:]
+        
+        assert len(rows) == 2
+        assert all(row[3] == "logout" for row in rows)
+    
+    def test_export_logs_csv_matches_stream(self, db: Session, audit_service: AuditService, audit_logs):
+        """Test the string export is the concatenated stream."""
+        assert audit_service.export_logs_csv(db) == "".join(audit_service.iter_logs_csv(db))
+    
+    def test_export_endpoint_streams_csv(self, audit_logs):
+        """Test the export endpoint returns the logs as a CSV attachment."""
+        app.dependency_overrides[get_current_user] = lambda: None
+        try:
+            response = TestClient(app).get("/api/v2/audit/export")
+        finally:
+            del app.dependency_overrides[get_current_user]
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        assert len(self.parse(response.text)) == len(audit_logs) + 1
@@ -277,11 +277,12 @@ class TestLogin(TestAuthService):
             password="TestPassword123!"
         )
         
-        tokens, requires_2fa = auth_service.login(db, credentials)
+        tokens, requires_2fa, user = auth_service.login(db, credentials)
         
         assert requires_2fa is False
         assert tokens is not None
         assert isinstance(tokens, TokenResponse)
+        assert user.id == test_user.id
     
     def test_login_wrong_credentials(self, db: Session, auth_service: AuthService, test_user):
         """Test login with wrong credentials."""
@@ -307,10 +308,11 @@ class TestLogin(TestAuthService):
             password="TestPassword123!"
         )
         
-        tokens, requires_2fa = auth_service.login(db, credentials)
+        tokens, requires_2fa, user = auth_service.login(db, credentials)
         
         assert requires_2fa is True
         assert tokens is None
+        assert user.id == test_user.id
 
 
 class TestLoginWith2FA(TestAuthService):
@@ -331,10 +333,11 @@ class TestLoginWith2FA(TestAuthService):
             totp_code="123456"
         )
         
-        tokens = auth_service.login_with_2fa(db, credentials)
+        tokens, user = auth_service.login_with_2fa(db, credentials)
         
         assert isinstance(tokens, TokenResponse)
         assert tokens.access_token is not None
+        assert user.id == test_user.id
     
     def test_login_with_2fa_invalid_code(self, db: Session, auth_service: AuthService, test_user, mocker):
         """Test 2FA login with invalid code."""
@@ -8,7 +8,9 @@ import pytest
 from fastapi.testclient import TestClient
 import io
 from PIL import Image
+from pydicom.data import get_testdata_file
 
+from app.core.config import get_settings
 from app.main import app
 
 # Use the test client with the proper fixtures from conftest.py
@@ -82,6 +84,43 @@ def test_cade_detect_invalid_file():
     assert response.status_code in [400, 422]
 
 
+def test_cade_detect_corrupted_image():
+    """Test CADe detection rejects an image that cannot be decoded."""
+    response = client.post(
+        "/api/v1/cade/detect",
+        files={"file": ("xray.png", io.BytesIO(b"not really a png"), "image/png")}
+    )
+    
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid image format")
+
+
+def test_cade_detect_dicom():
+    """Test CADe detection accepts a DICOM file and stores its metadata."""
+    with open(get_testdata_file("CT_small.dcm"), "rb") as f:
+        dicom = io.BytesIO(f.read())
+    
+    response = client.post(
+        "/api/v1/cade/detect",
+        files={"file": ("scan.dcm", dicom, "application/dicom")}
+    )
+    
+    assert response.status_code == 201
+    assert response.json()["image_filename"].endswith(".dcm")
+
+
+def test_cade_detect_file_too_large():
+    """Test CADe detection rejects uploads over the configured size limit."""
+    oversized = io.BytesIO(b"\0" * (get_settings().max_upload_size + 1))
+    
+    response = client.post(
+        "/api/v1/cade/detect",
+        files={"file": ("xray.png", oversized, "image/png")}
+    )
+    
+    assert response.status_code == 413
+
+
 def test_cade_detection_bounding_boxes():
     """Test that detections contain valid bounding boxes."""
     img = create_test_image(format="PNG")
@@ -165,3 +204,24 @@ def test_cade_detect_batch_max_limit():
     assert response.status_code == 201
     data = response.json()
     assert data["total_images"] == 50
+
+
+def test_cade_detect_batch_partial_failure():
+    """Test batch CADe detection keeps going when some files are invalid."""
+    files = [
+        ("files", ("valid_0.png", create_test_image(), "image/png")),
+        ("files", ("corrupt.png", io.BytesIO(b"not really a png"), "image/png")),
+        ("files", ("notes.txt", io.BytesIO(b"invalid"), "text/plain")),
+        ("files", ("valid_1.png", create_test_image(), "image/png")),
+    ]
+    
+    response = client.post("/api/v1/cade/detect/batch", files=files)
+    
+    assert response.status_code == 201
+    data = response.json()
+    assert data["total_images"] == 4
+    assert data["successful"] == 2
+    assert data["failed"] == 2
+    assert {err["filename"] for err in data["errors"]} == {"corrupt.png", "notes.txt"}
+    for result in data["results"]:
+        assert result["num_findings"] == len(result["detections"])
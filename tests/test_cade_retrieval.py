@@ -127,6 +127,33 @@ def test_get_all_detections_with_pagination():
     assert response.status_code == 200
 
 
+def test_get_all_detections_with_cursor():
+    """Test keyset pagination through the cursor parameter and next-cursor header."""
+    for i in range(3):
+        img = create_test_image()
+        client.post(
+            "/api/v1/cade/detect",
+            files={"file": (f"xray_{i}.png", img, "image/png")}
+        )
+    
+    all_ids = [d["id"] for d in client.get("/api/v1/cade/detections").json()]
+    if not all_ids:
+        pytest.skip("No detections were produced")
+    
+    response = client.get("/api/v1/cade/detections?limit=1")
+    assert response.status_code == 200
+    cursor = response.headers["X-Next-Cursor"]
+    assert cursor == str(all_ids[0])
+    
+    response = client.get(f"/api/v1/cade/detections?cursor={cursor}&limit=500")
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()] == all_ids[1:]
+    assert "X-Next-Cursor" not in response.headers
+    
+    response = client.get("/api/v1/cade/detections?cursor=-1")
+    assert response.status_code == 422
+
+
 def test_get_all_detections_with_filter():
     """Test filtering detections by finding type."""
     response = client.get("/api/v1/cade/detections?finding_type=Pneumothorax")
@@ -0,0 +1,631 @@
+"""
+Tests for shared FastAPI dependencies.
+
+Covers the access-token verification cache used by `get_current_user`
+and the Casbin decision cache used by `check_permission`, including its
+invalidation on Casbin policy changes.
+"""
+
+import ast
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, inspect
+from starlette.requests import Request
+
+from app.api import dependencies
+from app.core import casbin_enforcer as casbin_module
+from app.core.casbin_enforcer import (
+    CasbinEnforcer,
+    _BulkAdapter,
+    _ParsedMatcherEnforcer,
+    _PolicyIndex,
+    casbin_enforcer,
+)
+from app.core.security import token_manager, password_hasher
+from app.models.user import User, Role, UserRole
+from app.schemas.role import PermissionCreate
+from app.services.role_service import RoleService
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty token and permission caches."""
+    dependencies.clear_token_cache()
+    dependencies.clear_permission_cache()
+    yield
+    dependencies.clear_token_cache()
+    dependencies.clear_permission_cache()
+
+
+class TestTokenCache:
+    """Test suite for the access-token verification cache."""
+
+    def test_valid_token_returns_user_id(self):
+        """Test that a valid access token resolves to its subject."""
+        token = token_manager.create_access_token({"sub": "42"})
+
+        assert dependencies._verify_access_token(token) == 42
+
+    def test_invalid_token_returns_none(self):
+        """Test that an invalid token is rejected and not cached."""
+        assert dependencies._verify_access_token("not-a-token") is None
+        assert len(dependencies._token_cache) == 0
+
+    def test_refresh_token_rejected(self):
+        """Test that a refresh token cannot be used as an access token."""
+        token = token_manager.create_refresh_token({"sub": "42"})
+
+        assert dependencies._verify_access_token(token) is None
+
+    def test_cache_hit_skips_signature_verification(self, mocker):
+        """Test that a repeated token is served from the cache."""
+        token = token_manager.create_access_token({"sub": "7"})
+        spy = mocker.spy(token_manager, "verify_token")
+
+        assert dependencies._verify_access_token(token) == 7
+        assert dependencies._verify_access_token(token) == 7
+        assert spy.call_count == 1
+
+    def test_expired_cache_entry_is_reverified(self, mocker):
+        """Test that a cached entry past the token expiry is not trusted."""
+        token = token_manager.create_access_token({"sub": "7"})
+        key = dependencies._token_cache_key(token)
+        dependencies._token_cache[key] = (7, time.time() - 1)
+        spy = mocker.spy(token_manager, "verify_token")
+
+        assert dependencies._verify_access_token(token) == 7
+        assert spy.call_count == 1
+
+    def test_clear_token_cache_for_one_user(self):
+        """Test that clearing one user's tokens keeps other users' entries."""
+        dependencies._verify_access_token(token_manager.create_access_token({"sub": "7"}))
+        dependencies._verify_access_token(token_manager.create_access_token({"sub": "8"}))
+
+        dependencies.clear_token_cache(user_id=7)
+
+        assert [user_id for user_id, _ in dependencies._token_cache.values()] == [8]
+
+
+class TestBearerToken:
+    """Test suite for the `Authorization` header scheme."""
+
+    @staticmethod
+    async def extract(authorization=None):
+        """Run the security dependency against a request with the given header."""
+        headers = [] if authorization is None else [(b"authorization", authorization.encode())]
+        request = Request({"type": "http", "headers": headers})
+        return await dependencies.security(request)
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("header", ["Bearer abc.def", "bearer abc.def"])
+    async def test_bearer_token_extracted(self, header):
+        """Test that the raw token is returned for a bearer header."""
+        assert await self.extract(header) == "abc.def"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("header", [None, "", "Bearer", "Bearer ", "Basic abc.def"])
+    async def test_missing_or_other_scheme(self, header):
+        """Test that missing or non-bearer headers yield no token."""
+        assert await self.extract(header) is None
+
+
+class TestClientInfo:
+    """Test suite for the `client_info` dependency."""
+
+    def test_client_address_and_user_agent(self):
+        """Test that the client IP and user agent are read from the request."""
+        request = Request({
+            "type": "http",
+            "headers": [(b"user-agent", b"pytest")],
+            "client": ("10.0.0.1", 5000),
+        })
+
+        assert dependencies.client_info(request) == ("10.0.0.1", "pytest")
+
+    def test_missing_client_and_user_agent(self):
+        """Test that an unknown client and missing header yield None."""
+        info = dependencies.client_info(Request({"type": "http", "headers": []}))
+
+        assert info.ip is None
+        assert info.ua is None
+
+
+class TestUserOrIpKey:
+    """Test suite for the per-user rate limit key."""
+
+    @staticmethod
+    def request(authorization=None):
+        """Build a request from 10.0.0.1 with the given header."""
+        headers = [] if authorization is None else [(b"authorization", authorization.encode())]
+        return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 5000)})
+
+    def test_authenticated_request_keyed_by_user(self):
+        """Test that a valid bearer token keys the limit by its user."""
+        token = token_manager.create_access_token({"sub": "42"})
+
+        assert dependencies.user_or_ip_key(self.request(f"Bearer {token}")) == "user:42"
+
+    @pytest.mark.parametrize("header", [None, "Bearer not-a-token"])
+    def test_anonymous_request_keyed_by_address(self, header):
+        """Test that requests without a valid token are keyed by client address."""
+        assert dependencies.user_or_ip_key(self.request(header)) == "10.0.0.1"
+
+
+class TestGetCurrentUser:
+    """Test suite for the `get_current_user` dependency."""
+
+    @pytest.fixture
+    def doctor(self, db):
+        """Create a user holding the seeded 'doctor' role and return its ID."""
+        user = User(
+            username="dr_who",
+            email="dr_who@example.com",
+            hashed_password=password_hasher.hash_password("TestPassword123!"),
+        )
+        db.add(user)
+        db.flush()
+        role = db.query(Role).filter(Role.name == "doctor").first()
+        db.add(UserRole(user_id=user.id, role_id=role.id))
+        db.commit()
+        user_id = user.id
+        db.expunge_all()
+        return user_id
+
+    @staticmethod
+    def bearer(user_id):
+        """Build a bearer token for a user."""
+        return token_manager.create_access_token({"sub": str(user_id)})
+
+    def test_roles_loaded_with_user(self, db, doctor):
+        """Test that the user and its roles are loaded without lazy queries."""
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+
+        user = dependencies.get_current_user(self.bearer(doctor), db)
+        loaded = len(statements)
+
+        assert user._casbin_roles == ["doctor"]
+        assert user.roles == ["doctor"]
+        assert len(statements) == loaded
+
+    def test_missing_credentials(self, db):
+        """Test that a request without a token is rejected."""
+        with pytest.raises(HTTPException) as exc:
+            dependencies.get_current_user(None, db)
+        assert exc.value.status_code == 401
+
+    def test_unknown_user(self, db):
+        """Test that a token for a deleted user is rejected."""
+        with pytest.raises(HTTPException) as exc:
+            dependencies.get_current_user(self.bearer(9999), db)
+        assert exc.value.status_code == 401
+
+
+class TestPermissionCache:
+    """Test suite for the Casbin decision cache."""
+
+    @staticmethod
+    def make_user(user_id=1, roles=("doctor",)):
+        """Build a minimal user object carrying Casbin roles."""
+        return SimpleNamespace(id=user_id, _casbin_roles=list(roles))
+
+    def test_decision_is_cached(self, mocker):
+        """Test that repeated checks hit the enforcer only once."""
+        enforce = mocker.patch.object(casbin_enforcer, "check_permission", return_value=True)
+        user = self.make_user()
+
+        assert dependencies.check_permission(user, "/api/v2/roles", "GET") is True
+        assert dependencies.check_permission(user, "/api/v2/roles", "GET") is True
+        assert enforce.call_count == 1
+
+    def test_denied_decision_is_cached(self, mocker):
+        """Test that negative decisions are cached as well."""
+        enforce = mocker.patch.object(casbin_enforcer, "check_permission", return_value=False)
+        user = self.make_user()
+
+        assert dependencies.check_permission(user, "/api/v2/roles", "POST") is False
+        assert dependencies.check_permission(user, "/api/v2/roles", "POST") is False
+        assert enforce.call_count == 1
+
+    def test_role_order_does_not_matter(self, mocker):
+        """Test that the same role set shares a cache entry."""
+        enforce = mocker.patch.object(casbin_enforcer, "check_permission", return_value=True)
+
+        dependencies.check_permission(self.make_user(roles=("a", "b")), "/r", "GET")
+        dependencies.check_permission(self.make_user(roles=("b", "a")), "/r", "GET")
+        assert enforce.call_count == 1
+
+    def test_clear_for_single_user(self, mocker):
+        """Test that clearing one user keeps other users' decisions."""
+        enforce = mocker.patch.object(casbin_enforcer, "check_permission", return_value=True)
+        alice, bob = self.make_user(1), self.make_user(2)
+        dependencies.check_permission(alice, "/r", "GET")
+        dependencies.check_permission(bob, "/r", "GET")
+
+        dependencies.clear_permission_cache(user_id=1)
+        dependencies.check_permission(alice, "/r", "GET")
+        dependencies.check_permission(bob, "/r", "GET")
+        assert enforce.call_count == 3
+
+    def test_policy_change_invalidates_cache(self, mocker):
+        """Test that RoleService policy mutations flush cached decisions."""
+        mocker.patch.object(casbin_enforcer, "save_policy", return_value=True)
+        enforce = mocker.patch.object(casbin_enforcer, "check_permission", return_value=False)
+        user = self.make_user()
+        permission = PermissionCreate(subject="doctor", object="/r", action="GET")
+        dependencies.check_permission(user, "/r", "GET")
+
+        RoleService().add_permission(permission)
+        try:
+            dependencies.check_permission(user, "/r", "GET")
+            assert enforce.call_count == 2
+        finally:
+            RoleService().remove_permission(permission)
+
+    def test_role_assignment_invalidates_cache(self, mocker):
+        """Test that Casbin role assignment changes flush cached decisions."""
+        mocker.patch.object(casbin_enforcer, "save_policy", return_value=True)
+        enforce = mocker.patch.object(casbin_enforcer, "check_permission", return_value=False)
+        user = self.make_user()
+        dependencies.check_permission(user, "/r", "GET")
+
+        assert casbin_enforcer.add_role_for_user("user:1", "doctor")
+        try:
+            dependencies.check_permission(user, "/r", "GET")
+            assert enforce.call_count == 2
+        finally:
+            casbin_enforcer.remove_role_for_user("user:1", "doctor")
+
+    def test_decision_from_replaced_generation_not_stored(self, mocker):
+        """Test that a decision checked across a policy change is not cached."""
+        mocker.patch.object(casbin_enforcer, "save_policy", return_value=True)
+        permission = PermissionCreate(subject="doctor", object="/r", action="GET")
+
+        def change_policy_mid_check(**kwargs):
+            if enforce.call_count > 1:
+                return True
+            RoleService().add_permission(permission)
+            return False
+
+        enforce = mocker.patch.object(
+            casbin_enforcer, "check_permission", side_effect=change_policy_mid_check
+        )
+        user = self.make_user()
+        try:
+            assert dependencies.check_permission(user, "/r", "GET") is False
+            assert dependencies.check_permission(user, "/r", "GET") is True
+            assert enforce.call_count == 2
+        finally:
+            RoleService().remove_permission(permission)
+
+
+class TestRequirePermission:
+    """Test suite for the `require_permission` dependency factory."""
+
+    def test_denied_raises_fresh_403(self, mocker):
+        """Test that each denial raises its own 403 with the prepared message."""
+        mocker.patch.object(casbin_enforcer, "check_permission", return_value=False)
+        checker = dependencies.require_permission("/api/v2/roles", "POST")
+        user = SimpleNamespace(id=1, _casbin_roles=["doctor"])
+
+        errors = []
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc:
+                checker(user)
+            errors.append(exc.value)
+
+        assert errors[0] is not errors[1]
+        assert errors[0].status_code == 403
+        assert errors[0].detail == "Insufficient permissions to POST /api/v2/roles"
+
+    def test_allowed_returns_user(self, mocker):
+        """Test that a permitted user is passed through."""
+        mocker.patch.object(casbin_enforcer, "check_permission", return_value=True)
+        user = SimpleNamespace(id=1, _casbin_roles=["admin"])
+
+        assert dependencies.require_permission("/api/v2/roles", "GET")(user) is user
+
+
+class TestParsedMatcherEnforcer:
+    """Test suite for the enforcer that parses its matcher once."""
+
+    def test_matcher_parsed_once(self, mocker):
+        """Test that repeated checks reuse the parsed matcher and still honour role links."""
+        enforcer = _ParsedMatcherEnforcer("casbin/model.conf")
+        enforcer.add_policy("doctor", "/api/v2/roles/*", "GET", "allow")
+        enforcer.add_role_for_user("user:1", "doctor")
+        enforcer.enforce("doctor", "/api/v2/roles/1", "GET")
+        parse = mocker.spy(ast, "parse")
+
+        assert enforcer.enforce("doctor", "/api/v2/roles/5", "GET")
+        assert enforcer.enforce("user:1", "/api/v2/roles/5", "GET")
+        assert not enforcer.enforce("doctor", "/api/v2/roles/5", "DELETE")
+        assert not enforcer.enforce("user:2", "/api/v2/roles/5", "GET")
+
+        enforcer.delete_role_for_user("user:1", "doctor")
+        assert not enforcer.enforce("user:1", "/api/v2/roles/5", "GET")
+        assert parse.call_count == 0
+
+
+
+class TestPolicyIndex:
+    """Test suite for the path-indexed policy evaluation."""
+
+    POLICIES = [
+        ("doctor", "/api/v2/roles/*", "GET", "allow"),
+        ("doctor", "/api/v2/roles/:id/users", "(GET)|(POST)", "allow"),
+        ("doctor", "/api/v2/roles/9", "GET", "deny"),
+        ("nurse", "/api/v2/roles", "GET", "allow"),
+        ("nurse", "/api/v1.0/*", "GET", "allow"),
+        ("admin", "*", ".*", "allow"),
+        ("auditor", "/api/v2/audit/:section", "GET", "allow"),
+        ("auditor", "/api/v2/*/export", "GET", "allow"),
+    ]
+    PATHS = [
+        "/api/v2/roles", "/api/v2/roles/", "/api/v2/roles/1", "/api/v2/roles/9",
+        "/api/v2/roles/1/users", "/api/v2/roles//users", "/api/v1.0/x", "/api/v1x0/x",
+        "/api/v2/audit/stats", "/api/v2/audit/", "/api/v2/audit/export", "/other", "",
+    ]
+
+    def test_decisions_match_pycasbin(self):
+        """Test that the index reaches the same decision as the matcher."""
+        enforcer = _ParsedMatcherEnforcer("casbin/model.conf")
+        for policy in self.POLICIES:
+            enforcer.add_policy(*policy)
+        enforcer.add_role_for_user("user:1", "doctor")
+        enforcer.add_role_for_user("user:2", "nurse")
+        index = _PolicyIndex(enforcer.get_policy(), enforcer.get_grouping_policy())
+        role_manager = enforcer.get_role_manager()
+
+        assert _PolicyIndex.supports(enforcer.model)
+        for subject in ["doctor", "nurse", "admin", "auditor", "user:1", "user:2", "user:3"]:
+            for path in self.PATHS:
+                for action in ["GET", "POST", "DELETE"]:
+                    expected = enforcer.enforce(subject, path, action)
+                    assert index.enforce(role_manager, (subject,), path, action) is expected, (
+                        subject, path, action
+                    )
+
+    def test_patterns_compiled_once(self, mocker):
+        """Test that checks reuse the object and action regexes compiled with the index."""
+        index = _PolicyIndex([list(policy) for policy in self.POLICIES], [])
+        role_manager = _ParsedMatcherEnforcer("casbin/model.conf").get_role_manager()
+        compile_ = mocker.spy(casbin_module.re, "compile")
+
+        assert index.enforce(role_manager, ("nurse",), "/api/v1.0/x", "GET")
+        assert index.enforce(role_manager, ("auditor",), "/api/v2/audit/export", "GET")
+        assert not index.enforce(role_manager, ("doctor",), "/api/v2/roles/9", "GET")
+        assert compile_.call_count == 0
+
+    def test_index_rebuilt_after_policy_change(self, mocker):
+        """Test that a policy change discards the index."""
+        mocker.patch.object(casbin_enforcer, "save_policy", return_value=True)
+        casbin_enforcer.enforce("doctor", "/index-test", "GET")
+        assert casbin_enforcer._policy_index is not None
+
+        casbin_enforcer.add_policy("doctor", "/index-test", "GET")
+        try:
+            assert casbin_enforcer._policy_index is None
+            assert casbin_enforcer.enforce("doctor", "/index-test", "GET")
+        finally:
+            casbin_enforcer.remove_policy("doctor", "/index-test", "GET")
+
+
+class TestEnforceCache:
+    """Test suite for the CasbinEnforcer enforce() result cache."""
+
+    def test_repeated_enforce_evaluated_once(self, mocker):
+        """Test that a repeated check is served without re-evaluating the policy."""
+        casbin_enforcer._enforce_cached.cache_clear()
+        spy = mocker.spy(_PolicyIndex, "enforce")
+
+        first = casbin_enforcer.enforce("doctor", "/api/v2/roles", "GET")
+        assert casbin_enforcer.enforce("doctor", "/api/v2/roles", "GET") is first
+        assert spy.call_count == 1
+
+    def test_policy_change_clears_results(self, mocker):
+        """Test that a policy mutation drops cached results."""
+        mocker.patch.object(casbin_enforcer, "save_policy", return_value=True)
+        assert not casbin_enforcer.enforce("doctor", "/cache-test", "GET")
+
+        assert casbin_enforcer.add_policy("doctor", "/cache-test", "GET")
+        try:
+            assert casbin_enforcer.enforce("doctor", "/cache-test", "GET")
+        finally:
+            casbin_enforcer.remove_policy("doctor", "/cache-test", "GET")
+        assert not casbin_enforcer.enforce("doctor", "/cache-test", "GET")
+
+    def test_errors_are_not_cached(self, mocker):
+        """Test that a failed evaluation is retried on the next check."""
+        casbin_enforcer._enforce_cached.cache_clear()
+        mocker.patch.object(_PolicyIndex, "enforce", side_effect=[RuntimeError, True])
+
+        assert casbin_enforcer.enforce("doctor", "/r", "GET") is False
+        assert casbin_enforcer.enforce("doctor", "/r", "GET") is True
+
+
+class TestPolicyChangeRace:
+    """Test suite for checks that overlap a policy change."""
+
+    @pytest.fixture(autouse=True)
+    def policy_db(self, tmp_path, monkeypatch):
+        """Point the policy table at a temporary database."""
+        monkeypatch.setattr(
+            casbin_module.settings, "casbin_policy_db_url", f"sqlite:///{tmp_path / 'policy.db'}"
+        )
+
+    def test_revoke_before_result_stored(self):
+        """Test that a result stored after a revoke is not served afterwards."""
+
+        class RevokingEnforcer(CasbinEnforcer):
+            """Revokes the grant once a check has evaluated but not yet cached it."""
+
+            def _enforce_uncached(self, *args):
+                result = super()._enforce_uncached(*args)
+                if self.enforcer.has_policy("doctor", "/race-test", "GET", "allow"):
+                    self.remove_policy("doctor", "/race-test", "GET")
+                return result
+
+        enforcer = RevokingEnforcer()
+        enforcer.initialize()
+        assert enforcer.add_policy("doctor", "/race-test", "GET")
+
+        assert enforcer.enforce("doctor", "/race-test", "GET")
+        assert not enforcer.enforce("doctor", "/race-test", "GET")
+        assert not enforcer.check_permission(1, ["doctor"], "/race-test", "GET")
+
+    def test_revoke_during_concurrent_checks(self):
+        """Test that a grant revoked while checks run is denied afterwards."""
+        enforcer = CasbinEnforcer()
+        enforcer.initialize()
+        assert enforcer.add_policy("doctor", "/race-test", "GET")
+        assert enforcer.add_role_for_user("user:1", "doctor")
+
+        def check(i):
+            for _ in range(200):
+                enforcer.check_permission(i % 4, ["doctor"], "/race-test", "GET")
+                enforcer.enforce("user:1", "/race-test", "GET")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            checks = [pool.submit(check, i) for i in range(8)]
+            assert enforcer.remove_policy("doctor", "/race-test", "GET")
+            for future in checks:
+                future.result()
+
+        assert not enforcer.enforce("user:1", "/race-test", "GET")
+        for user_id in range(4):
+            assert not enforcer.check_permission(user_id, ["doctor"], "/race-test", "GET")
+
+
+class TestRoleSetEnforce:
+    """Test suite for resolving database roles in one Casbin check."""
+
+    @pytest.fixture(autouse=True)
+    def admin_policy(self, mocker):
+        """Allow the 'admin' role to POST /roleset-test for the test's duration."""
+        mocker.patch.object(casbin_enforcer, "save_policy", return_value=True)
+        casbin_enforcer.add_policy("admin", "/roleset-test", "POST")
+        yield
+        casbin_enforcer.remove_policy("admin", "/roleset-test", "POST")
+
+    def test_single_evaluation_per_check(self, mocker):
+        """Test that all of a user's roles are evaluated in one pass."""
+        casbin_enforcer._enforce_cached.cache_clear()
+        evaluate = mocker.spy(_PolicyIndex, "enforce")
+
+        assert casbin_enforcer.check_permission(1, ["patient", "admin"], "/roleset-test", "POST")
+        assert evaluate.call_count == 1
+
+    def test_permissions_follow_role_set(self):
+        """Test that a changed role set is honoured on the next check."""
+        assert not casbin_enforcer.check_permission(2, ["patient"], "/roleset-test", "POST")
+        assert casbin_enforcer.check_permission(2, ["patient", "admin"], "/roleset-test", "POST")
+        assert not casbin_enforcer.check_permission(2, [], "/roleset-test", "POST")
+
+    def test_users_share_role_set_results(self, mocker):
+        """Test that users with the same roles share cached results and add no role links."""
+        casbin_enforcer._enforce_cached.cache_clear()
+        role_manager = casbin_enforcer.enforcer.get_role_manager()
+        evaluate = mocker.spy(_PolicyIndex, "enforce")
+        check = lambda user_id: casbin_enforcer.check_permission(
+            user_id, ["admin", "patient"], "/roleset-test", "POST"
+        )
+        check(0)
+        roles_before = len(role_manager.all_roles)
+
+        assert all(check(user_id) for user_id in range(1, 100))
+        assert evaluate.call_count == 1
+        assert len(role_manager.all_roles) == roles_before
+
+    def test_user_rules_still_apply(self):
+        """Test that a Casbin role assignment for the user joins the role set."""
+        assert not casbin_enforcer.check_permission(4, ["patient"], "/roleset-test", "POST")
+
+        assert casbin_enforcer.add_role_for_user("user:4", "admin")
+        try:
+            assert casbin_enforcer.check_permission(4, ["patient"], "/roleset-test", "POST")
+            assert not casbin_enforcer.check_permission(5, ["patient"], "/roleset-test", "POST")
+        finally:
+            casbin_enforcer.remove_role_for_user("user:4", "admin")
+
+    def test_deny_applies_across_roles(self):
+        """Test that a deny on one role overrides an allow from another."""
+        assert casbin_enforcer.add_policy("patient", "/roleset-test", "POST", "deny")
+        try:
+            assert not casbin_enforcer.check_permission(6, ["patient", "admin"], "/roleset-test", "POST")
+        finally:
+            casbin_enforcer.remove_policy("patient", "/roleset-test", "POST", "deny")
+
+
+class TestDatabasePolicyStorage:
+    """Test suite for keeping Casbin policies in a database."""
+
+    @pytest.fixture(autouse=True)
+    def policy_db(self, tmp_path, monkeypatch):
+        """Point the policy table at a temporary database."""
+        monkeypatch.setattr(
+            casbin_module.settings, "casbin_policy_db_url", f"sqlite:///{tmp_path / 'policy.db'}"
+        )
+
+    def test_changes_written_per_rule(self, mocker):
+        """Test that changes are saved row by row and loaded by a new enforcer."""
+        enforcer = CasbinEnforcer()
+        enforcer.initialize()
+        save = mocker.spy(enforcer, "save_policy")
+
+        assert enforcer.add_policy("doctor", "/api/v2/roles", "GET")
+        assert enforcer.add_role_for_user("user:1", "doctor")
+        assert save.call_count == 0
+
+        reloaded = CasbinEnforcer()
+        reloaded.initialize()
+        assert reloaded.enforce("user:1", "/api/v2/roles", "GET")
+
+        assert enforcer.remove_policy("doctor", "/api/v2/roles", "GET")
+        assert reloaded.reload_policy()
+        assert not reloaded.enforce("user:1", "/api/v2/roles", "GET")
+
+    def test_policy_database_holds_only_policies(self):
+        """Test that a separate policy database gets no application tables."""
+        enforcer = CasbinEnforcer()
+        enforcer.initialize()
+
+        policy_engine = enforcer.enforcer.get_adapter()._engine
+        assert inspect(policy_engine).get_table_names() == ["casbin_rule"]
+
+    def test_bulk_add_in_one_transaction(self, mocker):
+        """Test that batch additions are written in a single session."""
+        enforcer = CasbinEnforcer()
+        enforcer.initialize()
+        scope = mocker.spy(_BulkAdapter, "_session_scope")
+
+        assert enforcer.add_policies([
+            ("nurse", "/api/v2/roles", "GET", "allow"),
+            ("doctor", "/api/v2/roles", "GET", "allow"),
+        ])
+        assert enforcer.add_grouping_policies([("user:1", "nurse"), ("user:2", "doctor")])
+        assert scope.call_count == 2
+
+        reloaded = CasbinEnforcer()
+        reloaded.initialize()
+        assert reloaded.enforce("user:1", "/api/v2/roles", "GET")
+        assert reloaded.enforce("user:2", "/api/v2/roles", "GET")
+
+    def test_empty_table_seeded_from_csv(self, tmp_path):
+        """Test that an existing CSV policy file is imported once."""
+        policy_file = tmp_path / "policy.csv"
+        policy_file.write_text("p, doctor, /api/v2/roles, GET, allow\ng, user:1, doctor\n")
+
+        enforcer = CasbinEnforcer(policy_path=str(policy_file))
+        enforcer.initialize()
+        assert enforcer.enforce("user:1", "/api/v2/roles", "GET")
+
+        policy_file.write_text("p, nurse, /api/v2/roles, GET, allow\n")
+        reloaded = CasbinEnforcer(policy_path=str(policy_file))
+        reloaded.initialize()
+        assert reloaded.get_all_policies() == [["doctor", "/api/v2/roles", "GET", "allow"]]
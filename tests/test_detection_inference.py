@@ -0,0 +1,121 @@
+"""
+Detection inference tests.
+
+Tests for the CADe detection model wrapper, including batched inference.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import torch
+from PIL import Image
+
+from app.ml.detection_inference import DetectionInference
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    """Write a few grayscale test images to disk."""
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"xray_{i}.png"
+        Image.new("RGB", (256, 256), color=(40 * i, 40 * i, 40 * i)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def detector():
+    """Detection engine running the real (untrained) model, not mocks."""
+    torch.manual_seed(0)
+    engine = DetectionInference(confidence_threshold=0.0)
+    engine.load_model(model_path="/nonexistent/detector.pth")
+    engine.use_mock_detections = False
+    return engine
+
+
+def test_detect_batch_single_forward_pass(detector, image_paths, mocker):
+    """Test that a batch runs the model once with all images stacked."""
+    forward = mocker.spy(detector.model, "forward")
+
+    batch_detections, total_time = detector.detect_batch(image_paths)
+
+    assert forward.call_count == 1
+    assert forward.call_args.args[0].shape[0] == len(image_paths)
+    assert len(batch_detections) == len(image_paths)
+    assert total_time >= 0
+
+
+def test_detect_batch_matches_single_detect(detector, image_paths):
+    """Test that batched results equal per-image results."""
+    batch_detections, _ = detector.detect_batch(image_paths)
+
+    for path, batched in zip(image_paths, batch_detections):
+        single, _ = detector.detect(path)
+        assert [d["finding_type"] for d in batched] == [d["finding_type"] for d in single]
+        for b, s in zip(batched, single):
+            assert b["confidence"] == pytest.approx(s["confidence"], abs=1e-5)
+            assert b["bbox"] == pytest.approx(s["bbox"], abs=1e-5)
+
+
+def test_detect_batch_unreadable_image(detector, image_paths, tmp_path):
+    """Test that an unreadable image yields an empty result in its slot."""
+    bad = tmp_path / "broken.png"
+    bad.write_bytes(b"not an image")
+
+    batch_detections, _ = detector.detect_batch([image_paths[0], str(bad), image_paths[1]])
+
+    assert len(batch_detections) == 3
+    assert batch_detections[1] == []
+
+
+
+def test_detect_batch_from_tensors_skips_decoding(detector, image_paths, mocker):
+    """Test that preprocessed tensors are detected without reading the files again."""
+    tensors = [detector.processor.process_image(path) for path in image_paths]
+    process_image = mocker.spy(detector.processor, "process_image")
+
+    batch_detections, _ = detector.detect_batch_from_tensors(tensors)
+    single, _ = detector.detect_from_tensor(tensors[0])
+
+    assert process_image.call_count == 0
+    assert len(batch_detections) == len(image_paths)
+    assert batch_detections == detector.detect_batch(image_paths)[0]
+    assert [d["finding_type"] for d in single] == [d["finding_type"] for d in batch_detections[0]]
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="pinned staging is CUDA only")
+def test_detect_batch_reuses_pinned_staging_buffer(detector, image_paths):
+    """Test that batches are staged in one reused page-locked buffer."""
+    tensors = [detector.processor.process_image(path) for path in image_paths]
+
+    full = detector._stack_batch(tensors)
+    partial = detector._stack_batch(tensors[:2])
+
+    assert full.is_pinned()
+    assert partial.data_ptr() == full.data_ptr()
+    assert torch.equal(partial, torch.cat(tensors[:2]))
+
+
+def test_ensure_loaded_loads_once(mocker):
+    """Test that concurrent cold-start callers share a single model load."""
+    engine = DetectionInference()
+    load = mocker.spy(engine, "load_model")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: engine.ensure_loaded(), range(8)))
+
+    assert load.call_count == 1
+    assert engine.model_loaded
+
+
+def test_warmup_runs_one_forward_pass(mocker):
+    """Test that warm-up loads the model and runs it once, even in mock mode."""
+    engine = DetectionInference()
+    engine.load_model(model_path="/nonexistent/detector.pth")
+    forward = mocker.spy(engine.model, "forward")
+
+    engine.warmup()
+
+    assert engine.use_mock_detections
+    assert forward.call_count == 1
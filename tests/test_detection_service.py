@@ -261,7 +261,55 @@ class TestCreateDetectionsBatch(TestDetectionService):
         assert len(detections) == 2
         assert detections[0].prediction_id == pred1.id
         assert detections[1].prediction_id == pred2.id
+    
+    def test_create_detections_batch_without_commit(self, db: Session, detection_service: DetectionService, test_prediction):
+        """Test that commit=False returns rows but leaves the transaction open."""
+        detections_data = [
+            DetectionCreate(
+                prediction_id=test_prediction.id,
+                finding_type="Nodule",
+                confidence_score=0.90,
+                bbox_x1=0.01,
+                bbox_y1=0.02,
+                bbox_x2=0.05,
+                bbox_y2=0.06
+            )
+        ]
+        
+        detections = detection_service.create_detections_batch(db, detections_data, commit=False)
+        
+        assert detections[0].id is not None
+        assert detections[0].created_at is not None
+        assert detections[0].bbox_x1 == pytest.approx(10.0)
+        db.rollback()
+        assert db.query(Detection).count() == 0
 
+    
+    def test_create_detections_bulk_from_dicts(self, db: Session, detection_service: DetectionService, test_prediction):
+        """Test that raw detector rows are inserted and scaled like validated ones."""
+        rows = [
+            {
+                "prediction_id": test_prediction.id,
+                "finding_type": finding_type,
+                "confidence_score": 0.8,
+                "bbox_x1": 0.1,
+                "bbox_y1": 0.2,
+                "bbox_x2": 0.3,
+                "bbox_y2": 450.0,
+            }
+            for finding_type in ("Nodule", "Pneumothorax")
+        ]
+        
+        detections = detection_service.create_detections_bulk(db, rows)
+        
+        assert [d.finding_type for d in detections] == ["Nodule", "Pneumothorax"]
+        assert detections[0].bbox_x1 == pytest.approx(100.0)
+        assert detections[0].bbox_y2 == pytest.approx(450.0)
+        assert db.query(Detection).count() == 2
+    
+    def test_create_detections_bulk_empty_list(self, db: Session, detection_service: DetectionService):
+        """Test bulk insert with no rows."""
+        assert detection_service.create_detections_bulk(db, []) == []
 
 class TestGetDetectionsByPrediction(TestDetectionService):
     """Tests for get_detections_by_prediction method."""
@@ -374,6 +422,10 @@ class TestGetAllDetections(TestDetectionService):
         page1_ids = {d.id for d in page1}
         page2_ids = {d.id for d in page2}
         assert len(page1_ids.intersection(page2_ids)) == 0
+        
+        # Pages are ordered by ID
+        ids = [d.id for d in page1 + page2]
+        assert ids == sorted(ids)
     
     def test_get_all_detections_custom_limit(self, db: Session, detection_service: DetectionService, test_prediction):
         """Test custom limit for all detections."""
@@ -394,6 +446,31 @@ class TestGetAllDetections(TestDetectionService):
         detections = detection_service.get_all_detections(db, limit=3)
         
         assert len(detections) <= 3
+    
+    def test_get_all_detections_keyset_pagination(self, db: Session, detection_service: DetectionService, test_prediction):
+        """Test that an after_id cursor returns the same pages as offsets."""
+        for i in range(10):
+            detection = Detection(
+                prediction_id=test_prediction.id,
+                finding_type=f"Finding_{i}",
+                confidence_score=0.8,
+                bbox_x1=i * 10,
+                bbox_y1=i * 20,
+                bbox_x2=i * 10 + 50,
+                bbox_y2=i * 20 + 50
+            )
+            db.add(detection)
+        db.commit()
+        
+        page1 = detection_service.get_all_detections(db, limit=4)
+        page2 = detection_service.get_all_detections(db, limit=4, after_id=page1[-1].id)
+        
+        assert [d.id for d in page2] == [d.id for d in detection_service.get_all_detections(db, skip=4, limit=4)]
+        assert all(d.id > page1[-1].id for d in page2)
+        assert detection_service.get_all_detections(db, after_id=page2[-1].id + 100) == []
+        
+        filtered = detection_service.get_detections_by_finding_type(db, "Finding_7", after_id=page1[0].id)
+        assert [d.finding_type for d in filtered] == ["Finding_7"]
 
 
 class TestGetDetectionsByFindingType(TestDetectionService):
@@ -565,3 +642,47 @@ class TestEdgeCases(TestDetectionService):
         assert len(detections) == 5
         assert all(d.finding_type == "Nodule" for d in detections)
         assert all(d.prediction_id == test_prediction.id for d in detections)
+    
+    def test_detection_result_from_db_model(self, db: Session, detection_service: DetectionService, test_prediction):
+        """Test converting a stored detection into a response schema."""
+        detection_data = DetectionCreate(
+            prediction_id=test_prediction.id,
+            finding_type="Nodule",
+            confidence_score=0.8,
+            bbox_x1=0.1,
+            bbox_y1=0.2,
+            bbox_x2=0.3,
+            bbox_y2=0.4
+        )
+        detection = detection_service.create_detection(db, detection_data)
+        
+        result = DetectionResult.from_db_model(detection)
+        
+        assert result.id == detection.id
+        assert result.prediction_id == test_prediction.id
+        assert result.bounding_box.x1 == pytest.approx(0.1)
+        assert result.bounding_box.y2 == pytest.approx(0.4)
+        assert result == DetectionResult.model_validate(result.model_dump())
+    
+    def test_detection_result_from_db_models(self, db: Session, detection_service: DetectionService, test_prediction):
+        """Test converting many stored detections in one call keeps order and values."""
+        detections_data = [
+            DetectionCreate(
+                prediction_id=test_prediction.id,
+                finding_type=finding_type,
+                confidence_score=0.5,
+                bbox_x1=0.1,
+                bbox_y1=0.2,
+                bbox_x2=0.3,
+                bbox_y2=0.4
+            )
+            for finding_type in ("Nodule", "Pneumothorax", "Cardiomegaly")
+        ]
+        detections = detection_service.create_detections_batch(db, detections_data)
+        
+        results = DetectionResult.from_db_models(detections)
+        
+        assert [r.finding_type for r in results] == ["Nodule", "Pneumothorax", "Cardiomegaly"]
+        assert all(isinstance(r, DetectionResult) for r in results)
+        assert results == [DetectionResult.from_db_model(d) for d in detections]
+        assert DetectionResult.from_db_models([]) == []
@@ -41,3 +41,15 @@ def test_health_check():
     assert "model_loaded" in data
     assert isinstance(data["model_loaded"], bool)
     assert data["app_name"] == "Healthcare AI Backend"
+
+
+def test_health_check_does_not_open_db_session():
+    """Test the health probe stays cheap by never opening a database session."""
+    def _failing_get_db():
+        raise AssertionError("health check must not open a database session")
+        yield
+    
+    app.dependency_overrides[get_db] = _failing_get_db
+    
+    response = client.get("/health")
+    assert response.status_code == 200
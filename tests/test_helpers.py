@@ -0,0 +1,96 @@
+"""
+Helper utility tests.
+
+Tests for classifying, reading, saving and removing uploaded files.
+"""
+
+from tempfile import SpooledTemporaryFile
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.utils.helpers import classify_upload, read_upload_file, remove_files, save_upload_file
+
+
+def make_upload(content: bytes, max_size: int, size=None) -> UploadFile:
+    """Build an UploadFile spooled like Starlette's (in memory up to max_size)."""
+    spooled = SpooledTemporaryFile(max_size=max_size)
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename="upload.bin", size=size)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("max_size", [1 << 20, 16], ids=["in_memory", "on_disk"])
+async def test_save_upload_file(tmp_path, max_size):
+    """Test uploads are copied intact whether spooled in memory or on disk."""
+    content = bytes(range(256)) * 64
+    upload = make_upload(content, max_size)
+    target = tmp_path / "saved.bin"
+
+    try:
+        written = await save_upload_file(upload, target, chunk_size=1000)
+    finally:
+        await upload.close()
+
+    assert written == len(content)
+    assert target.read_bytes() == content
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("size", [None, 4096], ids=["undeclared", "declared"])
+async def test_read_upload_file(size):
+    """Test an upload up to the limit is read whole."""
+    content = bytes(range(256)) * 16
+    upload = make_upload(content, 1 << 20, size=size)
+
+    try:
+        data = await read_upload_file(upload, max_size=len(content))
+    finally:
+        await upload.close()
+
+    assert data == content
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("size", [None, 4097], ids=["undeclared", "declared"])
+async def test_read_upload_file_too_large(size):
+    """Test an upload past the limit is rejected, by declared size or by content."""
+    upload = make_upload(b"\0" * 4097, 1 << 20, size=size)
+
+    try:
+        with pytest.raises(ValueError):
+            await read_upload_file(upload, max_size=4096)
+    finally:
+        await upload.close()
+
+
+@pytest.mark.parametrize(
+    "filename, content_type, expected",
+    [
+        ("scan.DCM", "application/octet-stream", (".dcm", True, False)),
+        ("scan.dicom", None, (".dicom", True, False)),
+        ("xray.PNG", "image/png", (".png", False, True)),
+        ("notes.txt", "text/plain", (".txt", False, False)),
+        (None, None, ("", False, False)),
+    ],
+)
+def test_classify_upload(filename, content_type, expected):
+    """Test uploads are classified by extension and content type."""
+    headers = Headers({"content-type": content_type}) if content_type else None
+    with SpooledTemporaryFile() as spooled:
+        upload = UploadFile(file=spooled, filename=filename, headers=headers)
+        assert classify_upload(upload) == expected
+
+
+@pytest.mark.anyio
+async def test_remove_files(tmp_path):
+    """Test files are removed and already missing ones are ignored."""
+    paths = [tmp_path / f"upload_{i}.bin" for i in range(3)]
+    for path in paths:
+        path.write_bytes(b"data")
+
+    await remove_files([*paths, tmp_path / "missing.bin"])
+
+    assert not any(path.exists() for path in paths)
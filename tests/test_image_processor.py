@@ -0,0 +1,120 @@
+"""
+Image preprocessing tests.
+
+Tests for decoding and resizing images into model inputs.
+"""
+
+import io
+
+import numpy as np
+import pydicom
+import pytest
+import torch
+from PIL import Image
+from pydicom.data import get_testdata_file
+from torchvision import transforms
+
+from app.ml.preprocessing.image_processor import ImageProcessor
+
+
+def gradient_image(size=(1024, 768)) -> Image.Image:
+    """Build a smooth RGB test image."""
+    xx, yy = np.meshgrid(np.linspace(0, 255, size[0]), np.linspace(0, 255, size[1]))
+    gray = ((xx + yy) / 2).astype(np.uint8)
+    return Image.fromarray(gray).convert("RGB")
+
+
+def encode(image: Image.Image, format: str) -> bytes:
+    """Encode an image to bytes in the given format."""
+    buf = io.BytesIO()
+    image.save(buf, format=format)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def processor():
+    """Image processor at the default model resolution."""
+    return ImageProcessor()
+
+
+@pytest.mark.parametrize("format", ["PNG", "JPEG"])
+def test_decode_bytes_shape(processor, format):
+    """Test standard images become a single-channel model input."""
+    tensor, metadata = processor.decode_bytes(encode(gradient_image(), format))
+
+    assert tensor.shape == (1, 1, processor.img_size, processor.img_size)
+    assert metadata is None
+
+
+@pytest.mark.parametrize("format", ["PNG", "JPEG"])
+def test_decode_bytes_matches_full_resolution_pipeline(processor, format):
+    """Test the fast decode/resize path stays close to a full RGB decode and resize."""
+    data = encode(gradient_image(), format)
+    reference = transforms.Compose([
+        transforms.Resize((processor.img_size, processor.img_size)),
+        transforms.Grayscale(num_output_channels=1),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485], std=[0.229])
+    ])(Image.open(io.BytesIO(data)).convert("RGB")).unsqueeze(0)
+
+    tensor, _ = processor.decode_bytes(data)
+
+    # A couple of grey levels, in normalized units
+    assert (tensor - reference).abs().max().item() < 3 / 255 / 0.229
+
+
+def test_normalization_matches_torchvision(processor):
+    """Test the lookup-table normalization is bit-identical to ToTensor + Normalize."""
+    levels = np.arange(processor.img_size ** 2, dtype=np.uint32) % 256
+    image = Image.fromarray(levels.astype(np.uint8).reshape(processor.img_size, processor.img_size))
+    reference = transforms.Compose([
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[processor.MEAN], std=[processor.STD])
+    ])(image).unsqueeze(0)
+
+    tensor = processor._to_tensor(image)
+
+    assert tensor.dtype == reference.dtype
+    assert torch.equal(tensor, reference)
+
+
+@pytest.mark.parametrize("filename", ["CT_small.dcm", "MR_small.dcm"])
+def test_decode_bytes_matches_file_dicom(processor, filename, mocker):
+    """Test DICOM is parsed once and decodes like the same file on disk."""
+    path = get_testdata_file(filename)
+    with open(path, "rb") as f:
+        data = f.read()
+    expected_tensor, expected_metadata = processor.process_image_with_metadata(path)
+    dcmread = mocker.spy(pydicom, "dcmread")
+
+    tensor, metadata = processor.decode_bytes(data, filename)
+
+    assert dcmread.call_count == 1
+    assert torch.equal(tensor, expected_tensor)
+    assert metadata == expected_metadata
+
+
+@pytest.mark.parametrize("format", ["PNG", "JPEG"])
+def test_decode_bytes_matches_file_image(processor, format, tmp_path):
+    """Test standard images decode like the same file on disk."""
+    data = encode(gradient_image(), format)
+    path = tmp_path / f"xray.{format.lower()}"
+    path.write_bytes(data)
+
+    tensor, metadata = processor.decode_bytes(data, "xray")
+
+    assert torch.equal(tensor, processor.process_image(str(path)))
+    assert metadata is None
+
+
+@pytest.mark.parametrize(
+    "data, filename",
+    [
+        (b"GIF89a not a png", "xray.png"),
+        (b"not dicom at all", "scan.dcm"),
+    ],
+    ids=["unknown_image", "invalid_dicom"],
+)
+def test_decode_bytes_rejects_invalid(processor, data, filename):
+    """Test content that is not a PNG, JPEG or DICOM image is reported as invalid, not raised."""
+    assert processor.decode_bytes(data, filename) is None
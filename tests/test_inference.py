@@ -0,0 +1,169 @@
+"""
+Classification inference tests.
+
+Tests for the chest X-ray classification model wrapper, including batched inference.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import torch
+from PIL import Image
+
+from app.ml.inference import ModelInference
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    """Write a few grayscale test images to disk."""
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"xray_{i}.png"
+        Image.new("RGB", (256, 256), color=(40 * i, 40 * i, 40 * i)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def classifier():
+    """Classification engine running the (untrained) model."""
+    torch.manual_seed(0)
+    engine = ModelInference()
+    engine.load_model()
+    return engine
+
+
+def test_predict_batch_single_forward_pass(classifier, image_paths, mocker):
+    """Test that a batch runs the model once with all images stacked."""
+    tensors = [classifier.processor.process_image(path) for path in image_paths]
+    forward = mocker.spy(classifier.model, "forward")
+
+    results, processing_time = classifier.predict_batch(tensors)
+
+    assert forward.call_count == 1
+    assert forward.call_args.args[0].shape[0] == len(image_paths)
+    assert len(results) == len(image_paths)
+    assert processing_time >= 0
+
+
+def test_predict_batch_matches_single_predict(classifier, image_paths):
+    """Test that batched results equal per-image results."""
+    tensors = [classifier.processor.process_image(path) for path in image_paths]
+
+    results, _ = classifier.predict_batch(tensors)
+
+    for path, (pred_class, confidence, all_probs) in zip(image_paths, results):
+        single_class, single_conf, _, single_probs = classifier.predict(path)
+        assert pred_class == single_class
+        assert confidence == pytest.approx(single_conf, abs=1e-5)
+        assert all_probs == pytest.approx(single_probs, abs=1e-5)
+
+
+def test_predict_batch_empty(classifier):
+    """Test that an empty batch skips the model."""
+    assert classifier.predict_batch([]) == ([], 0.0)
+
+
+def test_predict_tensor_matches_predict(classifier, image_paths):
+    """Test that predicting on a preprocessed tensor equals predicting on the file."""
+    tensor = classifier.processor.process_image(image_paths[0])
+
+    pred_class, confidence, processing_time, all_probs = classifier.predict_tensor(tensor)
+    file_class, file_conf, _, file_probs = classifier.predict(image_paths[0])
+
+    assert pred_class == file_class
+    assert confidence == pytest.approx(file_conf, abs=1e-5)
+    assert all_probs == pytest.approx(file_probs, abs=1e-5)
+    assert processing_time >= 0
+
+
+def test_onnx_session_matches_pytorch(classifier, image_paths, tmp_path):
+    """Test that serving an exported model through ONNX Runtime gives the same results."""
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    onnx_path = str(tmp_path / "classifier.onnx")
+    classifier.export_onnx(onnx_path)
+    tensors = [classifier.processor.process_image(path) for path in image_paths]
+    expected, _ = classifier.predict_batch(tensors)
+
+    classifier._load_onnx_session(onnx_path)
+    results, _ = classifier.predict_batch(tensors)
+
+    assert classifier.onnx_session is not None
+    for (pred_class, confidence, all_probs), (exp_class, exp_conf, exp_probs) in zip(results, expected):
+        assert pred_class == exp_class
+        assert confidence == pytest.approx(exp_conf, abs=1e-4)
+        assert all_probs == pytest.approx(exp_probs, abs=1e-4)
+
+
+def test_onnx_missing_file_falls_back_to_pytorch(classifier, tmp_path):
+    """Test that a missing ONNX model leaves the PyTorch model serving."""
+    classifier._load_onnx_session(str(tmp_path / "missing.onnx"))
+
+    assert classifier.onnx_session is None
+
+
+def test_predict_tensor_under_bfloat16_autocast(classifier, image_paths):
+    """Test that the configured autocast dtype is used for the forward pass."""
+    assert classifier.amp_dtype is torch.float16
+    tensor = classifier.processor.process_image(image_paths[0])
+    expected_class, _, _, expected_probs = classifier.predict_tensor(tensor)
+
+    # CPU autocast supports bfloat16, so the reduced-precision path runs here too
+    classifier.use_amp = True
+    classifier.amp_dtype = torch.bfloat16
+    pred_class, _, _, all_probs = classifier.predict_tensor(tensor)
+
+    assert pred_class == expected_class
+    assert all_probs == pytest.approx(expected_probs, abs=5e-2)
+
+
+def test_compiled_model_warms_single_and_batched_graphs(mocker):
+    """Test that compile_model compiles the classifier and warm-up covers both batch graphs."""
+    compile_model = mocker.patch("torch.compile", side_effect=lambda model, mode: model)
+    engine = ModelInference()
+    engine.settings = engine.settings.model_copy(update={"compile_model": True})
+    engine.load_model()
+    forward = mocker.spy(engine.model, "forward")
+
+    engine.warmup()
+
+    compile_model.assert_called_once()
+    assert compile_model.call_args.kwargs["mode"] == "default"
+    assert [call.args[0].shape[0] for call in forward.call_args_list] == [1, 2]
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="pinned staging is CUDA only")
+def test_predict_batch_reuses_pinned_staging_buffer(classifier, image_paths):
+    """Test that batches are staged in one reused page-locked buffer."""
+    tensors = [classifier.processor.process_image(path) for path in image_paths]
+
+    full = classifier._stack_batch(tensors)
+    partial = classifier._stack_batch(tensors[:2])
+
+    assert full.is_pinned()
+    assert partial.data_ptr() == full.data_ptr()
+    assert torch.equal(partial, torch.cat(tensors[:2]))
+
+
+def test_warmup_runs_configured_batch_sizes_only_on_cuda(classifier, mocker):
+    """Test that warm-up covers every configured batch size on CUDA and one image on CPU."""
+    classifier.settings = classifier.settings.model_copy(update={"warmup_batch_sizes": [8, 1, 32]})
+    forward = mocker.spy(classifier.model, "forward")
+
+    classifier.warmup()
+
+    expected = [1, 8, 32] if classifier.device.type == "cuda" else [1]
+    assert [call.args[0].shape[0] for call in forward.call_args_list] == expected
+
+
+def test_ensure_loaded_loads_once(mocker):
+    """Test that concurrent cold-start callers share a single model load."""
+    engine = ModelInference()
+    load = mocker.spy(engine, "load_model")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: engine.ensure_loaded(), range(8)))
+
+    assert load.call_count == 1
+    assert engine.model_loaded
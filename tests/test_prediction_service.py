@@ -215,6 +215,25 @@ class TestCreatePredictionsBatch(TestPredictionService):
         assert len(predictions) == 4
         result_classes = [p.prediction_class for p in predictions]
         assert set(result_classes) == set(classes)
+    
+    def test_create_predictions_batch_without_commit(self, db: Session, prediction_service: PredictionService):
+        """Test that commit=False assigns IDs but leaves the transaction open."""
+        predictions_data = [
+            PredictionCreate(
+                image_filename=f"image_{i}.png",
+                prediction_class="NORMAL",
+                confidence_score=0.85
+            )
+            for i in range(3)
+        ]
+        
+        predictions = prediction_service.create_predictions_batch(db, predictions_data, commit=False)
+        
+        assert [p.image_filename for p in predictions] == ["image_0.png", "image_1.png", "image_2.png"]
+        assert all(p.id is not None for p in predictions)
+        assert len({p.id for p in predictions}) == 3
+        db.rollback()
+        assert db.query(Prediction).count() == 0
 
 
 class TestGetPrediction(TestPredictionService):
@@ -12,12 +12,14 @@ import os
 import sys
 import io
 from PIL import Image
+from pydicom.data import get_testdata_file
 import re
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.main import app
+from app.main import app, container
 from app.core.database import Base, get_db
+from app.core.config import get_settings
 
 # Test database configuration
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -124,10 +126,24 @@ def test_predict_chest_xray_jpeg():
     assert data["image_filename"].endswith(".jpg")
     
     # Verify it's a UUID-based filename
-    uuid_pattern = r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}\.(jpg|jpeg)$'
+    uuid_pattern = r'^[a-f0-9]{32}\.(jpg|jpeg)$'
     assert re.match(uuid_pattern, data["image_filename"])
 
 
+
+def test_predict_chest_xray_dicom():
+    """Test prediction accepts a DICOM file."""
+    with open(get_testdata_file("CT_small.dcm"), "rb") as f:
+        dicom = io.BytesIO(f.read())
+    
+    response = client.post(
+        "/api/v1/predict",
+        files={"file": ("scan.dcm", dicom, "application/dicom")}
+    )
+    
+    assert response.status_code == 201
+    assert response.json()["image_filename"].endswith(".dcm")
+
 def test_predict_chest_xray_no_file():
     """Test prediction endpoint without file upload."""
     response = client.post("/api/v1/predict")
@@ -147,6 +163,51 @@ def test_predict_chest_xray_invalid_format():
     assert response.status_code in [400, 422]
 
 
+
+def test_predict_chest_xray_bad_signature_not_saved(mocker):
+    """Test content with the wrong magic number is rejected before it is saved."""
+    save = mocker.patch("app.api.routes.predictions.save_upload_file")
+    
+    response = client.post(
+        "/api/v1/predict",
+        files={"file": ("xray.png", io.BytesIO(b"GIF89a not a png"), "image/png")}
+    )
+    
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid image format")
+    save.assert_not_called()
+
+def test_predict_chest_xray_decodes_once(mocker):
+    """Test the upload is decoded once in memory and not re-read from disk."""
+    image_processor = container.image_processor()
+    model_inference = container.model_inference()
+    decode_bytes = mocker.spy(image_processor, "decode_bytes")
+    process_image = mocker.spy(image_processor, "process_image")
+    predict_tensor = mocker.spy(model_inference, "predict_tensor")
+    
+    response = client.post(
+        "/api/v1/predict",
+        files={"file": ("xray.png", create_test_image(), "image/png")}
+    )
+    
+    assert response.status_code == 201
+    assert decode_bytes.call_count == 1
+    assert predict_tensor.call_count == 1
+    process_image.assert_not_called()
+
+
+def test_predict_chest_xray_too_large():
+    """Test uploads over the configured size limit are rejected."""
+    img = create_test_image()
+    oversized = io.BytesIO(img.getvalue() + b"\0" * get_settings().max_upload_size)
+    
+    response = client.post(
+        "/api/v1/predict",
+        files={"file": ("xray.png", oversized, "image/png")}
+    )
+    
+    assert response.status_code == 413
+
 def test_predict_chest_xray_small_image():
     """Test prediction with very small image."""
     img = create_test_image(format="PNG", size=(32, 32))
@@ -6,7 +6,7 @@ Tests for multiple image batch prediction functionality.
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 import os
 import sys
@@ -15,7 +15,7 @@ from PIL import Image
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.main import app
+from app.main import app, container
 from app.core.database import Base, get_db
 
 # Test database configuration
@@ -157,6 +157,70 @@ def test_predict_batch_partial_failure():
     assert len(data["errors"]) >= 1
 
 
+
+def test_predict_batch_preserves_order():
+    """Test files processed concurrently are reported in upload order."""
+    files = [
+        ("files", ("bad_0.txt", io.BytesIO(b"invalid"), "text/plain")),
+        ("files", ("valid_0.png", create_test_image(), "image/png")),
+        ("files", ("bad_1.txt", io.BytesIO(b"invalid"), "text/plain")),
+        ("files", ("valid_1.png", create_test_image(), "image/png")),
+        ("files", ("bad_2.txt", io.BytesIO(b"invalid"), "text/plain")),
+    ]
+    
+    response = client.post("/api/v1/predict/batch", files=files)
+    
+    assert response.status_code == 201
+    data = response.json()
+    assert data["successful"] == 2
+    assert [err["filename"] for err in data["errors"]] == ["bad_0.txt", "bad_1.txt", "bad_2.txt"]
+
+def test_predict_batch_single_forward_pass(mocker):
+    """Test that all valid images of a batch are classified in one call."""
+    model_inference = container.model_inference()
+    predict = mocker.spy(model_inference, "predict")
+    predict_batch = mocker.spy(model_inference, "predict_batch")
+    files = [
+        ("files", (f"xray_{i}.png", create_test_image(), "image/png"))
+        for i in range(3)
+    ]
+    
+    response = client.post("/api/v1/predict/batch", files=files)
+    
+    assert response.status_code == 201
+    assert response.json()["successful"] == 3
+    assert predict_batch.call_count == 1
+    assert len(predict_batch.call_args.args[0]) == 3
+    assert predict.call_count == 0
+
+
+def test_predict_batch_saves_without_reloading():
+    """Test the batch is written with one INSERT and never read back."""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split()[0].upper())
+    
+    files = [
+        ("files", (f"xray_{i}.png", create_test_image(), "image/png"))
+        for i in range(3)
+    ]
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/api/v1/predict/batch", files=files)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    assert response.status_code == 201
+    predictions = response.json()["predictions"]
+    assert len(predictions) == 3
+    assert all(p["id"] and p["created_at"] for p in predictions)
+    assert "SELECT" not in statements
+    
+    stored = client.get("/api/v1/predictions").json()
+    assert sorted(p["id"] for p in stored) == sorted(p["id"] for p in predictions)
+
+
 def test_batch_processing_time():
     """Verify batch processing returns timing information."""
     files = [
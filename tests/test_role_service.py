@@ -216,6 +216,13 @@ class TestListRoles(TestRoleService):
         page2_ids = {r.id for r in page2}
         assert len(page1_ids.intersection(page2_ids)) == 0
     
+    def test_list_roles_past_last_page(self, db: Session, role_service: RoleService, test_role):
+        """Test an empty page past the end still reports the total."""
+        roles, total = role_service.list_roles(db, skip=1000, limit=10)
+        
+        assert roles == []
+        assert total == db.query(Role).count()
+    
     def test_list_roles_empty(self, db: Session, role_service: RoleService):
         """Test listing roles when none exist."""
         # Clear all roles
@@ -426,6 +433,37 @@ class TestPermissionManagement(TestRoleService):
         
         assert isinstance(result, bool)
     
+    def test_add_user_permission_rejected(self, role_service: RoleService):
+        """Test that permissions for a single user must be granted to a role."""
+        permission = PermissionCreate(
+            subject="user:42",
+            object="/api/test",
+            action="GET",
+            effect="allow"
+        )
+        
+        with pytest.raises(HTTPException) as exc_info:
+            role_service.add_permission(permission)
+        
+        assert exc_info.value.status_code == 400
+        assert ["user:42", "/api/test", "GET", "allow"] not in role_service.get_all_permissions()
+    
+    def test_add_user_permission_with_override(self, role_service: RoleService):
+        """Test that an explicit override still allows a user-specific permission."""
+        permission = PermissionCreate(
+            subject="user:42",
+            object="/api/override",
+            action="GET",
+            effect="allow",
+            override=True
+        )
+        
+        try:
+            assert role_service.add_permission(permission) is True
+            assert ["user:42", "/api/override", "GET", "allow"] in role_service.get_all_permissions()
+        finally:
+            role_service.remove_permission(permission)
+    
     def test_get_all_permissions(self, role_service: RoleService):
         """Test getting all permissions."""
         permissions = role_service.get_all_permissions()
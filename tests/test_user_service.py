@@ -6,6 +6,7 @@ password management, and edge cases.
 """
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
@@ -342,6 +343,46 @@ class TestListUsers(TestUserService):
         
         assert all(u.is_active for u in active_users)
         assert all(not u.is_active for u in inactive_users)
+        assert active_total == len(active_users)
+        assert inactive_total == 2
+    
+    def test_list_users_loads_roles_up_front(self, db: Session, user_service: UserService, test_role):
+        """Test the page, its total and every user's roles take two queries."""
+        for i in range(3):
+            user = User(
+                username=f"role_user_{i}",
+                email=f"role_user{i}@example.com",
+                hashed_password="x",
+                oauth_provider="local"
+            )
+            db.add(user)
+            db.flush()
+            db.add(UserRole(user_id=user.id, role_id=test_role.id))
+        db.commit()
+        db.expunge_all()
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            users, total = user_service.list_users(db)
+            roles = [user.roles for user in users]
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        
+        assert total == len(users)
+        assert ["test_role"] in roles
+        assert len(statements) == 2
+    
+    def test_list_users_past_last_page(self, db: Session, user_service: UserService, test_user):
+        """Test an empty page past the end still reports the total."""
+        users, total = user_service.list_users(db, skip=1000, limit=10)
+        
+        assert users == []
+        assert total == user_service.list_users(db)[1]
 
 
 class TestUpdateUser(TestUserService):
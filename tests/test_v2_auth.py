@@ -4,9 +4,12 @@ V2 API Authentication tests.
 Tests for user registration, login, and rate limiting.
 """
 
+import threading
+
 import pytest
 from httpx import AsyncClient
 from app.main import app
+from app.core.security import password_hasher
 
 
 @pytest.fixture
@@ -31,6 +34,7 @@ async def test_user_registration():
         assert "id" in data
         assert data["username"] == "newuser"
         assert data["email"] == "newuser@example.com"
+        assert data["roles"] == ["api_user"]
 
 
 @pytest.mark.anyio
@@ -87,3 +91,53 @@ async def test_login_rate_limit():
         # Sixth attempt should be rate-limited
         resp = await client.post("/api/v2/auth/login", json=login_payload)
         assert resp.status_code == 429, f"Expected 429 Too Many Requests, got {resp.status_code}"
+
+
+@pytest.mark.anyio
+async def test_register_rate_limit():
+    """
+    The register endpoint is limited to 3 requests per minute; the 429
+    response says when to retry.
+    """
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for i in range(3):
+            resp = await client.post("/api/v2/auth/register", json={
+                "username": f"limited{i}",
+                "email": f"limited{i}@example.com",
+                "password": "StrongP@ssw0rd!"
+            })
+            assert resp.status_code != 429, f"Rate limit triggered too early: {resp.text}"
+        resp = await client.post("/api/v2/auth/register", json={
+            "username": "limited3",
+            "email": "limited3@example.com",
+            "password": "StrongP@ssw0rd!"
+        })
+        assert resp.status_code == 429
+        assert 1 <= int(resp.headers["Retry-After"]) <= 60
+
+
+@pytest.mark.anyio
+async def test_login_hashes_off_event_loop(mocker):
+    """Password verification runs in the threadpool, not on the event loop thread."""
+    loop_thread = threading.get_ident()
+    threads = []
+    verify = password_hasher.verify_password
+
+    def record(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return verify(*args, **kwargs)
+
+    mocker.patch.object(password_hasher, "verify_password", side_effect=record)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.post("/api/v2/auth/register", json={
+            "username": "threaded",
+            "email": "threaded@example.com",
+            "password": "StrongP@ssw0rd!"
+        })
+        resp = await client.post("/api/v2/auth/login", json={
+            "username": "threaded",
+            "password": "StrongP@ssw0rd!"
+        })
+
+    assert resp.status_code == 200
+    assert threads and loop_thread not in threads
@@ -4,9 +4,15 @@ V2 API Role management tests.
 Tests for role creation, management, and authorization.
 """
 
+from types import SimpleNamespace
+
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
 from app.main import app
+from app.api.dependencies import ClientInfo
+from app.api.v2 import roles as roles_api
+from app.schemas.role import RoleCreate, RoleUpdate
 
 
 @pytest.fixture
@@ -76,3 +82,50 @@ async def test_get_role_details_unauthorized():
         resp = await client.get("/api/v2/roles/1")
         # Should require authentication
         assert resp.status_code in [200, 401, 403, 404]
+
+
+class TestRoleResponseCache:
+    """Test suite for the cached role read endpoints."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Start and end every test with an empty role cache."""
+        roles_api.clear_role_cache()
+        yield
+        roles_api.clear_role_cache()
+
+    def test_list_roles_served_from_cache(self, db, mocker):
+        """Test that a repeated page is not read from the database again."""
+        list_roles = mocker.spy(roles_api.role_service, "list_roles")
+
+        first = roles_api.list_roles(skip=0, limit=100, db=db, admin=None)
+        second = roles_api.list_roles(skip=0, limit=100, db=db, admin=None)
+
+        assert second == first
+        assert list_roles.call_count == 1
+
+    def test_role_mutation_clears_cache(self, db):
+        """Test that creating a role is visible on the next read."""
+        before = roles_api.list_roles(skip=0, limit=100, db=db, admin=None)
+        admin = SimpleNamespace(id=None)
+        client = ClientInfo(None, None)
+
+        role = roles_api.create_role(
+            RoleCreate(name="nurse", display_name="Nurse"), client=client, db=db, admin=admin
+        )
+        after = roles_api.list_roles(skip=0, limit=100, db=db, admin=None)
+
+        assert after.total == before.total + 1
+        assert roles_api.get_role(role.id, db=db, admin=None).name == "nurse"
+
+        roles_api.update_role(
+            role.id, RoleUpdate(display_name="Senior Nurse"), client=client, db=db, admin=admin
+        )
+        assert roles_api.get_role(role.id, db=db, admin=None).display_name == "Senior Nurse"
+
+    def test_missing_role_not_cached(self, db):
+        """Test that a 404 is not remembered."""
+        with pytest.raises(HTTPException):
+            roles_api.get_role(9999, db=db, admin=None)
+
+        assert len(roles_api._role_cache) == 0
@@ -53,6 +53,7 @@ async def test_protected_user_endpoint(registered_user):
         assert resp.status_code == 200, f"Protected endpoint failed: {resp.text}"
         data = resp.json()
         assert data["username"] == registered_user["username"]
+        assert data["roles"] == ["api_user"]
 
 
 @pytest.mark.anyio